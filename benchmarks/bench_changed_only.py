@@ -0,0 +1,74 @@
+"""
+How fast --changed-only decides that nothing needs sending.
+
+Synthesizes N students and certificates, records them all in the
+certificate manifest as already sent, then times a dry run over the
+roster with and without --changed-only. Without it every certificate is
+read, hashed and encoded; with it unchanged files are skipped on their
+mtime/size alone. A few certificates are then edited to check that exactly
+those are picked up.
+
+Usage:
+    python benchmarks/bench_changed_only.py --students 100000
+"""
+
+import argparse
+import os
+import shutil
+import time
+
+from common import make_workspace, point_mailer_at, quiet
+
+from certificate_mailer.journal import certificate_digest
+from certificate_mailer.manifest import CertificateManifest, manifest_path_for
+
+
+def seed_manifest(mailer):
+    """Record every certificate in the workspace as sent to its student."""
+    settings = mailer.settings
+    manifest = CertificateManifest(manifest_path_for(settings.CERTIFICATES_FOLDER))
+    for name, email in mailer.iter_students(settings.STUDENT_LIST_CSV):
+        path = os.path.join(settings.CERTIFICATES_FOLDER, mailer.certificate_filename_for(name))
+        with open(path, 'rb') as f:
+            manifest.record(email, path, os.stat(path), certificate_digest(f.read()))
+    manifest.close()
+
+
+def dry_run(mailer, changed_only):
+    cache = mailer.AttachmentCache(max_bytes=0)
+    started = time.perf_counter()
+    with quiet():
+        stats = mailer.send_certificate_emails(dry_run=True, changed_only=changed_only, attachment_cache=cache)
+    return time.perf_counter() - started, stats, cache.counters()['misses']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--certificate-kb', type=int, default=100)
+    parser.add_argument('--edit', type=int, default=10, help='Certificates to change before the last run')
+    args = parser.parse_args()
+
+    workspace = make_workspace(args.students, args.certificate_kb * 1024)
+    try:
+        mailer = point_mailer_at(workspace)
+        seed_manifest(mailer)
+
+        print(f"{'run':<26} {'seconds':>8} {'would send':>11} {'unchanged':>10} {'files read':>11}")
+        for label, changed_only in (('full dry run', False), ('--changed-only', True)):
+            elapsed, stats, reads = dry_run(mailer, changed_only)
+            print(f"{label:<26} {elapsed:>8.2f} {stats['sent']:>11} {stats['unchanged']:>10} {reads:>11}")
+
+        folder = mailer.settings.CERTIFICATES_FOLDER
+        for filename in sorted(os.listdir(folder))[:args.edit]:
+            with open(os.path.join(folder, filename), 'ab') as f:
+                f.write(b'% re-issued\n')
+        elapsed, stats, reads = dry_run(mailer, True)
+        label = f'--changed-only, {args.edit} edited'
+        print(f"{label:<26} {elapsed:>8.2f} {stats['sent']:>11} {stats['unchanged']:>10} {reads:>11}")
+    finally:
+        shutil.rmtree(workspace)
+
+
+if __name__ == '__main__':
+    main()
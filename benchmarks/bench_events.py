@@ -0,0 +1,76 @@
+"""
+One --events batch vs one run per event.
+
+Synthesizes E events with S students each and sends them to the local SMTP
+sink twice: as E separate runs (each validating, logging in and loading
+the logo again, and draining its queue before the next one starts) and as
+one run over an events manifest, where all events share the connections
+and their students are interleaved into one queue. The sink's login
+latency stands in for a real provider's TLS handshake and AUTH.
+
+Usage:
+    python benchmarks/bench_events.py --events 5 --students 40 --workers 4
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+
+from common import make_workspace, point_mailer_at, quiet
+from smtp_sink import SMTPSink
+
+
+def write_manifest(workspaces):
+    """An events manifest for the workspaces, written next to the first one."""
+    events = [{
+        'name': f'event-{number}',
+        'EVENT_NAME': f'Workshop {number}',
+        'STUDENT_LIST_CSV': os.path.join(workspace, 'students.csv'),
+        'CERTIFICATES_FOLDER': os.path.join(workspace, 'certificates'),
+        'LOGO_IMAGE_PATH': os.path.join(workspace, 'logo.jpg'),
+    } for number, workspace in enumerate(workspaces, 1)]
+    path = os.path.join(os.path.dirname(workspaces[0]), f'{os.path.basename(workspaces[0])}-events.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'events': events}, f, indent=2)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=5)
+    parser.add_argument('--students', type=int, default=40, help='Students per event')
+    parser.add_argument('--certificate-kb', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.02, help='Simulated server latency per message in seconds')
+    parser.add_argument('--login-latency', type=float, default=0.3, help='Simulated latency per login in seconds')
+    args = parser.parse_args()
+
+    workspaces = [make_workspace(args.students, args.certificate_kb * 1024) for _ in range(args.events)]
+    manifest = write_manifest(workspaces)
+    try:
+        print(f"{'mode':<22} {'sent':>6} {'logins':>7} {'seconds':>8} {'msg/s':>7}")
+        for label in ('one run per event', 'one --events batch'):
+            with SMTPSink(latency=args.latency, login_latency=args.login_latency) as sink:
+                mailer = point_mailer_at(workspaces[0], sink)
+                events = mailer.load_events(manifest)
+                sent = 0
+                started = time.perf_counter()
+                with quiet():
+                    if label == 'one run per event':
+                        for event in events:
+                            with event.applied():
+                                sent += mailer.send_certificate_emails(workers=args.workers)['sent']
+                    else:
+                        sent = mailer.send_certificate_emails(workers=args.workers, events=events)['sent']
+                elapsed = time.perf_counter() - started
+            print(f"{label:<22} {sent:>6} {sink.logins:>7} {elapsed:>8.2f} {sent / elapsed:>7.1f}")
+    finally:
+        os.remove(manifest)
+        for workspace in workspaces:
+            shutil.rmtree(workspace)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Bytes on the wire and send time with attachments vs --links.
+
+Synthesizes N students and certificates, then sends them to the local SMTP
+sink twice: once attaching each certificate and the inline logo, once with
+--links, which publishes the certificates to a local directory first and
+only puts a signed download link (and a hosted logo) in each email. Also
+checks that a link from the sent messages verifies with the signing key.
+
+Usage:
+    python benchmarks/bench_links.py --students 200 --certificate-kb 150 --latency 0.01
+"""
+
+import argparse
+import os
+import shutil
+import time
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from common import make_workspace, point_mailer_at, quiet
+from smtp_sink import SMTPSink
+
+from certificate_mailer.storage import open_storage
+
+SIGNING_KEY = 'benchmark signing key'
+
+
+def send(mailer, links):
+    started = time.perf_counter()
+    with quiet():
+        stats = mailer.send_certificate_emails(links=links, workers=2)
+    return time.perf_counter() - started, stats
+
+
+def check_link(mailer, url):
+    """Verify a signed link the way a file server would, and that it points at a published file."""
+    parts = urlsplit(url)
+    key = unquote(parts.path[len(urlsplit(mailer.settings.LINK_BASE_URL).path):])
+    query = parse_qs(parts.query)
+    signer = mailer.LinkSigner(SIGNING_KEY, 0)
+    valid = signer.verify(key, query['expires'][0], query['signature'][0])
+    tampered = signer.verify(key, int(query['expires'][0]) + 1, query['signature'][0])
+    published = os.path.exists(os.path.join(mailer.settings.LINK_STORAGE_DIR, *key.split('/')))
+    return valid and not tampered and published
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--certificate-kb', type=int, default=150)
+    parser.add_argument('--latency', type=float, default=0.01, help='Simulated server latency per message in seconds')
+    args = parser.parse_args()
+
+    workspace = make_workspace(args.students, args.certificate_kb * 1024)
+    try:
+        config_path = os.path.join(workspace, 'config.py')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            f.write(f"EMAIL_ADDRESS = 'sender@example.com'\nEMAIL_PASSWORD = 'unused'\nLINK_SIGNING_KEY = {SIGNING_KEY!r}\n")
+
+        print(f"{'mode':<12} {'sent':>6} {'seconds':>8} {'KB/message':>11} {'MB total':>9}")
+        for label, links in (('attachments', False), ('--links', True)):
+            with SMTPSink(latency=args.latency) as sink:
+                mailer = point_mailer_at(workspace, sink)
+                settings = mailer.settings
+                settings.CONFIG_PATH = config_path
+                settings.LINK_STORAGE_DIR = os.path.join(workspace, 'published')
+                settings.LINK_BASE_URL = 'https://certificates.example.org/event/'
+                elapsed, stats = send(mailer, links)
+                size = sink.bytes_received
+            print(f"{label:<12} {stats['sent']:>6} {elapsed:>8.2f} {size / max(stats['sent'], 1) / 1024:>11.1f} "
+                  f"{size / 1024 / 1024:>9.1f}")
+
+        published = mailer.CertificateLinks(open_storage(), mailer.LinkSigner(SIGNING_KEY, 3600))
+        certificate = os.path.join(settings.CERTIFICATES_FOLDER, sorted(os.listdir(settings.CERTIFICATES_FOLDER))[0])
+        url = published.url(published.publish(certificate))
+        print(f"signed link verifies: {check_link(mailer, url)} ({url[:60]}...)")
+    finally:
+        shutil.rmtree(workspace)
+
+
+if __name__ == '__main__':
+    main()
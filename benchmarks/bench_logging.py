@@ -0,0 +1,99 @@
+"""
+Per-message cost of the mailer's logging and progress reporting.
+
+Times one "sent" log line per message through setup_logging() with the
+synchronous file + console handlers and with the background QueueListener
+(text and JSON), and ProgressReporter.update() redrawing on every call
+versus at PROGRESS_REFRESH_HZ. The console is a stand-in that takes
+--console-ms per write (a remote terminal or a busy CI log; 0 for
+/dev/null), which the synchronous handlers make every sender wait for.
+
+Usage:
+    python benchmarks/bench_logging.py --messages 100000
+"""
+
+import argparse
+import contextlib
+import logging
+import shutil
+import tempfile
+import time
+
+from common import quiet
+
+import certificate_mailer as mailer
+from certificate_mailer.utils import ProgressReporter, setup_logging, stop_log_listener
+
+
+class SlowConsole:
+    """A write-only stream that takes `delay` seconds per write."""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def write(self, text):
+        if self.delay:
+            time.sleep(self.delay)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def time_logging(messages, log_format, use_queue, console_delay):
+    """Microseconds per log call as seen by the caller, and including the background writer."""
+    folder = tempfile.mkdtemp(prefix='mailer-logs-')
+    root = logging.getLogger()
+    saved = root.handlers[:]
+    root.handlers = []
+    mailer.settings.LOG_FOLDER = folder
+    mailer.settings.LOG_FORMAT = log_format
+    mailer.settings.LOG_QUEUE = use_queue
+    try:
+        with contextlib.redirect_stderr(SlowConsole(console_delay)):
+            logger = setup_logging()
+            started = time.perf_counter()
+            for i in range(messages):
+                logger.info(f"✔️ Successfully sent certificate to Student {i} at student{i}@example.com",
+                            extra={'outcome': 'sent', 'email': f'student{i}@example.com'})
+            call_time = time.perf_counter() - started
+            stop_log_listener()  # Wait for the background writer to catch up
+            total_time = time.perf_counter() - started
+    finally:
+        for handler in root.handlers:
+            handler.close()
+        root.handlers = saved
+        shutil.rmtree(folder, ignore_errors=True)
+    return call_time / messages * 1e6, total_time / messages * 1e6
+
+
+def time_progress(messages, refresh_hz):
+    reporter = ProgressReporter(messages, prefix='Sending', refresh_hz=refresh_hz)
+    with quiet():
+        started = time.perf_counter()
+        for i in range(1, messages + 1):
+            reporter.update(i)
+        elapsed = time.perf_counter() - started
+    return elapsed / messages * 1e6, reporter.redraws
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=100000)
+    parser.add_argument('--console-ms', type=float, default=0.05, help='Time each console write takes')
+    args = parser.parse_args()
+
+    print(f"{'logging':<22} {'us/call':>9} {'us/line written':>16}")
+    for label, log_format, use_queue in (('sync text', 'text', False), ('queue text', 'text', True),
+                                         ('queue json', 'json', True)):
+        per_call, per_line = time_logging(args.messages, log_format, use_queue, args.console_ms / 1000)
+        print(f"{label:<22} {per_call:>9.2f} {per_line:>16.2f}")
+
+    print(f"\n{'progress':<22} {'us/call':>9} {'redraws':>9}")
+    for label, refresh_hz in (('every update', 0), ('4 Hz', 4)):
+        per_call, redraws = time_progress(args.messages, refresh_hz)
+        print(f"{label:<22} {per_call:>9.2f} {redraws:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Compare per-message build cost of the legacy MIMEMultipart path and MessageTemplate.
+
+The legacy path rebuilds the MIME tree and lets the email generator flatten
+it (re-encoding the logo) for every recipient, exactly as smtplib's
+send_message() did. The template path splices per-student pieces into
+pre-encoded bytes.
+
+Usage:
+    python benchmarks/bench_message_build.py --messages 200 --certificate-kb 150
+"""
+
+import argparse
+import io
+import os
+import time
+import tracemalloc
+from email import encoders
+from email.generator import BytesGenerator
+from email.mime.base import MIMEBase
+from email.mime.image import MIMEImage
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import formataddr
+
+from common import REPO_ROOT
+
+import certificate_mailer as mailer
+
+
+def legacy_builder(logo_data):
+    """Return a build function equivalent to the original send_certificate_emails loop."""
+    with open(mailer.settings.HTML_TEMPLATE_PATH, encoding='utf-8') as f:
+        html_template = f.read()
+    image_part = MIMEImage(logo_data, _subtype='jpeg')
+    image_part.add_header('Content-ID', '<logoimage>')
+
+    def build(recipient, name, certificate_filename, certificate_data):
+        msg = MIMEMultipart('related')
+        msg['From'] = formataddr((mailer.settings.SENDER_NAME, 'sender@example.com'))
+        msg['To'] = recipient
+        msg['Subject'] = mailer.settings.EMAIL_SUBJECT
+        msg.attach(MIMEText(html_template.format(
+            name=name,
+            event_name=mailer.settings.EVENT_NAME,
+            sender_organization=mailer.settings.SENDER_ORGANIZATION,
+            team_members_signature=mailer.settings.TEAM_MEMBERS_SIGNATURE,
+        ), 'html'))
+        msg.attach(image_part)
+        part = MIMEBase('application', 'octet-stream')
+        part.set_payload(certificate_data)
+        encoders.encode_base64(part)
+        part.add_header("Content-Disposition", f"attachment; filename= {certificate_filename}")
+        msg.attach(part)
+        # What smtplib.send_message() does before handing the bytes to sendmail()
+        with io.BytesIO() as buffer:
+            BytesGenerator(buffer).flatten(msg, linesep='\r\n')
+            return buffer.getvalue()
+
+    return build
+
+
+def measure(build, messages, certificate_data):
+    """Return (seconds per message, peak traced bytes per message, message size)."""
+    started = time.perf_counter()
+    for i in range(messages):
+        payload = build(f'student{i}@example.com', f'Student {i}', f'Student {i}.pdf', certificate_data)
+    per_message = (time.perf_counter() - started) / messages
+
+    tracemalloc.start()
+    build('student@example.com', 'Student', 'Student.pdf', certificate_data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return per_message, peak, len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--certificate-kb', type=int, default=150)
+    args = parser.parse_args()
+
+    with open(os.path.join(REPO_ROOT, 'logo.jpg'), 'rb') as f:
+        logo_data = f.read()
+    certificate_data = os.urandom(args.certificate_kb * 1024)
+
+    builders = [
+        ('legacy MIME', legacy_builder(logo_data)),
+        ('template', mailer.MessageTemplate('sender@example.com', logo_data).build),
+    ]
+    print(f"{'builder':<12} {'ms/msg':>8} {'peak alloc KB':>14} {'size KB':>8}")
+    for label, build in builders:
+        per_message, peak, size = measure(build, args.messages, certificate_data)
+        print(f"{label:<12} {per_message * 1000:>8.2f} {peak / 1024:>14.0f} {size / 1024:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Measure peak RSS of reading the roster at 10k/100k/1M rows.
+
+Each measurement runs in a fresh subprocess so the peaks don't mix. The
+"list" mode is the old `students = list(reader)` approach; "stream" is
+count_csv_rows() for the progress total plus iter_students() feeding
+validation one row at a time.
+
+Usage:
+    python benchmarks/bench_roster_memory.py --rows 10000 100000 1000000
+"""
+
+import argparse
+import csv
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import REPO_ROOT  # noqa: F401  (puts the mailer on sys.path)
+
+
+def child(mode, path):
+    import certificate_mailer as mailer
+
+    started = time.perf_counter()
+    if mode == 'list':
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader)
+            students = list(reader)
+        total = len(students)
+        valid = sum(1 for name, email in students if mailer.validate_email(email))
+    else:
+        total = mailer.count_csv_rows(path)
+        valid = sum(1 for name, email in mailer.iter_students(path) if mailer.validate_email(email))
+    elapsed = time.perf_counter() - started
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{total} {valid} {elapsed:.3f} {peak_kb}")
+
+
+def write_roster(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Name', 'Email'])
+        for i in range(rows):
+            writer.writerow([f'Student {i}', f'student{i}@example.com'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    folder = tempfile.mkdtemp(prefix='mailer-roster-')
+    try:
+        print(f"{'rows':>9} {'mode':>7} {'seconds':>8} {'peak RSS MB':>12}")
+        for rows in args.rows:
+            path = os.path.join(folder, f'students_{rows}.csv')
+            write_roster(path, rows)
+            for mode in ('list', 'stream'):
+                output = subprocess.check_output([sys.executable, __file__, '--child', mode, path], text=True)
+                total, valid, elapsed, peak_kb = output.split()
+                print(f"{rows:>9} {mode:>7} {float(elapsed):>8.2f} {int(peak_kb) / 1024:>12.1f}")
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main()
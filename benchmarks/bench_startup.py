@@ -0,0 +1,104 @@
+"""
+Cold-start time of the mailer's command line, and which modules it imports.
+
+Runs ``python -m certificate_mailer --help`` and a ``--dry-run`` over a small
+synthetic roster in fresh interpreters, reports the median wall time of each
+next to a bare ``python -c pass``, and uses ``-X importtime`` to check that
+neither command loads modules it has no use for (smtplib, asyncio, the
+email.mime classes). With --check, exits 1 if a budget is exceeded or a
+forbidden module shows up, so CI can keep startup from creeping back up.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --check --help-budget 150 --dry-run-budget 400
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+from common import REPO_ROOT, make_workspace
+
+# Modules that --help and --dry-run should never import
+FORBIDDEN_MODULES = ('smtplib', 'asyncio', 'ssl', 'email.mime')
+
+
+def command_env():
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    env.pop('PYTHONPROFILEIMPORTTIME', None)
+    return env
+
+
+def run(args, workspace, extra=()):
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, *extra, *args], cwd=workspace, env=command_env(),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} exited with {result.returncode}:\n{result.stderr[-2000:]}")
+    return elapsed, result.stderr
+
+
+def imported_modules(args, workspace):
+    """Names of the modules a command imports, from ``-X importtime``."""
+    _, stderr = run(args, workspace, extra=('-X', 'importtime'))
+    modules = set()
+    for line in stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            name = line.rsplit('|', 1)[1].strip()
+            if name != 'imported package':
+                modules.add(name)
+    return modules
+
+
+def forbidden(modules):
+    return sorted(name for name in modules
+                  if any(name == banned or name.startswith(banned + '.') for banned in FORBIDDEN_MODULES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=7, help='Runs per command (the median is reported)')
+    parser.add_argument('--students', type=int, default=20, help='Roster size for the dry run')
+    parser.add_argument('--help-budget', type=float, default=150, metavar='MS')
+    parser.add_argument('--dry-run-budget', type=float, default=400, metavar='MS')
+    parser.add_argument('--check', action='store_true', help='Exit 1 if a budget or the import check fails')
+    args = parser.parse_args()
+
+    workspace = make_workspace(args.students, certificate_size=10 * 1024)
+    with open(os.path.join(workspace, 'config.py'), 'w', encoding='utf-8') as f:
+        f.write("EMAIL_ADDRESS = 'sender@example.com'\nEMAIL_PASSWORD = 'unused'\n")
+
+    commands = [
+        ('python -c pass', ['-c', 'pass'], None),
+        ('--help', ['-m', 'certificate_mailer', '--help'], args.help_budget),
+        ('--dry-run', ['-m', 'certificate_mailer', '--dry-run'], args.dry_run_budget),
+    ]
+    failures = []
+    try:
+        print(f"{'command':<16} {'median ms':>10} {'min ms':>8} {'budget ms':>10}")
+        for label, command, budget in commands:
+            times = [run(command, workspace)[0] * 1000 for _ in range(args.runs)]
+            median = statistics.median(times)
+            print(f"{label:<16} {median:>10.1f} {min(times):>8.1f} {budget if budget else '-':>10}")
+            if budget and median > budget:
+                failures.append(f"{label} took {median:.0f} ms (budget {budget:.0f} ms)")
+            if budget:
+                unwanted = forbidden(imported_modules(command, workspace))
+                if unwanted:
+                    failures.append(f"{label} imports {', '.join(unwanted)}")
+    finally:
+        shutil.rmtree(workspace)
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if args.check and failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Per-recipient cost of rendering the email body.
+
+Compares the original approach - ``html_template.format(...)`` with every
+field for every student - against CompiledTemplate, where the run-constant
+fields are rendered once and only ``{name}`` is filled in per student. Also
+times the full body step of MessageTemplate.build() (HTML + plain text,
+rendered and base64-encoded).
+
+Usage:
+    python benchmarks/bench_templates.py --recipients 100000
+"""
+
+import argparse
+import os
+import time
+
+from common import REPO_ROOT
+
+import certificate_mailer as mailer
+
+
+def per_recipient(render, recipients):
+    """Return microseconds per call of render(name) over `recipients` distinct names."""
+    names = [f'Student {i:06d}' for i in range(recipients)]
+    started = time.perf_counter()
+    for name in names:
+        render(name)
+    return (time.perf_counter() - started) / recipients * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--recipients', type=int, default=100000)
+    args = parser.parse_args()
+
+    with open(mailer.settings.HTML_TEMPLATE_PATH, encoding='utf-8') as f:
+        source = f.read()
+    fields = {
+        'event_name': mailer.settings.EVENT_NAME,
+        'sender_organization': mailer.settings.SENDER_ORGANIZATION,
+        'team_members_signature': mailer.settings.TEAM_MEMBERS_SIGNATURE,
+    }
+    compiled = mailer.CompiledTemplate(source, escape=True).partial(**fields)
+    with open(os.path.join(REPO_ROOT, 'logo.jpg'), 'rb') as f:
+        template = mailer.MessageTemplate('sender@example.com', f.read())
+
+    def body_parts(name):
+        mailer.encode_base64_lines(template.render_text(name))
+        mailer.encode_base64_lines(template.render_html(name))
+
+    cases = [
+        ('str.format + encode', lambda name: source.format(name=name, **fields).encode('utf-8')),
+        ('compiled render', lambda name: compiled.render(name=name)),
+        ('html + text, base64', body_parts),
+    ]
+    print(f"{args.recipients} recipients, {len(source.encode('utf-8'))} byte HTML template")
+    print(f"{'case':<22} {'us/recipient':>13}")
+    for label, render in cases:
+        print(f"{label:<22} {per_recipient(render, args.recipients):>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Measure how delivery throughput scales with the number of SMTP worker connections.
+
+Usage:
+    python benchmarks/bench_workers.py --students 200 --latency 0.05 --workers 1 2 4 8
+"""
+
+import argparse
+import shutil
+import time
+
+from common import make_workspace, point_mailer_at, quiet
+from smtp_sink import SMTPSink
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--certificate-kb', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help='Simulated server latency per message in seconds')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    workspace = make_workspace(args.students, args.certificate_kb * 1024)
+    try:
+        print(f"{'workers':>8} {'sent':>6} {'seconds':>9} {'msg/s':>9}")
+        for workers in args.workers:
+            with SMTPSink(latency=args.latency) as sink:
+                mailer = point_mailer_at(workspace, sink)
+                started = time.perf_counter()
+                with quiet():
+                    stats = mailer.send_certificate_emails(workers=workers)
+                elapsed = time.perf_counter() - started
+            print(f"{workers:>8} {stats['sent']:>6} {elapsed:>9.2f} {stats['sent'] / elapsed:>9.1f}")
+    finally:
+        shutil.rmtree(workspace)
+
+
+if __name__ == '__main__':
+    main()
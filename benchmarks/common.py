@@ -0,0 +1,69 @@
+"""Shared helpers for the benchmark scripts."""
+
+import contextlib
+import csv
+import io
+import logging
+import os
+import sys
+import tempfile
+
+# Make the mailer importable when running `python benchmarks/<script>.py`
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# Keep the mailer's per-message log lines out of the benchmark output
+logging.basicConfig(level=logging.WARNING)
+
+
+def make_workspace(students, certificate_size=100 * 1024, logo_path=None):
+    """
+    Create a temporary folder with a roster, one certificate per student and a logo.
+
+    Returns the path of the folder. The caller owns it and should remove it.
+    """
+    from certificate_mailer import settings
+
+    root = tempfile.mkdtemp(prefix='mailer-bench-')
+    certificates = os.path.join(root, 'certificates')
+    os.makedirs(certificates)
+    payload = os.urandom(certificate_size)
+
+    with open(os.path.join(root, 'students.csv'), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Name', 'Email'])
+        for i in range(students):
+            name = f'Student {i:06d}'
+            writer.writerow([name, f'student{i}@example.com'])
+            filename = settings.CERTIFICATE_FILENAME_FORMAT.format(name=name.title())
+            with open(os.path.join(certificates, filename), 'wb') as cert:
+                cert.write(payload)
+
+    logo_source = logo_path or os.path.join(REPO_ROOT, 'logo.jpg')
+    with open(logo_source, 'rb') as src, open(os.path.join(root, 'logo.jpg'), 'wb') as dst:
+        dst.write(src.read())
+    return root
+
+
+def point_mailer_at(workspace, sink=None):
+    """Point the mailer's settings at a workspace and an SMTP sink; returns the package."""
+    import certificate_mailer as mailer
+
+    settings = mailer.settings
+    settings.STUDENT_LIST_CSV = os.path.join(workspace, 'students.csv')
+    settings.LOGO_IMAGE_PATH = os.path.join(workspace, 'logo.jpg')
+    settings.CERTIFICATES_FOLDER = os.path.join(workspace, 'certificates')
+    settings.LOG_FOLDER = os.path.join(workspace, 'logs')
+    settings.RETRY_DELAY = 0
+    if sink is not None:
+        settings.SMTP_SERVER, settings.SMTP_PORT = sink.address
+        settings.SMTP_USE_TLS = False
+    return mailer
+
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow the progress bar that the mailer prints to stdout."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
@@ -0,0 +1,135 @@
+"""
+End-to-end benchmark suite for send_certificate_emails() against a local SMTP sink.
+
+Each scenario runs in a fresh process: it starts benchmarks/smtp_sink.py in
+its own process (so the sink's CPU isn't charged to the mailer), synthesizes
+N students with certificates of the requested size, sends to all of them and
+reports messages/sec, the mailer's CPU time and its peak RSS.
+
+Usage:
+    python benchmarks/run_benchmarks.py                          # default suite
+    python benchmarks/run_benchmarks.py --scenario threads-4 async-4 --students 500
+    python benchmarks/run_benchmarks.py --save baseline.json
+    python benchmarks/run_benchmarks.py --compare baseline.json  # exit 1 on regression
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import time
+import types
+
+from common import make_workspace, point_mailer_at, quiet
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# name -> mailer options and sink faults
+SCENARIOS = {
+    'serial': {'workers': 1},
+    'threads-4': {'workers': 4},
+    'async-4': {'workers': 4, 'use_async': True},
+    'async-4-throttled': {'workers': 4, 'use_async': True, 'throttle_rate': 0.05},
+    'threads-4-flaky': {'workers': 4, 'failure_rate': 0.02, 'throttle_rate': 0.02, 'throttle_code': 421},
+}
+
+
+def start_sink(latency, failure_rate, throttle_rate, throttle_code, seed):
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, 'smtp_sink.py'), '--latency', str(latency),
+         '--failure-rate', str(failure_rate), '--throttle-rate', str(throttle_rate),
+         '--throttle-code', str(throttle_code), '--seed', str(seed)],
+        stdout=subprocess.PIPE, text=True)
+    _, host, port = process.stdout.readline().split()
+    return process, (host, int(port))
+
+
+def run_scenario(name, args):
+    """Run one scenario in this process and return its measurements."""
+    options = dict(SCENARIOS[name])
+    sink_options = {key: options.pop(key, default) for key, default in
+                    (('failure_rate', 0.0), ('throttle_rate', 0.0), ('throttle_code', 451))}
+    sink, address = start_sink(args.latency, seed=args.seed, **sink_options)
+    workspace = make_workspace(args.students, args.certificate_kb * 1024)
+    try:
+        mailer = point_mailer_at(workspace, types.SimpleNamespace(address=address))
+        mailer.settings.BACKOFF_BASE = args.backoff
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        with quiet():
+            stats = mailer.send_certificate_emails(rate=0, daily_cap=0, **options)
+        cpu = time.process_time() - cpu
+        wall = time.perf_counter() - wall
+    finally:
+        sink.terminate()
+        sink.wait()
+        shutil.rmtree(workspace)
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    return {
+        'scenario': name,
+        'students': args.students,
+        'sent': stats['sent'],
+        'errors': stats['errors'],
+        'seconds': round(wall, 3),
+        'messages_per_second': round(stats['sent'] / wall, 2),
+        'cpu_seconds': round(cpu, 3),
+        'cpu_ms_per_message': round(cpu * 1000 / max(stats['sent'], 1), 3),
+        'peak_rss_mb': round(peak_mb, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenario', nargs='+', choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--certificate-kb', type=int, default=150)
+    parser.add_argument('--latency', type=float, default=0.02, help='Sink latency per message (seconds)')
+    parser.add_argument('--backoff', type=float, default=0.05, help='BACKOFF_BASE used by the async sender')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--save', metavar='PATH', help='Write the results as JSON')
+    parser.add_argument('--compare', metavar='PATH', help='Fail if msg/s drops more than --tolerance vs. PATH')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--child', metavar='SCENARIO', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_scenario(args.child, args)))
+        return
+
+    forwarded = ['--students', str(args.students), '--certificate-kb', str(args.certificate_kb),
+                 '--latency', str(args.latency), '--backoff', str(args.backoff), '--seed', str(args.seed)]
+    results = []
+    print(f"{'scenario':<20} {'sent':>6} {'errors':>6} {'msg/s':>8} {'CPU ms/msg':>10} {'peak MB':>8}")
+    for name in args.scenario:
+        output = subprocess.check_output([sys.executable, __file__, '--child', name] + forwarded, text=True)
+        result = json.loads(output.strip().splitlines()[-1])
+        results.append(result)
+        print(f"{name:<20} {result['sent']:>6} {result['errors']:>6} {result['messages_per_second']:>8.1f} "
+              f"{result['cpu_ms_per_message']:>10.2f} {result['peak_rss_mb']:>8.1f}")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = {result['scenario']: result for result in json.load(f)}
+        regressions = []
+        for result in results:
+            before = baseline.get(result['scenario'])
+            if before and result['messages_per_second'] < before['messages_per_second'] * (1 - args.tolerance):
+                regressions.append(f"{result['scenario']}: {before['messages_per_second']} -> "
+                                   f"{result['messages_per_second']} msg/s")
+        if regressions:
+            print("\n❌ Throughput regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print("\n✅ No throughput regressions")
+
+
+if __name__ == '__main__':
+    main()
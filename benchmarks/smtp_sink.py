@@ -0,0 +1,216 @@
+"""
+A tiny SMTP sink for benchmarking the mailer without touching Gmail.
+
+It speaks just enough SMTP for smtplib: EHLO/HELO, AUTH PLAIN/LOGIN (any
+credentials are accepted), MAIL, RCPT, DATA, RSET, NOOP and QUIT. Messages are
+counted and discarded. STARTTLS is not offered, so run the mailer with
+SMTP_USE_TLS = False against it.
+
+Faults can be injected per message: a fraction of messages is rejected
+permanently (554) and another fraction is throttled (451 by default, or 421,
+which also closes the connection), the way providers push back under load.
+A per-sender quota makes the sink answer "550 5.4.5 Daily user sending limit
+exceeded" once an envelope sender has sent that many messages, like Gmail.
+
+Run it standalone (e.g. in its own process, so it doesn't share the mailer's
+CPU) with:
+    python benchmarks/smtp_sink.py --latency 0.05 --throttle-rate 0.02
+"""
+
+import argparse
+import collections
+import random
+import socketserver
+import threading
+import time
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Handle one SMTP session."""
+
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        sink = self.server.sink
+        sender = ''
+        self.reply('220 localhost SMTP sink ready')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+
+            if verb in ('EHLO', 'HELO'):
+                self.wfile.write(b'250-localhost\r\n250-AUTH PLAIN LOGIN\r\n250-8BITMIME\r\n250 SIZE 52428800\r\n')
+            elif verb == 'AUTH':
+                parts = command.split()
+                if len(parts) >= 2 and parts[1].upper() == 'LOGIN':
+                    # Username and password prompts; the answers are ignored
+                    if len(parts) == 2:
+                        self.reply('334 VXNlcm5hbWU6')
+                        self.rfile.readline()
+                    self.reply('334 UGFzc3dvcmQ6')
+                    self.rfile.readline()
+                elif len(parts) == 2:
+                    self.reply('334 ')
+                    self.rfile.readline()
+                if sink.login_latency:
+                    time.sleep(sink.login_latency)
+                sink.count('logins')
+                self.reply('235 2.7.0 Authentication successful')
+            elif verb == 'MAIL':
+                sender = command.split(':', 1)[-1].split('>', 1)[0].strip(' <').lower()
+                self.reply('250 OK')
+            elif verb in ('RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                size = 0
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line == b'.\r\n':
+                        break
+                    size += len(data_line)
+                if sink.latency:
+                    time.sleep(sink.latency)
+                fault = sink.pick_fault()
+                if not sink.within_quota(sender):
+                    sink.count('over_quota')
+                    self.reply('550 5.4.5 Daily user sending limit exceeded')
+                elif fault == 'reject':
+                    sink.count('rejected')
+                    self.reply('554 5.7.1 Message rejected by sink')
+                elif fault == 'throttle':
+                    sink.count('throttled')
+                    if sink.throttle_code == 421:
+                        self.reply('421 4.7.0 Too many messages, closing connection')
+                        return
+                    self.reply(f'{sink.throttle_code} 4.7.0 Try again later')
+                else:
+                    sink.count('messages', size)
+                    self.reply('250 2.0.0 OK queued')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class _ThreadingSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPSink:
+    """
+    A local SMTP server running in a background thread.
+
+    Args:
+        latency (float): Seconds to wait before acknowledging each message,
+            simulating the round-trip of a real provider.
+        failure_rate (float): Fraction of messages rejected with 554.
+        throttle_rate (float): Fraction of messages answered with `throttle_code`.
+        throttle_code (int): 450/451/452/454, or 421 to also drop the connection.
+        seed (int): Seed for fault injection, so runs are reproducible.
+        sender_quota (int): Messages accepted per envelope sender before
+            replying 550 5.4.5 (None = unlimited).
+        login_latency (float): Seconds to wait before accepting a login,
+            standing in for a real provider's TLS handshake and AUTH.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, failure_rate=0.0, throttle_rate=0.0,
+                 throttle_code=451, seed=None, sender_quota=None, login_latency=0.0):
+        self.latency = latency
+        self.login_latency = login_latency
+        self.failure_rate = failure_rate
+        self.throttle_rate = throttle_rate
+        self.throttle_code = throttle_code
+        self.messages = 0
+        self.logins = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.bytes_received = 0
+        self.over_quota = 0
+        self.sender_quota = sender_quota
+        self.by_sender = collections.Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _ThreadingSMTPServer((host, port), _SMTPHandler)
+        self._server.sink = self
+        self._thread = None
+
+    @property
+    def address(self):
+        return self._server.server_address
+
+    def pick_fault(self):
+        """Decide whether the next message is accepted, rejected or throttled."""
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.failure_rate:
+            return 'reject'
+        if roll < self.failure_rate + self.throttle_rate:
+            return 'throttle'
+        return None
+
+    def within_quota(self, sender):
+        """Count one message for `sender`; False once it is over ``sender_quota``."""
+        with self._lock:
+            if self.sender_quota is not None and self.by_sender[sender] >= self.sender_quota:
+                return False
+            self.by_sender[sender] += 1
+            return True
+
+    def count(self, counter, size=0):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+            self.bytes_received += size
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local SMTP sink until interrupted.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0, help='0 picks a free port')
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-code', type=int, default=451)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--sender-quota', type=int, default=None)
+    parser.add_argument('--login-latency', type=float, default=0.0)
+    args = parser.parse_args()
+
+    sink = SMTPSink(args.host, args.port, args.latency, args.failure_rate, args.throttle_rate,
+                    args.throttle_code, args.seed, args.sender_quota, args.login_latency)
+    host, port = sink.address
+    print(f"listening {host} {port}", flush=True)
+    try:
+        sink.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
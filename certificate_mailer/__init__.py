@@ -0,0 +1,75 @@
+"""
+Automated Certificate Mailer - send personalized certificates via email.
+
+Importing the package is cheap: it loads neither config.py nor smtplib, and
+the names below are imported from their modules on first access, e.g.::
+
+    from certificate_mailer import settings, send_certificate_emails
+    settings.STUDENT_LIST_CSV = 'day2/students.csv'
+    stats = send_certificate_emails(dry_run=True)
+
+Run it from the command line with ``certificate-mailer`` or
+``python -m certificate_mailer``.
+"""
+
+__version__ = '2.0'
+
+from . import settings  # noqa: F401  (public: certificate_mailer.settings)
+
+# Public name -> module that defines it, imported on first access
+_EXPORTS = {
+    'send_certificate_emails': 'sender',
+    'validate_only': 'validation',
+    'validate_roster': 'validation',
+    'DomainResolver': 'validation',
+    'StaticResolver': 'validation',
+    'RosterIssue': 'validation',
+    'CertificateIndex': 'certificates',
+    'certificate_filename_for': 'certificates',
+    'find_missing_certificates': 'certificates',
+    'CompiledTemplate': 'template_engine',
+    'load_template': 'template_engine',
+    'MessageTemplate': 'message',
+    'encode_base64_lines': 'message',
+    'AttachmentCache': 'attachments',
+    'SendJournal': 'journal',
+    'certificate_digest': 'journal',
+    'CertificateManifest': 'manifest',
+    'Event': 'events',
+    'load_events': 'events',
+    'CertificateLinks': 'links',
+    'LinkSigner': 'links',
+    'LocalDirectoryStorage': 'storage',
+    'manifest_path_for': 'manifest',
+    'SenderAccount': 'accounts',
+    'AccountScheduler': 'accounts',
+    'load_sender_accounts': 'accounts',
+    'TokenBucket': 'ratelimit',
+    'AIMDThrottle': 'ratelimit',
+    'RunMetrics': 'metrics',
+    'MessagePipeline': 'pipeline',
+    'open_smtp_connection': 'transport',
+    'deliver_message': 'transport',
+    'count_csv_rows': 'utils',
+    'iter_students': 'utils',
+    'validate_email': 'utils',
+    'ConfigError': 'settings',
+    'load_config': 'settings',
+    'main': 'cli',
+}
+
+__all__ = ['__version__', 'settings'] + sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(f'{__name__}.{module}'), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,166 @@
+"""
+Sender accounts and the scheduler that shards recipients across them.
+"""
+
+import hashlib
+import math
+import re
+import threading
+
+from . import settings
+from .ratelimit import smtp_reply_code
+
+# Reply text providers use when the sending account has used up its quota
+# (e.g. Gmail's "550 5.4.5 Daily user sending limit exceeded")
+QUOTA_REPLY_MARKERS = ('5.4.5', 'sending limit', 'sending quota', 'daily user sending')
+
+# Enhanced status codes for a full recipient mailbox ("452 4.2.2 ... is over quota"), never the sender's fault
+MAILBOX_FULL_PATTERN = re.compile(r'\b[45]\.2\.2\b')
+
+def _reply_text(error):
+    import smtplib
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        text = b' '.join(reply for _, reply in error.recipients.values())
+    else:
+        text = getattr(error, 'smtp_error', b'')
+    if isinstance(text, bytes):
+        text = text.decode('utf-8', 'replace')
+    return str(text).lower()
+
+def is_recipient_refusal(error):
+    """True if the server refused the recipient (RCPT), which says nothing about the connection or the sender."""
+    import smtplib
+    return isinstance(error, smtplib.SMTPRecipientsRefused)
+
+def is_quota_error(error):
+    """
+    True if `error` says the sending account is over its quota (rather than the recipient being bad).
+
+    Only sender-side replies count: Gmail's 5.4.5 sending limit, or MAIL FROM
+    refused permanently or with a quota message. Recipient refusals and the
+    x.2.2 mailbox-full codes ("the account you tried to reach is over quota")
+    never do, so one full inbox can't take an account out of rotation.
+    """
+    import smtplib
+    code = smtp_reply_code(error)
+    if code is None or code < 400:
+        return False
+    text = _reply_text(error)
+    if MAILBOX_FULL_PATTERN.search(text) or (is_recipient_refusal(error) and '5.4.5' not in text):
+        return False
+    if isinstance(error, smtplib.SMTPSenderRefused):
+        return code >= 500 or 'quota' in text or any(marker in text for marker in QUOTA_REPLY_MARKERS)
+    return any(marker in text for marker in QUOTA_REPLY_MARKERS)
+
+class SenderAccount:
+    """
+    One mailbox or relay the mailer can send through.
+
+    ``daily_quota`` is the number of messages it may send per 24 hours
+    (None = unlimited); ``weight`` is its share of the roster relative to
+    the other accounts.
+    """
+
+    def __init__(self, address, password, server=None, port=None, use_tls=None, daily_quota=None, weight=1.0):
+        self.address = address
+        self.password = password
+        self.server = server or settings.SMTP_SERVER
+        self.port = port or settings.SMTP_PORT
+        self.use_tls = settings.SMTP_USE_TLS if use_tls is None else use_tls
+        self.daily_quota = daily_quota
+        self.weight = float(weight)
+        self.used = 0          # Deliveries counted against the quota (journal + this run)
+        self.sent = 0          # Deliveries in this run
+        self.exhausted = None  # Reason the account was taken out of rotation
+        self._hash_prefix = address.strip().lower().encode('utf-8') + b'\0'
+
+    @property
+    def available(self):
+        return self.exhausted is None and (self.daily_quota is None or self.used < self.daily_quota)
+
+    @property
+    def remaining(self):
+        return None if self.daily_quota is None else max(self.daily_quota - self.used, 0)
+
+    def score(self, email):
+        """Weighted rendezvous score of this account for `email` (highest wins)."""
+        digest = hashlib.sha1(self._hash_prefix + email.strip().lower().encode('utf-8')).digest()
+        position = (int.from_bytes(digest[:8], 'big') + 1) / (2 ** 64 + 1)  # uniform in (0, 1)
+        return -self.weight / math.log(position)
+
+def load_sender_accounts():
+    """
+    Build the sender accounts from config.py.
+
+    ``SENDER_ACCOUNTS`` is a list of dicts with ``address`` and ``password``
+    and optionally ``server``, ``port``, ``use_tls``, ``daily_quota`` and
+    ``weight``. Without it, the single ``EMAIL_ADDRESS``/``EMAIL_PASSWORD``
+    account is used with the SMTP settings above. Raises ValueError for
+    malformed entries.
+    """
+    config = settings.load_config()
+    entries = getattr(config, 'SENDER_ACCOUNTS', None)
+    if not entries:
+        return [SenderAccount(config.EMAIL_ADDRESS, config.EMAIL_PASSWORD)]
+    accounts = []
+    for number, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict) or not entry.get('address') or not entry.get('password'):
+            raise ValueError(f"SENDER_ACCOUNTS entry {number} needs an 'address' and a 'password'")
+        unknown = set(entry) - {'address', 'password', 'server', 'port', 'use_tls', 'daily_quota', 'weight'}
+        if unknown:
+            raise ValueError(f"SENDER_ACCOUNTS entry {number} has unknown keys: {', '.join(sorted(unknown))}")
+        if entry.get('weight', 1) <= 0:
+            raise ValueError(f"SENDER_ACCOUNTS entry {number} needs a positive weight")
+        accounts.append(SenderAccount(**entry))
+    addresses = [account.address.lower() for account in accounts]
+    if len(set(addresses)) != len(addresses):
+        raise ValueError("SENDER_ACCOUNTS lists the same address more than once")
+    return accounts
+
+class AccountScheduler:
+    """
+    Shards recipients across sender accounts with weighted rendezvous hashing.
+
+    Every recipient ranks the accounts by ``SenderAccount.score()`` and is
+    sent through the best one that still has quota, so a resumed run keeps
+    each recipient on the same sender, and adding or removing an account
+    only moves the recipients that belonged to it. When an account runs out
+    of quota its recipients fail over to their next-ranked account.
+    """
+
+    def __init__(self, accounts, recent_by_sender=None):
+        self.accounts = list(accounts)
+        for account in self.accounts:
+            account.used = (recent_by_sender or {}).get(account.address.lower(), 0)
+        self._lock = threading.Lock()
+
+    def ranking(self, email):
+        if len(self.accounts) == 1:
+            return self.accounts
+        return sorted(self.accounts, key=lambda account: account.score(email), reverse=True)
+
+    def reserve(self, email):
+        """Claim one message of quota on the best available account for `email`, or None if all are used up."""
+        with self._lock:
+            for account in self.ranking(email):
+                if account.available:
+                    account.used += 1
+                    return account
+        return None
+
+    def release(self, account):
+        """Give back a reservation whose message was not delivered."""
+        with self._lock:
+            account.used -= 1
+
+    def confirm(self, account):
+        with self._lock:
+            account.sent += 1
+
+    def exhaust(self, account, reason):
+        """Take `account` out of rotation; returns False if it already was."""
+        with self._lock:
+            if account.exhausted is not None:
+                return False
+            account.exhausted = reason
+            return True
@@ -0,0 +1,167 @@
+"""
+Cache of encoded certificates, shared between messages, runs and events.
+"""
+
+import collections
+import hashlib
+import os
+import threading
+import time
+
+from . import settings
+from .journal import certificate_digest
+from .message import encode_base64_lines
+
+# An encoded certificate: its sha256 (for the send journal) and its base64 body
+CachedAttachment = collections.namedtuple('CachedAttachment', ['digest', 'encoded'])
+
+class AttachmentCache:
+    """
+    Cache of base64-encoded certificates keyed by path, mtime and size.
+
+    Entries live in an in-memory LRU bounded by ``max_bytes`` of encoded
+    data and, if ``directory`` is set, also on disk, so resends and later
+    runs or events that reuse the same certificates skip reading, hashing
+    and encoding them again. Editing or replacing a certificate changes its
+    mtime/size and therefore its key, so stale entries are never served;
+    ``prune()`` removes the least recently used files once the disk copy
+    grows past ``max_disk_bytes``.
+    Safe to share between threads; two threads missing on the same file at
+    once may both encode it.
+    """
+
+    def __init__(self, max_bytes=None, directory=None, max_disk_bytes=None):
+        self.max_bytes = settings.ATTACHMENT_CACHE_BYTES if max_bytes is None else max_bytes
+        self.directory = directory
+        self.max_disk_bytes = settings.ATTACHMENT_CACHE_DIR_BYTES if max_disk_bytes is None else max_disk_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self.size = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, path):
+        """Return the CachedAttachment for the certificate at `path`, encoding it on a miss."""
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = self._load(key)
+        if entry is not None:
+            counter = 'disk_hits'
+        else:
+            counter = 'misses'
+            with open(path, 'rb') as f:
+                data = f.read()
+            entry = CachedAttachment(certificate_digest(data), encode_base64_lines(data))
+            self._store(key, entry)
+
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+            if len(entry.encoded) <= self.max_bytes and key not in self._entries:
+                self._entries[key] = entry
+                self.size += len(entry.encoded)
+                while self.size > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.size -= len(evicted.encoded)
+                    self.evictions += 1
+        return entry
+
+    def _disk_path(self, key):
+        name = hashlib.sha256('\0'.join(map(str, key)).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, name[:2], name + '.b64')
+
+    def _load(self, key):
+        if not self.directory:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                digest = f.readline().strip().decode('ascii')
+                encoded = f.read()
+        except (OSError, UnicodeDecodeError):
+            return None
+        if len(digest) != 64 or not encoded:
+            return None
+        # prune() goes by access time, which noatime/relatime mounts don't keep up to date
+        try:
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+        except OSError:
+            pass
+        return CachedAttachment(digest, encoded)
+
+    def _store(self, key, entry):
+        """Write an entry to the disk cache; a cache that can't be written is just skipped."""
+        if not self.directory:
+            return
+        path = self._disk_path(key)
+        temporary = f'{path}.{threading.get_ident()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temporary, 'wb') as f:
+                f.write(entry.digest.encode('ascii') + b'\n' + entry.encoded)
+            os.replace(temporary, path)
+        except OSError:
+            pass
+
+    def prune(self):
+        """
+        Shrink the disk cache to ``max_disk_bytes``, least recently used files first.
+
+        Also removes temporary files left behind by an interrupted run.
+        Returns the number of files removed; files that can't be removed are
+        skipped.
+        """
+        if not self.directory:
+            return 0
+        files = []
+        removed = 0
+        stale = time.time() - 3600
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                    if name.endswith('.tmp') and stat.st_mtime < stale:
+                        os.remove(path)
+                        removed += 1
+                    elif name.endswith('.b64'):
+                        files.append((stat.st_atime, stat.st_size, path))
+                except OSError:
+                    pass
+        size = sum(file_size for _, file_size, _ in files)
+        for _, file_size, path in sorted(files):
+            if size <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= file_size
+            removed += 1
+            with self._lock:
+                self.disk_evictions += 1
+        return removed
+
+    def counters(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'disk_evictions': self.disk_evictions,
+                'entries': len(self._entries),
+                'bytes': self.size,
+            }
@@ -0,0 +1,155 @@
+"""
+Finding each student's certificate in the certificates folder.
+"""
+
+import difflib
+import os
+import threading
+import unicodedata
+
+from . import settings
+from .utils import validate_email
+
+def normalize_certificate_key(filename):
+    """
+    Normalize a certificate filename for matching.
+
+    Applies Unicode NFKC normalization, case folding and whitespace
+    collapsing, so "JOSÉ  Doe.pdf" and "José Doe.pdf" (composed or not)
+    map to the same key.
+    """
+    return ' '.join(unicodedata.normalize('NFKC', filename).casefold().split())
+
+def certificate_filename_for(student_name, filename_format=None):
+    """The filename a student's certificate is expected to have (default format: settings.CERTIFICATE_FILENAME_FORMAT)."""
+    filename_format = settings.CERTIFICATE_FILENAME_FORMAT if filename_format is None else filename_format
+    return filename_format.format(name=student_name.title())
+
+def _name_affixes(filename_format):
+    """The normalized text before and after ``{name}`` in a filename format ('', '' if it can't be split)."""
+    key = normalize_certificate_key(filename_format.format(name='\0'))
+    if key.count('\0') != 1:
+        return '', ''
+    prefix, _, suffix = key.partition('\0')
+    return prefix, suffix
+
+class CertificateIndex:
+    """
+    Normalized name -> path index of the certificates folder.
+
+    Built with a single ``os.scandir`` pass, so looking up a student never
+    touches the filesystem. Students' filenames follow ``filename_format``,
+    CERTIFICATE_FILENAME_FORMAT when the index is built by default.
+
+    With ``fuzzy=True``, names that do not match exactly fall back to the
+    closest certificate, comparing only the name part of the filenames (the
+    format's shared prefix and suffix would make every pair look alike). A
+    match needs a difflib ratio of at least ``cutoff`` (CERTIFICATE_FUZZY_CUTOFF
+    by default) and is rejected if the runner-up is within
+    CERTIFICATE_FUZZY_MARGIN of it, or if the file is the exact match of a
+    student passed to ``claim_exact()``: it's better to report a certificate
+    missing than to send someone else's.
+    """
+
+    def __init__(self, folder, fuzzy=False, cutoff=None, filename_format=None):
+        self.folder = folder
+        self.fuzzy = fuzzy
+        self.cutoff = settings.CERTIFICATE_FUZZY_CUTOFF if cutoff is None else cutoff
+        self.filename_format = settings.CERTIFICATE_FILENAME_FORMAT if filename_format is None else filename_format
+        self.paths = {}
+        self.collisions = []
+        self._affixes = _name_affixes(self.filename_format)
+        self._names = {}  # Name part of the filename -> key in paths, for fuzzy matching
+        self._claimed = set()  # Keys that are some student's exact match
+        self._fuzzy_cache = {}
+        self._lock = threading.Lock()
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                key = normalize_certificate_key(entry.name)
+                if key in self.paths:
+                    self.collisions.append((self.paths[key], entry.path))
+                    continue
+                self._index(key, entry.path)
+
+    def _index(self, key, path):
+        self.paths[key] = path
+        name = self._name_part(key)
+        if name:
+            self._names[name] = key
+
+    def _name_part(self, key):
+        """The student-name part of a normalized filename, or None if it doesn't follow the format."""
+        prefix, suffix = self._affixes
+        if len(key) <= len(prefix) + len(suffix) or not (key.startswith(prefix) and key.endswith(suffix)):
+            return None
+        return key[len(prefix):len(key) - len(suffix)]
+
+    def __len__(self):
+        return len(self.paths)
+
+    def filename_for(self, student_name):
+        """The filename a student's certificate is expected to have in this folder."""
+        return certificate_filename_for(student_name, self.filename_format)
+
+    def exact(self, student_name):
+        """The certificate path whose filename is exactly the student's expected one, or None."""
+        return self.paths.get(normalize_certificate_key(self.filename_for(student_name)))
+
+    def lookup(self, student_name):
+        """Return the certificate path for a student, or None if there is none."""
+        key = normalize_certificate_key(self.filename_for(student_name))
+        path = self.paths.get(key)
+        if path is not None or not self.fuzzy:
+            return path
+        with self._lock:
+            if key not in self._fuzzy_cache:
+                self._fuzzy_cache[key] = self._closest(self._name_part(key))
+            return self._fuzzy_cache[key]
+
+    def _closest(self, name):
+        """Path of the one certificate whose name part is clearly closest to `name`, or None."""
+        if not name:
+            return None
+        margin = settings.CERTIFICATE_FUZZY_MARGIN
+        candidates = difflib.get_close_matches(name, self._names.keys(), n=2, cutoff=max(self.cutoff - margin, 0))
+        ratios = [difflib.SequenceMatcher(None, candidate, name).ratio() for candidate in candidates]
+        if not ratios or ratios[0] < self.cutoff or (len(ratios) > 1 and ratios[0] - ratios[1] <= margin):
+            return None
+        key = self._names[candidates[0]]
+        return None if key in self._claimed else self.paths[key]
+
+    def claim_exact(self, students):
+        """Reserve each (name, email) row's exact certificate for that student, so no fuzzy match hands it out."""
+        claimed = set()
+        for row in students:
+            if row:
+                key = normalize_certificate_key(self.filename_for(row[0]))
+                if key in self.paths:
+                    claimed.add(key)
+        with self._lock:
+            self._claimed |= claimed
+            self._fuzzy_cache.clear()
+
+    def add(self, path):
+        """Register a certificate created after the index was built."""
+        with self._lock:
+            self._index(normalize_certificate_key(os.path.basename(path)), path)
+            self._fuzzy_cache.clear()
+
+    def fuzzy_matches(self):
+        """(normalized expected filename, matched path) pairs resolved by fuzzy matching so far."""
+        with self._lock:
+            return [(key, path) for key, path in self._fuzzy_cache.items() if path is not None]
+
+def find_missing_certificates(index, students):
+    """Return (name, email, expected filename) for every valid student without a certificate."""
+    missing = []
+    for row in students:
+        if len(row) < 2:
+            continue
+        student_name, student_email = row[0], row[1]
+        if validate_email(student_email) and index.lookup(student_name) is None:
+            missing.append((student_name, student_email, index.filename_for(student_name)))
+    return missing
@@ -0,0 +1,195 @@
+"""
+Command-line entry point (``certificate-mailer``, ``python -m certificate_mailer``).
+
+Only argparse and the settings are imported up front, so ``--help`` and
+argument errors return immediately; the sending machinery is imported once
+the arguments are known.
+"""
+
+import argparse
+import os
+import sys
+
+from . import settings
+
+def _installed():
+    """True when running from an installed copy (site-packages) rather than a checkout."""
+    return os.path.basename(os.path.dirname(os.path.dirname(os.path.abspath(settings.__file__)))) in (
+        'site-packages', 'dist-packages')
+
+# ==============================================================================
+# --- 🚀 MAIN ENTRY POINT ---
+# ==============================================================================
+
+def main(argv=None):
+    """Parse the command line and run the mailer."""
+    # Apply the event settings first, so the defaults below (and in --help) include them
+    early = argparse.ArgumentParser(add_help=False)
+    early.add_argument('--settings')
+    settings_path = early.parse_known_args(argv)[0].settings
+    event_settings = settings_error = None
+    if settings_path is None or os.path.exists(settings_path):
+        try:
+            event_settings = settings.load_event_settings(settings_path)
+        except settings.ConfigError as e:
+            settings_error = str(e)
+    else:
+        settings_error = f"--settings: {settings_path} not found"
+    
+    parser = argparse.ArgumentParser(
+        description='Automated Certificate Mailer - Send personalized certificates via email',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+Examples:
+  certificate-mailer                    # Send emails to all students
+  certificate-mailer --dry-run          # Test without sending
+  certificate-mailer --validate-only    # Check the roster (formats, duplicates, domains) and exit
+  certificate-mailer --delay 2          # Add 2-second delay between emails
+  certificate-mailer --retry 5          # Retry failed emails 5 times
+  certificate-mailer --verbose          # Enable verbose logging
+  certificate-mailer --workers 4        # Send over 4 parallel SMTP connections
+  certificate-mailer --resume           # Skip students already sent in a previous run
+  certificate-mailer --changed-only     # Only mail re-issued or new certificates
+  certificate-mailer --links            # Email signed download links instead of attachments
+  certificate-mailer --serve-links 8000 # Serve the published certificates, enforcing link expiry
+  certificate-mailer --events events.json   # Send several events in one run
+  certificate-mailer --fuzzy-match      # Tolerate small typos in certificate filenames
+  certificate-mailer --async --workers 3 --rate 2   # Adaptive rate limiting, 2 msg/s max
+  certificate-mailer --generate         # Render certificates from a template while sending
+  certificate-mailer --profile          # Save cProfile stats for the run to the logs folder
+  certificate-mailer --log-queue --log-format json   # Background JSON logging for high-rate runs
+        '''
+    )
+    
+    parser.add_argument('--events', metavar='MANIFEST',
+                        help='Send every event described in a JSON (or, on Python 3.11+, TOML) manifest in one run, '
+                             'sharing connections, caches and rate limits')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Test mode - validate setup without sending emails')
+    parser.add_argument('--validate-only', action='store_true',
+                        help='Check every roster row (format, certificate, duplicates, domain) and exit without logging in')
+    parser.add_argument('--offline', action='store_true',
+                        help='With --validate-only: skip DNS lookups of email domains')
+    parser.add_argument('--delay', type=int, default=0, metavar='SECONDS',
+                        help='Delay between emails in seconds (rate limiting)')
+    parser.add_argument('--retry', type=int, default=settings.MAX_RETRIES, metavar='N',
+                        help=f'Number of retry attempts for failed emails (default: {settings.MAX_RETRIES})')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                        help='Enable verbose logging')
+    parser.add_argument('--workers', type=int, default=settings.DEFAULT_WORKERS, metavar='N',
+                        help=f'Number of parallel SMTP connections (default: {settings.DEFAULT_WORKERS})')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip students whose certificate was already delivered (see the send journal)')
+    parser.add_argument('--changed-only', action='store_true',
+                        help='Only send to students whose certificate is new or changed since they were last sent one')
+    parser.add_argument('--links', action='store_true',
+                        help=f'Publish certificates to {settings.LINK_STORAGE} storage and email signed, expiring '
+                             f'download links instead of attaching them')
+    parser.add_argument('--fuzzy-match', action='store_true',
+                        help='Use the closest certificate filename when there is no exact match')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='Use the asyncio sender with adaptive, reply-code aware rate limiting')
+    parser.add_argument('--rate', type=float, default=settings.ASYNC_RATE_LIMIT, metavar='MSGS_PER_SEC',
+                        help=f'Async mode: max messages per second overall (default: {settings.ASYNC_RATE_LIMIT}, 0 = unlimited)')
+    parser.add_argument('--daily-cap', type=int, default=None, metavar='N',
+                        help=f'Async mode: max messages per 24 hours overall (default: {settings.DAILY_SEND_LIMIT}, '
+                             f'or just the per-account quotas with SENDER_ACCOUNTS; 0 = unlimited)')
+    parser.add_argument('--metrics-textfile', metavar='PATH',
+                        help='Also write run metrics in Prometheus text format to PATH')
+    parser.add_argument('--log-format', choices=('text', 'json'), default=settings.LOG_FORMAT,
+                        help=f'Log line format; json writes one object per line (default: {settings.LOG_FORMAT})')
+    parser.add_argument('--log-queue', action='store_true', default=settings.LOG_QUEUE,
+                        help='Write log lines from a background thread so senders never wait on disk or console')
+    parser.add_argument('--profile', action='store_true',
+                        help=f'Run under cProfile and save the stats to {settings.LOG_FOLDER}/')
+    parser.add_argument('--settings', metavar='PATH',
+                        help=f'Event settings file to apply (default: {settings.EVENT_SETTINGS_PATH} in the current '
+                             f'folder, if there is one)')
+    parser.add_argument('--serve-links', metavar='[HOST:]PORT',
+                        help=f'Serve {settings.LINK_STORAGE_DIR} for --links, answering only valid, unexpired '
+                             f'links (host default: 127.0.0.1), and exit when stopped')
+    parser.add_argument('--generate', action='store_true',
+                        help=f'Render certificates from {settings.CERTIFICATE_TEMPLATE_PATH} into {settings.CERTIFICATES_FOLDER} while sending')
+    
+    args = parser.parse_args(argv)
+    if settings_error:
+        parser.error(settings_error)
+    settings.LOG_FORMAT = args.log_format
+    settings.LOG_QUEUE = args.log_queue
+    
+    if args.serve_links:
+        from .linkserver import parse_address, serve_links
+        try:
+            address = parse_address(args.serve_links)
+        except ValueError:
+            parser.error(f"--serve-links: expected [HOST:]PORT, got {args.serve_links!r}")
+        try:
+            serve_links(address)
+        except (settings.ConfigError, OSError) as e:
+            parser.exit(1, f"❌ {e}\n")
+        return
+    
+    events = None
+    if args.events:
+        from .events import load_events
+        try:
+            events = load_events(args.events)
+        except (OSError, ValueError) as e:
+            parser.error(f"--events: {e}")
+    
+    print("""
+    ╔══════════════════════════════════════════════════════════════╗
+    ║         📧 Automated Certificate Mailer v2.0 📧             ║
+    ║                                                              ║
+    ║  Original Author: Karan Rathod                              ║
+    ║  Enhanced by: Siddhesh Suryawanshi                          ║
+    ╚══════════════════════════════════════════════════════════════╝
+    """)
+    if event_settings is None and events is None and _installed():
+        print(f"⚠️ No {settings.EVENT_SETTINGS_PATH} here, so the installed package's settings are used "
+              f"(event: {settings.EVENT_NAME}). Copy event_settings.example.py to {settings.EVENT_SETTINGS_PATH} "
+              f"or pass --settings/--events to set up your event.", file=sys.stderr)
+    
+    # The sending machinery is only imported once we know there is work to do
+    if args.validate_only:
+        from .events import Event
+        from .validation import validate_only
+        failing = 0
+        for event in events or [Event(settings.EVENT_NAME)]:
+            with event.applied():
+                result = validate_only(verbose=args.verbose, fuzzy_match=args.fuzzy_match, generate=args.generate,
+                                       offline=args.offline, event=event.name if events else None)
+            failing += 1 if result is None else result
+        sys.exit(0 if failing == 0 else 1)
+    
+    from .sender import send_certificate_emails
+    
+    options = dict(
+        dry_run=args.dry_run,
+        delay=args.delay,
+        retry_attempts=args.retry,
+        verbose=args.verbose,
+        workers=args.workers,
+        resume=args.resume,
+        changed_only=args.changed_only,
+        links=args.links,
+        events=events,
+        fuzzy_match=args.fuzzy_match,
+        use_async=args.use_async,
+        rate=args.rate,
+        daily_cap=args.daily_cap,
+        generate=args.generate,
+        metrics_textfile=args.metrics_textfile
+    )
+    
+    if args.profile:
+        import cProfile
+        from datetime import datetime
+        profile_path = os.path.join(settings.LOG_FOLDER, f'profile_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pstats')
+        profiler = cProfile.Profile()
+        profiler.runcall(send_certificate_emails, **options)
+        os.makedirs(settings.LOG_FOLDER, exist_ok=True)
+        profiler.dump_stats(profile_path)
+        print(f"🔬 Profile saved to {profile_path} (inspect with: python -m pstats {profile_path})")
+    else:
+        send_certificate_emails(**options)
@@ -0,0 +1,149 @@
+"""
+Multi-event batches: several events described in one manifest and sent in one run.
+
+A manifest is a JSON file (or TOML on Python 3.11+) with optional
+``defaults`` and a list of ``events``, each overriding the event settings::
+
+    {
+      "defaults": {"SENDER_ORGANIZATION": "The JIT Google Student Ambassadors Team"},
+      "events": [
+        {"name": "gemini", "EVENT_NAME": "Gemini AI Workshop",
+         "STUDENT_LIST_CSV": "gemini/students.csv", "CERTIFICATES_FOLDER": "gemini/certificates",
+         "CERTIFICATE_FILENAME_FORMAT": "{name} Gemini Ai Workshop.pdf"},
+        {"name": "cloud", "EVENT_NAME": "Cloud Study Jam",
+         "STUDENT_LIST_CSV": "cloud/students.csv", "CERTIFICATES_FOLDER": "cloud/certificates"}
+      ]
+    }
+
+Relative paths are resolved against the manifest's folder. Anything not set
+falls back to the settings module.
+"""
+
+import contextlib
+import heapq
+import json
+import os
+
+from . import settings
+
+# Settings an event may override, and which of them are paths
+EVENT_SETTINGS = (
+    'EVENT_NAME', 'EMAIL_SUBJECT', 'SENDER_NAME', 'SENDER_ORGANIZATION', 'TEAM_MEMBERS_SIGNATURE',
+    'STUDENT_LIST_CSV', 'LOGO_IMAGE_PATH', 'CERTIFICATES_FOLDER', 'CERTIFICATE_FILENAME_FORMAT',
+    'CERTIFICATE_TEMPLATE_PATH', 'CERTIFICATE_NAME_STYLE', 'HTML_TEMPLATE_PATH', 'TEXT_TEMPLATE_PATH',
+    'LINK_HTML_TEMPLATE_PATH', 'LINK_TEXT_TEMPLATE_PATH', 'LINK_LOGO_PATH',
+)
+PATH_SETTINGS = {
+    'STUDENT_LIST_CSV', 'LOGO_IMAGE_PATH', 'CERTIFICATES_FOLDER', 'CERTIFICATE_TEMPLATE_PATH',
+    'HTML_TEMPLATE_PATH', 'TEXT_TEMPLATE_PATH', 'LINK_HTML_TEMPLATE_PATH', 'LINK_TEXT_TEMPLATE_PATH',
+    'LINK_LOGO_PATH',
+}
+
+# Subject for events that set EVENT_NAME but not EMAIL_SUBJECT (same wording as settings.EMAIL_SUBJECT)
+DEFAULT_SUBJECT = "🎉 Your Certificate for the {event_name} is Here!"
+
+class Event:
+    """
+    One event's settings: the EVENT_SETTINGS it overrides, on top of the settings module.
+
+    The mailer's setup code reads the settings module, so it runs inside
+    ``applied()``, which sets the overrides on the module and restores the
+    previous values afterwards. Not thread-safe: only apply events from one
+    thread at a time.
+    """
+
+    def __init__(self, name, overrides=None):
+        self.name = name
+        self.overrides = dict(overrides or {})
+
+    def __repr__(self):
+        return f'Event({self.name!r})'
+
+    def setting(self, key):
+        """This event's value for a setting."""
+        return self.overrides[key] if key in self.overrides else getattr(settings, key)
+
+    @contextlib.contextmanager
+    def applied(self):
+        saved = {key: getattr(settings, key) for key in self.overrides}
+        for key, value in self.overrides.items():
+            setattr(settings, key, value)
+        try:
+            yield self
+        finally:
+            for key, value in saved.items():
+                setattr(settings, key, value)
+
+def _read_manifest(path):
+    if path.endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:
+            raise ValueError(f"{path}: TOML manifests need Python 3.11+, use JSON instead") from None
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_events(path):
+    """
+    Read an events manifest into a list of Events.
+
+    Raises ValueError for a manifest that can't be parsed, has no events,
+    repeats an event name or sets something that isn't in EVENT_SETTINGS.
+    """
+    try:
+        manifest = _read_manifest(path)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"{path}: {e}") from None
+    if not isinstance(manifest, dict) or not isinstance(manifest.get('events'), list) or not manifest['events']:
+        raise ValueError(f"{path}: expected an object with a non-empty \"events\" list")
+    base = os.path.dirname(os.path.abspath(path))
+    defaults = manifest.get('defaults') or {}
+
+    events = []
+    for number, entry in enumerate(manifest['events'], 1):
+        if not isinstance(entry, dict):
+            raise ValueError(f"{path}: event {number} is not an object")
+        overrides = dict(defaults, **entry)
+        name = str(overrides.pop('name', None) or overrides.get('EVENT_NAME') or f'event {number}')
+        unknown = sorted(set(overrides) - set(EVENT_SETTINGS))
+        if unknown:
+            raise ValueError(f"{path}: event {name!r} sets unknown setting(s) {', '.join(unknown)} "
+                             f"(allowed: name, {', '.join(EVENT_SETTINGS)})")
+        if any(event.name == name for event in events):
+            raise ValueError(f"{path}: more than one event is named {name!r}")
+        for key in PATH_SETTINGS & set(overrides):
+            if overrides[key]:
+                overrides[key] = os.path.join(base, overrides[key])
+        if 'EVENT_NAME' in overrides and 'EMAIL_SUBJECT' not in overrides:
+            overrides['EMAIL_SUBJECT'] = DEFAULT_SUBJECT
+        if 'EMAIL_SUBJECT' in overrides:
+            event_name = overrides.get('EVENT_NAME', settings.EVENT_NAME)
+            overrides['EMAIL_SUBJECT'] = overrides['EMAIL_SUBJECT'].replace('{event_name}', event_name)
+        events.append(Event(name, overrides))
+    return events
+
+def interleave(streams, weights=None):
+    """
+    Merge (key, iterator) streams into one iterator of (key, item) pairs.
+
+    Items are taken from each stream in proportion to its weight (e.g. its
+    number of rows), so all streams are drawn down evenly and finish at
+    about the same time; without weights (or for weights of 0/None) it is
+    plain round-robin.
+    """
+    weights = [max(weight or 1, 1) for weight in (weights or [1] * len(streams))]
+    taken = [0] * len(streams)
+    heap = [(1 / weight, index) for index, weight in enumerate(weights)]
+    heapq.heapify(heap)
+    done = object()
+    while heap:
+        _, index = heapq.heappop(heap)
+        key, items = streams[index]
+        item = next(items, done)
+        if item is done:
+            continue
+        yield key, item
+        taken[index] += 1
+        heapq.heappush(heap, ((taken[index] + 1) / weights[index], index))
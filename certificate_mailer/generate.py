@@ -0,0 +1,199 @@
+"""
+Certificate generation (``--generate``): one PDF per student from a JPEG background.
+
+Uses only the standard library: the JPEG is embedded as-is (DCTDecode) and
+the name is drawn with the built-in Helvetica-Bold font, so no font files
+are needed. The sender streams the rendered certificates straight into the
+send pipeline.
+"""
+
+import os
+import struct
+import unicodedata
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from . import settings
+
+PAGE_WIDTH = 842  # points (A4 landscape width); the height follows the template's aspect ratio
+MAX_NAME_WIDTH = 0.8  # Shrink the font if the name is wider than this fraction of the page
+
+# Helvetica-Bold advance widths (1/1000 em) for printable ASCII, from the standard AFM metrics
+_HELVETICA_BOLD_WIDTHS = dict(zip(
+    range(32, 127),
+    [278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+     556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+     975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+     667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+     333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+     611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584]
+))
+_DEFAULT_WIDTH = 556
+
+# Per-process cache of templates by (path, style), so each worker reads a template once, not per student
+_templates = {}
+
+def text_width(text, font_size):
+    """Width of `text` in points when set in Helvetica-Bold at `font_size`."""
+    total = 0
+    for char in text:
+        code = ord(char)
+        if code not in _HELVETICA_BOLD_WIDTHS:
+            # Accented letters are as wide as their base letter
+            base = unicodedata.normalize('NFKD', char)[:1]
+            code = ord(base) if base else code
+        total += _HELVETICA_BOLD_WIDTHS.get(code, _DEFAULT_WIDTH)
+    return total * font_size / 1000.0
+
+def jpeg_info(data):
+    """Return (width, height, components) from a JPEG's start-of-frame marker."""
+    if data[:2] != b'\xff\xd8':
+        raise ValueError("Certificate template is not a JPEG image")
+    offset = 2
+    while offset + 4 <= len(data):
+        if data[offset] != 0xFF:
+            offset += 1
+            continue
+        marker = data[offset + 1]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+            offset += 1 if marker == 0xFF else 2
+            continue
+        length = struct.unpack('>H', data[offset + 2:offset + 4])[0]
+        # SOF0-SOF15, except DHT (C4), JPG (C8) and DAC (CC)
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack('>HH', data[offset + 5:offset + 9])
+            return width, height, data[offset + 9]
+        offset += 2 + length
+    raise ValueError("Could not find the image size in the certificate template")
+
+def _pdf_string(text):
+    """Encode text as a PDF literal string in WinAnsiEncoding (cp1252)."""
+    raw = unicodedata.normalize('NFC', text).encode('cp1252', errors='replace')
+    return b'(' + raw.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+class CertificateTemplate:
+    """
+    A certificate PDF with everything but the student's name pre-serialized.
+
+    The catalog, page, font and background image objects are written once;
+    ``render()`` only appends the page's content stream and the xref table.
+    """
+
+    def __init__(self, image_data, style=None):
+        self.style = dict(settings.CERTIFICATE_NAME_STYLE, **(style or {}))
+        width, height, components = jpeg_info(image_data)
+        self.page_width = PAGE_WIDTH
+        self.page_height = round(PAGE_WIDTH * height / width, 2)
+        color_space = {1: b'/DeviceGray', 3: b'/DeviceRGB', 4: b'/DeviceCMYK'}.get(components, b'/DeviceRGB')
+
+        objects = [
+            b'<< /Type /Catalog /Pages 2 0 R >>',
+            b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %g %g] '
+            b'/Resources << /XObject << /Bg 4 0 R >> /Font << /F1 5 0 R >> >> /Contents 6 0 R >>'
+            % (self.page_width, self.page_height),
+            b'<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s '
+            b'/BitsPerComponent 8 /Filter /DCTDecode /Length %d >>\nstream\n'
+            % (width, height, color_space, len(image_data)) + image_data + b'\nendstream',
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>',
+        ]
+        prefix = [b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n']
+        self._offsets = []
+        position = len(prefix[0])
+        for number, body in enumerate(objects, 1):
+            chunk = b'%d 0 obj\n' % number + body + b'\nendobj\n'
+            self._offsets.append(position)
+            prefix.append(chunk)
+            position += len(chunk)
+        self._prefix = b''.join(prefix)
+
+    def render(self, name):
+        """Return the PDF bytes for a certificate bearing `name`."""
+        font_size = self.style['font_size']
+        width = text_width(name, font_size)
+        if width > self.page_width * MAX_NAME_WIDTH:
+            font_size *= self.page_width * MAX_NAME_WIDTH / width
+            width = self.page_width * MAX_NAME_WIDTH
+        x = self.page_width * self.style['position'][0] - width / 2
+        y = self.page_height * self.style['position'][1] - font_size / 3
+        r, g, b = self.style['color']
+        content = (
+            b'q %g 0 0 %g 0 0 cm /Bg Do Q\n' % (self.page_width, self.page_height)
+            + b'BT /F1 %.2f Tf %.3f %.3f %.3f rg %.2f %.2f Td ' % (font_size, r, g, b, x, y)
+            + _pdf_string(name) + b' Tj ET\n'
+        )
+        stream = b'6 0 obj\n<< /Length %d >>\nstream\n' % len(content) + content + b'endstream\nendobj\n'
+        offsets = self._offsets + [len(self._prefix)]
+        xref_at = len(self._prefix) + len(stream)
+        xref = [b'xref\n0 7\n0000000000 65535 f \n']
+        xref.extend(b'%010d 00000 n \n' % offset for offset in offsets)
+        trailer = b'trailer\n<< /Size 7 /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % xref_at
+        return b''.join([self._prefix, stream] + xref + [trailer])
+
+def _template(template_path, style):
+    key = (template_path, repr(sorted(style.items())))
+    if key not in _templates:
+        with open(template_path, 'rb') as f:
+            _templates[key] = CertificateTemplate(f.read(), style)
+    return _templates[key]
+
+def render_certificate(name, path, template_path, style):
+    """Render one certificate to `path` (runs in a worker process)."""
+    temporary = path + '.part'
+    with open(temporary, 'wb') as f:
+        f.write(_template(template_path, style).render(name))
+    os.replace(temporary, path)
+    return path
+
+def open_render_pool(workers=None):
+    """
+    Start the worker processes for generate_certificates().
+
+    The processes are started right away rather than on first use, so open
+    the pool before starting any threads (forking a process that has other
+    threads running can deadlock the child). One pool serves any number of
+    templates and output folders, e.g. all the events of a run.
+    """
+    pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+    pool.submit(os.getpid).result()
+    return pool
+
+def generate_certificates(students, template_path, output_folder, filename_for, workers=None, style=None, pool=None):
+    """
+    Render certificates for a stream of (name, email) rows using a process pool.
+
+    Yields ``(row, path, error)`` in roster order as soon as each certificate
+    is written, keeping at most a few tasks per worker in flight, so the
+    caller can start sending the first certificates while later ones are
+    still rendering. ``filename_for(name)`` gives each certificate's filename;
+    the name drawn on the certificate is ``name.title()``. ``style``
+    overrides settings.CERTIFICATE_NAME_STYLE. Renders in ``pool`` (see
+    open_render_pool(); ``workers`` should be its size), or in a pool of
+    its own.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    # Resolved here, since worker processes may not see overrides made to the settings module
+    style = dict(settings.CERTIFICATE_NAME_STYLE, **(style or {}))
+    own_pool = pool is None
+    if own_pool:
+        pool = open_render_pool(workers)
+    pending = deque()
+    try:
+        for row in students:
+            name = row[0] if row else ''
+            path = os.path.join(output_folder, filename_for(name))
+            pending.append((row, pool.submit(render_certificate, name.title(), path, template_path, style)))
+            if len(pending) >= workers * 4:
+                yield _collect(*pending.popleft())
+        while pending:
+            yield _collect(*pending.popleft())
+    finally:
+        if own_pool:
+            pool.shutdown()
+
+def _collect(row, future):
+    try:
+        return row, future.result(), None
+    except Exception as e:
+        return row, None, e
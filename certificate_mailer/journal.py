@@ -0,0 +1,110 @@
+"""
+The send journal that ``--resume`` and the daily quotas are based on.
+"""
+
+import collections
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from . import settings
+
+def certificate_digest(certificate_data):
+    """Content hash used to tell re-issued certificates apart from ones already sent."""
+    return hashlib.sha256(certificate_data).hexdigest()
+
+class SendJournal:
+    """
+    Append-only JSONL ledger of successful deliveries.
+
+    Each line records one delivery keyed by recipient email and certificate
+    hash, together with the SMTP server's response. The file is loaded into
+    an in-memory set on startup so ``was_delivered()`` is O(1), and writes
+    are flushed and fsync'ed in batches rather than once per email. A
+    truncated last line (from a crash mid-write) is ignored.
+    """
+
+    def __init__(self, path, sync_every=None, sync_interval=None):
+        self.path = path
+        self.sync_every = settings.JOURNAL_SYNC_EVERY if sync_every is None else sync_every
+        self.sync_interval = settings.JOURNAL_SYNC_INTERVAL if sync_interval is None else sync_interval
+        self._delivered = set()
+        self.recent_deliveries = 0  # Entries from the last 24 hours, for daily quotas
+        self.recent_by_sender = collections.Counter()  # ...split by sending account
+        self._lock = threading.Lock()
+        self._file = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._load()
+
+    @staticmethod
+    def key(email, digest):
+        return email.strip().lower() + ' ' + digest
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        cutoff = (datetime.now() - timedelta(days=1)).isoformat(timespec='seconds')
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    self._delivered.add(self.key(entry['email'], entry['sha256']))
+                except (ValueError, KeyError):
+                    continue
+                if entry.get('time', '') >= cutoff:
+                    self.recent_deliveries += 1
+                    if entry.get('sender'):
+                        self.recent_by_sender[entry['sender'].lower()] += 1
+
+    def __len__(self):
+        return len(self._delivered)
+
+    def was_delivered(self, email, digest):
+        return self.key(email, digest) in self._delivered
+
+    def record(self, email, digest, name=None, response=None, sender=None):
+        """Append one delivery; the entry is durable after the next batch sync."""
+        line = json.dumps({
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'email': email,
+            'name': name,
+            'sha256': digest,
+            'response': response,
+            'sender': sender,
+        }, ensure_ascii=False) + '\n'
+        with self._lock:
+            if self._file is None:
+                folder = os.path.dirname(self.path)
+                if folder:
+                    os.makedirs(folder, exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line)
+            self._delivered.add(self.key(email, digest))
+            self.recent_deliveries += 1
+            if sender:
+                self.recent_by_sender[sender.lower()] += 1
+            self._pending += 1
+            if self._pending >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+                self._sync_locked()
+
+    def _sync_locked(self):
+        if self._file is not None and self._pending:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self):
+        with self._lock:
+            self._sync_locked()
+
+    def close(self):
+        with self._lock:
+            self._sync_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,129 @@
+"""
+Signed, expiring download links to certificates published for ``--links``.
+"""
+
+import base64
+import collections
+import hashlib
+import hmac
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import settings
+from .journal import certificate_digest
+
+# A certificate in the storage backend: its sha256 (for the journal and manifest) and its key
+PublishedCertificate = collections.namedtuple('PublishedCertificate', ['digest', 'key'])
+
+class LinkSigner:
+    """
+    HMAC-SHA256 signatures that make links to published files expire.
+
+    A signed link is the file's URL plus ``?expires=<unix time>&signature=<...>``.
+    The signature covers the storage key and the expiry time, so neither
+    can be changed without the secret; whatever serves the files checks
+    them with ``verify()`` (``certificate-mailer --serve-links`` does, see
+    linkserver.py).
+    """
+
+    def __init__(self, secret, ttl):
+        self._secret = secret.encode('utf-8') if isinstance(secret, str) else secret
+        self.ttl = ttl
+
+    def signature(self, key, expires):
+        mac = hmac.new(self._secret, f'{key}\n{expires}'.encode('utf-8'), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(mac).rstrip(b'=').decode('ascii')
+
+    def sign(self, url, key, expires):
+        """Append the expiry time and signature for `key` to its `url`."""
+        return f'{url}?expires={expires}&signature={self.signature(key, expires)}'
+
+    def verify(self, key, expires, signature, now=None):
+        """True if `signature` is valid for `key` and `expires` (the query values) and has not expired."""
+        try:
+            expires = int(expires)
+        except (TypeError, ValueError):
+            return False
+        now = time.time() if now is None else now
+        return now < expires and hmac.compare_digest(self.signature(key, expires), str(signature))
+
+class CertificateLinks:
+    """
+    Certificates published to a storage backend, and signed links to them.
+
+    ``publish()`` reads and hashes a certificate once per path, mtime and
+    size, and uploads it under ``<sha256>/<filename>`` unless that key is
+    already there, so re-runs only upload new or re-issued certificates.
+    ``publish_all()`` does the bulk upload before sending on a thread pool.
+    All links made by one instance expire at the same time (``expires``).
+    With ``upload=False`` (dry runs) certificates are hashed but not uploaded.
+    Safe to share between threads.
+    """
+
+    def __init__(self, storage, signer, upload=True):
+        self.storage = storage
+        self.signer = signer
+        self.upload = upload
+        self.expires = int(time.time() + signer.ttl)
+        self.uploaded = 0
+        self.already_published = 0
+        self._published = {}  # (abspath, mtime_ns, size) -> PublishedCertificate
+        self._lock = threading.Lock()
+
+    def publish(self, path, stat=None):
+        """Return the PublishedCertificate for the file at `path`, uploading it if needed."""
+        stat = os.stat(path) if stat is None else stat
+        cache_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            published = self._published.get(cache_key)
+        if published is not None:
+            return published
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = certificate_digest(data)
+        published = PublishedCertificate(digest, f'{digest}/{os.path.basename(path)}')
+        counter = None
+        if self.upload:
+            counter = 'already_published'
+            if not self.storage.exists(published.key, len(data)):
+                self.storage.put(published.key, data)
+                counter = 'uploaded'
+        with self._lock:
+            if counter is not None and cache_key not in self._published:
+                setattr(self, counter, getattr(self, counter) + 1)
+            self._published[cache_key] = published
+        return published
+
+    def publish_all(self, paths, workers=None):
+        """Publish every file in `paths` in parallel; returns (path, error) for each one that failed."""
+        workers = settings.UPLOAD_WORKERS if workers is None else workers
+
+        def attempt(path):
+            try:
+                self.publish(path)
+            except Exception as e:
+                return path, e
+            return None
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            return [failure for failure in pool.map(attempt, paths) if failure is not None]
+
+    def url(self, published):
+        """Signed, expiring download link for a PublishedCertificate."""
+        return self.signer.sign(self.storage.url(published.key), published.key, self.expires)
+
+def open_link_signer():
+    """LinkSigner for the signing key in config.py and LINK_EXPIRY_DAYS."""
+    secret = getattr(settings.load_config(), 'LINK_SIGNING_KEY', None)
+    if not secret:
+        raise settings.ConfigError(f"{settings.CONFIG_PATH} has no LINK_SIGNING_KEY to sign certificate links with")
+    return LinkSigner(secret, settings.LINK_EXPIRY_DAYS * 24 * 3600)
+
+def open_certificate_links(upload=True):
+    """CertificateLinks for the configured storage backend, signing key (config.py) and expiry."""
+    from .storage import open_storage
+
+    return CertificateLinks(open_storage(), open_link_signer(), upload=upload)
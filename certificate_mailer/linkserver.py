@@ -0,0 +1,97 @@
+"""
+A file server for the ``local`` link storage that enforces signed, expiring links.
+
+A plain static file server ignores ``?expires=&signature=``, so links to
+certificates published there would never expire. ``certificate-mailer
+--serve-links [HOST:]PORT`` serves LINK_STORAGE_DIR instead and only hands
+out a file for a link that ``LinkSigner.verify()`` accepts; anything else
+gets 403 Forbidden. Run it (behind your HTTPS proxy) at LINK_BASE_URL.
+"""
+
+import http.server
+import os
+from functools import partial
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from . import settings
+from .links import open_link_signer
+
+class SignedLinkHandler(http.server.SimpleHTTPRequestHandler):
+    """
+    Serves a published file only for a valid signed link to it.
+
+    ``prefix`` is the path of LINK_BASE_URL; the rest of the request path is
+    the storage key the signature covers. Directory listings are never shown.
+    """
+
+    def __init__(self, *args, signer, directory, prefix='/', **kwargs):
+        self.signer = signer
+        self.prefix = prefix
+        super().__init__(*args, directory=directory, **kwargs)
+
+    def _key(self):
+        """The storage key this request's link was signed for, or None if it isn't a valid link."""
+        parts = urlsplit(self.path)
+        if not parts.path.startswith(self.prefix):
+            return None
+        key = unquote(parts.path[len(self.prefix):])
+        segments = key.split('/')
+        if not key or '' in segments or '.' in segments or '..' in segments or '\\' in key:
+            return None
+        query = parse_qs(parts.query)
+        expires = query.get('expires', [None])[0]
+        signature = query.get('signature', [None])[0]
+        if signature is None or not self.signer.verify(key, expires, signature):
+            return None
+        return key
+
+    def send_head(self):
+        key = self._key()
+        if key is None:
+            self.send_error(HTTPStatus.FORBIDDEN, "This link is invalid or has expired")
+            return None
+        # The parent class serves self.path, translated through translate_path() below
+        self.path = '/' + key
+        return super().send_head()
+
+    def list_directory(self, path):
+        self.send_error(HTTPStatus.NOT_FOUND)
+        return None
+
+    def end_headers(self):
+        # Each link stops working at its expiry time, so nothing in between may keep a copy
+        self.send_header('Cache-Control', 'private, no-store')
+        super().end_headers()
+
+def make_link_server(address, directory=None, base_url=None, signer=None):
+    """
+    An HTTP server for LINK_STORAGE_DIR at ``address`` (host, port); call ``serve_forever()`` on it.
+
+    The arguments default to LINK_STORAGE_DIR, LINK_BASE_URL and the signing
+    key in config.py (raises settings.ConfigError if it has none).
+    """
+    directory = os.path.abspath(settings.LINK_STORAGE_DIR if directory is None else directory)
+    base_url = settings.LINK_BASE_URL if base_url is None else base_url
+    prefix = urlsplit(base_url or '/').path.rstrip('/') + '/'
+    signer = open_link_signer() if signer is None else signer
+    handler = partial(SignedLinkHandler, signer=signer, directory=directory, prefix=prefix)
+    return http.server.ThreadingHTTPServer(address, handler)
+
+def parse_address(value):
+    """Parse ``[HOST:]PORT`` (``--serve-links``) into (host, port); the host defaults to 127.0.0.1."""
+    host, _, port = value.rpartition(':')
+    return host.strip('[]') or '127.0.0.1', int(port)
+
+def serve_links(address):
+    """Serve signed links at ``address`` until interrupted."""
+    server = make_link_server(address)
+    host, port = server.server_address[:2]
+    print(f"🔗 Serving {settings.LINK_STORAGE_DIR} at http://{host}:{port}/ - only valid, unexpired links "
+          f"are answered (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,124 @@
+"""
+The certificate manifest behind ``--changed-only``: what each student was last sent.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+from . import settings
+
+def manifest_path_for(folder):
+    """The manifest kept next to a certificates folder ("certificates" -> "certificates.manifest.jsonl")."""
+    return os.path.abspath(folder).rstrip(os.sep) + settings.MANIFEST_SUFFIX
+
+class CertificateManifest:
+    """
+    Content hash of the certificate each student was last sent, with a stat shortcut.
+
+    Stored as JSONL next to the certificates folder; every delivery appends
+    one line with the recipient, the certificate's filename, its sha256 and
+    the mtime/size it had when it was read, and the last line per
+    recipient and file wins. ``unchanged()`` compares a certificate's
+    current mtime/size with the recorded ones, so files nobody touched are
+    never read or hashed; only files whose stat changed need their hash
+    compared (``matches()``). The file is rewritten without superseded
+    lines on ``close()`` once they make up more than half of it.
+    After ``disable()`` (e.g. the folder is read-only) nothing more is
+    written, but what was loaded can still be consulted.
+    """
+
+    _FIELDS = ('email', 'file', 'sha256', 'mtime_ns', 'size')
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = {}  # (email, filename) -> {'mtime_ns', 'size', 'sha256', ...}
+        self._lines = 0
+        self._file = None
+        self.disabled = False
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def key(email, certificate_path):
+        return email.strip().lower(), os.path.basename(certificate_path)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Truncated last line
+                if not isinstance(entry, dict) or not all(field in entry for field in self._FIELDS):
+                    continue
+                self._entries[(entry['email'], entry['file'])] = entry
+                self._lines += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def unchanged(self, email, certificate_path, stat):
+        """True if the certificate still has the mtime and size it had when it was sent to `email`."""
+        entry = self._entries.get(self.key(email, certificate_path))
+        return entry is not None and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size
+
+    def matches(self, email, certificate_path, digest):
+        """True if `email` was last sent this certificate with content hash `digest`."""
+        entry = self._entries.get(self.key(email, certificate_path))
+        return entry is not None and entry['sha256'] == digest
+
+    def writable(self):
+        """True if the manifest file can be created or appended to."""
+        if os.path.exists(self.path):
+            return os.access(self.path, os.W_OK)
+        return os.access(os.path.dirname(os.path.abspath(self.path)), os.W_OK)
+
+    def disable(self):
+        """Stop writing the manifest for the rest of the run."""
+        with self._lock:
+            self.disabled = True
+            if self._file is not None:
+                try:
+                    self._file.close()
+                except OSError:
+                    pass
+                self._file = None
+
+    def record(self, email, certificate_path, stat, digest):
+        """Remember that `email` now has the certificate with this stat and content hash."""
+        email, filename = self.key(email, certificate_path)
+        entry = {
+            'email': email,
+            'file': filename,
+            'sha256': digest,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'time': datetime.now().isoformat(timespec='seconds'),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self._lock:
+            if self.disabled:
+                return
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line)
+            self._entries[(email, filename)] = entry
+            self._lines += 1
+
+    def close(self):
+        """Flush new lines and compact the file if most of it is superseded."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if not self.disabled and self._lines > 2 * len(self._entries):
+                temporary = self.path + '.tmp'
+                with open(temporary, 'w', encoding='utf-8') as f:
+                    for entry in self._entries.values():
+                        f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                os.replace(temporary, self.path)
+                self._lines = len(self._entries)
@@ -0,0 +1,187 @@
+"""
+Certificate emails assembled directly in wire format.
+"""
+
+import base64
+import uuid
+
+from . import settings
+from .template_engine import CompiledTemplate, load_template
+
+CRLF = b'\r\n'
+
+def encode_base64_lines(data):
+    """Base64-encode bytes into 76-character lines terminated by CRLF."""
+    return base64.encodebytes(data).replace(b'\n', CRLF)
+
+def attachment_disposition(filename):
+    """Build a Content-Disposition value that survives spaces and non-ASCII names."""
+    try:
+        filename.encode('ascii')
+    except UnicodeEncodeError:
+        from email.utils import encode_rfc2231
+        return "attachment; filename*=" + encode_rfc2231(filename, 'utf-8')
+    return 'attachment; filename="{}"'.format(filename.replace('\\', '\\\\').replace('"', '\\"'))
+
+class MessageTemplate:
+    """
+    A prebuilt certificate email in wire format.
+
+    The message is ``multipart/mixed``: a ``multipart/related`` part holding
+    the body (``multipart/alternative`` plain text + HTML, or just HTML) and
+    the inline logo, followed by the certificate attachment. Everything that
+    is identical for all recipients - the From/Subject headers, the MIME
+    boundaries, the base64-encoded logo and the run-constant template
+    fields - is prepared once when the template is created. ``build()`` only
+    splices the To header, the rendered bodies and the certificate into the
+    cached byte segments, so the result can go straight to ``sendmail``.
+
+    `html` and `text` are template sources; by default they are loaded from
+    settings.HTML_TEMPLATE_PATH and settings.TEXT_TEMPLATE_PATH. Pass ``text=''`` for an
+    HTML-only message.
+
+    With ``linked=True`` (``--links``) the templates come from the
+    LINK_*_TEMPLATE_PATH settings and messages are built with
+    ``build_linked()``, which puts a download link in the body instead of
+    attaching the certificate. Pass ``logo_data=None`` to leave out the
+    inline logo (the template then points ``{logo_url}`` at a hosted copy).
+    """
+
+    def __init__(self, sender_address, logo_data, sender_name=None, subject=None, html=None, text=None,
+                 linked=False, **html_fields):
+        from email.header import Header
+
+        sender_name = settings.SENDER_NAME if sender_name is None else sender_name
+        subject = settings.EMAIL_SUBJECT if subject is None else subject
+        self.sender_address = sender_address
+        self.sender_name = sender_name
+        self.html_fields = {
+            'event_name': settings.EVENT_NAME,
+            'sender_organization': settings.SENDER_ORGANIZATION,
+            'team_members_signature': settings.TEAM_MEMBERS_SIGNATURE,
+            'logo_url': 'cid:logoimage',
+            **html_fields,
+        }
+        html_path = settings.LINK_HTML_TEMPLATE_PATH if linked else settings.HTML_TEMPLATE_PATH
+        text_path = settings.LINK_TEXT_TEMPLATE_PATH if linked else settings.TEXT_TEMPLATE_PATH
+        html_body = load_template(html_path, escape=True) if html is None else CompiledTemplate(html, escape=True)
+        if text is None:
+            text_body = load_template(text_path) if text_path else None
+        else:
+            text_body = CompiledTemplate(text) if text else None
+        self.html = html_body.partial(**self.html_fields)
+        self.text = text_body.partial(**self.html_fields) if text_body is not None else None
+
+        mixed, related, alternative = (('=' * 15 + uuid.uuid4().hex + '==').encode('ascii') for _ in range(3))
+        # From comes first so for_sender() can swap it without re-encoding the message
+        self._from_lines = {}
+        self._from = self.from_line(sender_address)
+        self._head = b''.join([
+            self._from,
+            b'Content-Type: multipart/mixed; boundary="', mixed, b'"', CRLF,
+            b'MIME-Version: 1.0', CRLF,
+            b'Subject: ', Header(subject, 'utf-8').encode().encode('ascii').replace(b'\n', CRLF), CRLF,
+        ])
+
+        def body_head(content_type):
+            return b''.join([
+                b'Content-Type: ', content_type, b'; charset="utf-8"', CRLF,
+                b'MIME-Version: 1.0', CRLF,
+                b'Content-Transfer-Encoding: base64', CRLF, CRLF,
+            ])
+
+        related_head = b''.join([
+            CRLF, b'--', mixed, CRLF,
+            b'Content-Type: multipart/related; boundary="', related, b'"', CRLF,
+            b'MIME-Version: 1.0', CRLF, CRLF,
+            b'--', related, CRLF,
+        ])
+        if self.text is not None:
+            self._text_head = b''.join([
+                related_head,
+                b'Content-Type: multipart/alternative; boundary="', alternative, b'"', CRLF,
+                b'MIME-Version: 1.0', CRLF, CRLF,
+                b'--', alternative, CRLF,
+                body_head(b'text/plain'),
+            ])
+            self._html_head = b'--' + alternative + CRLF + body_head(b'text/html')
+            self._body_tail = b'--' + alternative + b'--' + CRLF
+        else:
+            self._text_head = None
+            self._html_head = related_head + body_head(b'text/html')
+            self._body_tail = b''
+        self._logo_part = b''.join([
+            b'--', related, CRLF,
+            b'Content-Type: image/jpeg', CRLF,
+            b'MIME-Version: 1.0', CRLF,
+            b'Content-Transfer-Encoding: base64', CRLF,
+            b'Content-ID: <logoimage>', CRLF, CRLF,
+            encode_base64_lines(logo_data),
+        ]) if logo_data is not None else b''
+        self._logo_part += b'--' + related + b'--' + CRLF
+        self._attachment_head = b''.join([
+            b'--', mixed, CRLF,
+            b'Content-Type: application/octet-stream', CRLF,
+            b'MIME-Version: 1.0', CRLF,
+            b'Content-Transfer-Encoding: base64', CRLF,
+        ])
+        self._tail = b'--' + mixed + b'--' + CRLF
+
+    def from_line(self, address):
+        """The encoded From header line for `address` (cached)."""
+        line = self._from_lines.get(address)
+        if line is None:
+            from email.utils import formataddr
+            line = b'From: ' + formataddr((self.sender_name, address), 'utf-8').encode('ascii') + CRLF
+            self._from_lines[address] = line
+        return line
+
+    def for_sender(self, payload, address):
+        """Return a message from ``build()`` with its From header switched to `address`."""
+        if address == self.sender_address:
+            return payload
+        return self.from_line(address) + payload[len(self._from):]
+
+    def render_html(self, name, **fields):
+        """Render the HTML body for one student (as UTF-8 bytes)."""
+        return self.html.render(name=name, **fields)
+
+    def render_text(self, name, **fields):
+        """Render the plain-text body for one student, or None for HTML-only messages."""
+        return self.text.render(name=name, **fields) if self.text is not None else None
+
+    def build(self, recipient, name, certificate_filename, certificate_data):
+        """Return the complete message for one student as CRLF-terminated bytes."""
+        return self.build_encoded(recipient, name, certificate_filename, encode_base64_lines(certificate_data))
+
+    def build_encoded(self, recipient, name, certificate_filename, encoded_certificate):
+        """Like ``build()``, for a certificate already encoded with ``encode_base64_lines()``."""
+        parts = [self._head, b'To: ', recipient.encode('ascii'), CRLF]
+        if self._text_head is not None:
+            parts += [self._text_head, encode_base64_lines(self.text.render(name=name))]
+        parts += [
+            self._html_head,
+            encode_base64_lines(self.html.render(name=name)),
+            self._body_tail,
+            self._logo_part,
+            self._attachment_head,
+            b'Content-Disposition: ', attachment_disposition(certificate_filename).encode('ascii'), CRLF, CRLF,
+            encoded_certificate,
+            self._tail,
+        ]
+        return b''.join(parts)
+
+    def build_linked(self, recipient, name, certificate_url):
+        """Return the message for one student with a link to their certificate instead of the attachment."""
+        parts = [self._head, b'To: ', recipient.encode('ascii'), CRLF]
+        if self._text_head is not None:
+            parts += [self._text_head,
+                      encode_base64_lines(self.text.render(name=name, certificate_url=certificate_url))]
+        parts += [
+            self._html_head,
+            encode_base64_lines(self.html.render(name=name, certificate_url=certificate_url)),
+            self._body_tail,
+            self._logo_part,
+            self._tail,
+        ]
+        return b''.join(parts)
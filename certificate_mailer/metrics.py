@@ -0,0 +1,173 @@
+"""
+Per-stage timings and counters for a run, reported as JSON or Prometheus text.
+"""
+
+import collections
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime
+
+class LatencyHistogram:
+    """
+    Fixed-memory latency histogram with logarithmic buckets.
+
+    Buckets grow by a factor of 2**(1/8) (about 9%) from 1 µs, so
+    percentiles are accurate to within one bucket no matter how many
+    samples are recorded.
+    """
+
+    BASE = 1e-6
+    GROWTH = 2 ** 0.125
+
+    def __init__(self):
+        self.buckets = collections.Counter()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        index = 0 if seconds <= self.BASE else int(math.log(seconds / self.BASE, self.GROWTH)) + 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= target:
+                return min(self.BASE * self.GROWTH ** index, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'total_seconds': round(self.total, 6),
+            'mean_seconds': round(self.total / self.count, 6) if self.count else 0.0,
+            'p50_seconds': round(self.percentile(0.50), 6),
+            'p95_seconds': round(self.percentile(0.95), 6),
+            'p99_seconds': round(self.percentile(0.99), 6),
+            'max_seconds': round(self.max, 6),
+        }
+
+class RunMetrics:
+    """
+    Thread-safe per-stage timings and counters for one mailer run.
+
+    Hot paths call ``observe(stage, seconds)`` with their own
+    ``time.perf_counter()`` readings; everything is aggregated into
+    fixed-size histograms so recording stays cheap at any volume.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._clock = time.perf_counter()
+        self.stages = collections.defaultdict(LatencyHistogram)
+        self.bytes_sent = 0
+        self.retries = collections.Counter()  # retries needed -> number of recipients
+        self.senders = collections.Counter()  # sending account -> messages delivered
+        self.caches = {}  # name -> cache with a counters() method, reported as-is
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            self.stages[stage].observe(seconds)
+
+    def add_delivery(self, size, retries, sender=None):
+        with self._lock:
+            self.bytes_sent += size
+            self.retries[retries] += 1
+            if sender is not None:
+                self.senders[sender] += 1
+
+    def add_retries(self, retries):
+        with self._lock:
+            self.retries[retries] += 1
+
+    def timed(self, iterable, stage):
+        """Yield from `iterable`, recording how long each item took to produce."""
+        iterator = iter(iterable)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.observe(stage, time.perf_counter() - started)
+            yield item
+
+    def report(self, stats):
+        """Build the JSON-serializable run report."""
+        elapsed = time.perf_counter() - self._clock
+        with self._lock:
+            return {
+                'started': datetime.fromtimestamp(self.started).isoformat(timespec='seconds'),
+                'elapsed_seconds': round(elapsed, 3),
+                'stats': dict(stats),
+                'messages_per_second': round(stats.get('sent', 0) / elapsed, 3) if elapsed else 0.0,
+                'bytes_sent': self.bytes_sent,
+                'retries_per_recipient': {str(k): v for k, v in sorted(self.retries.items())},
+                'messages_by_sender': {
+                    sender: {'sent': count, 'messages_per_second': round(count / elapsed, 3) if elapsed else 0.0}
+                    for sender, count in sorted(self.senders.items())
+                },
+                'stages': {stage: histogram.summary() for stage, histogram in sorted(self.stages.items())},
+                'caches': {name: cache.counters() for name, cache in sorted(self.caches.items())},
+            }
+
+    def write_report(self, path, stats):
+        report = self.report(stats)
+        _write_atomically(path, json.dumps(report, indent=2, ensure_ascii=False) + '\n')
+        return report
+
+    def write_prometheus(self, path, stats):
+        """Write the metrics in Prometheus text format (for node_exporter's textfile collector)."""
+        report = self.report(stats)
+        lines = [
+            '# HELP certificate_mailer_stage_seconds Time spent per stage of the send pipeline.',
+            '# TYPE certificate_mailer_stage_seconds summary',
+        ]
+        for stage, summary in report['stages'].items():
+            for quantile, key in (('0.5', 'p50_seconds'), ('0.95', 'p95_seconds'), ('0.99', 'p99_seconds')):
+                lines.append(f'certificate_mailer_stage_seconds{{stage="{stage}",quantile="{quantile}"}} {summary[key]}')
+            lines.append(f'certificate_mailer_stage_seconds_sum{{stage="{stage}"}} {summary["total_seconds"]}')
+            lines.append(f'certificate_mailer_stage_seconds_count{{stage="{stage}"}} {summary["count"]}')
+        lines += [
+            '# HELP certificate_mailer_emails_total Students processed in the last run, by outcome.',
+            '# TYPE certificate_mailer_emails_total gauge',
+        ]
+        for outcome, value in report['stats'].items():
+            lines.append(f'certificate_mailer_emails_total{{outcome="{outcome}"}} {value}')
+        lines += [
+            '# HELP certificate_mailer_bytes_sent Message bytes sent in the last run.',
+            '# TYPE certificate_mailer_bytes_sent gauge',
+            f'certificate_mailer_bytes_sent {report["bytes_sent"]}',
+            '# HELP certificate_mailer_run_seconds Wall-clock duration of the last run.',
+            '# TYPE certificate_mailer_run_seconds gauge',
+            f'certificate_mailer_run_seconds {report["elapsed_seconds"]}',
+        ]
+        if report['caches']:
+            lines += [
+                '# HELP certificate_mailer_cache Cache counters for the last run.',
+                '# TYPE certificate_mailer_cache gauge',
+            ]
+            for name, counters in report['caches'].items():
+                for counter, value in counters.items():
+                    lines.append(f'certificate_mailer_cache{{cache="{name}",counter="{counter}"}} {value}')
+        _write_atomically(path, '\n'.join(lines) + '\n')
+
+def _write_atomically(path, text):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(path + '.tmp', path)
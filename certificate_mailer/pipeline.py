@@ -0,0 +1,81 @@
+"""
+Builder threads that prepare messages ahead of the senders.
+"""
+
+import queue
+import threading
+
+class MessagePipeline:
+    """
+    Builder threads that turn roster rows into ready-to-send messages.
+
+    ``builders`` threads pull rows from `rows` (any iterator; access is
+    serialized), run ``build(row)`` on them and put every result that is not
+    None into a queue holding at most ``depth`` messages. Sender workers call
+    ``get()`` until it returns None, so building the next messages overlaps
+    with sending the current ones, and the bounded queue stalls the builders
+    whenever the senders fall behind, keeping memory flat.
+    """
+
+    _DONE = object()
+
+    def __init__(self, rows, build, builders=1, depth=1):
+        self._rows = iter(rows)
+        self._build = build
+        self._queue = queue.Queue(maxsize=max(1, depth))
+        self._rows_lock = threading.Lock()
+        self._active = max(1, builders)
+        self._threads = [threading.Thread(target=self._run, daemon=True) for _ in range(self._active)]
+        self._stopped = False
+        self.error = None  # Exception raised by the row iterator, re-raised by close()
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def _next_row(self):
+        with self._rows_lock:
+            if self._stopped:
+                return self._DONE
+            try:
+                return next(self._rows, self._DONE)
+            except Exception as e:
+                self.error = e
+                self._stopped = True
+                return self._DONE
+
+    def _run(self):
+        try:
+            while True:
+                row = self._next_row()
+                if row is self._DONE:
+                    return
+                message = self._build(row)
+                if message is not None:
+                    self._queue.put(message)
+        finally:
+            with self._rows_lock:
+                self._active -= 1
+                finished = self._active == 0
+            if finished:
+                self._queue.put(self._DONE)
+
+    def get(self):
+        """Return the next message, blocking until one is built, or None once all rows are done."""
+        message = self._queue.get()
+        if message is self._DONE:
+            self._queue.put(self._DONE)  # Let the other senders see it too
+            return None
+        return message
+
+    def close(self):
+        """Stop building, wait for the builders and re-raise any error from the row iterator."""
+        self._stopped = True
+        while any(thread.is_alive() for thread in self._threads):
+            try:
+                self._queue.get(timeout=0.1)  # Unblock builders if the senders quit early
+            except queue.Empty:
+                pass
+        if self.error is not None:
+            raise self.error
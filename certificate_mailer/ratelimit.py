@@ -0,0 +1,121 @@
+"""
+Pacing for the asyncio sender: a shared token bucket and per-connection AIMD.
+"""
+
+import random
+import time
+
+from . import settings
+
+# Reply codes providers use for "slow down / try again later"
+THROTTLE_REPLY_CODES = {421, 450, 451, 452, 454}
+
+def smtp_reply_code(error):
+    """Extract the SMTP reply code from an smtplib exception, or None."""
+    import smtplib  # Already loaded by whatever raised `error`
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        for code, _ in error.recipients.values():
+            return code
+        return None
+    return getattr(error, 'smtp_code', None)
+
+class TokenBucket:
+    """
+    Asyncio token bucket shared by all connections.
+
+    Grants ``rate`` tokens per second with bursts of up to ``capacity``.
+    ``limit`` is a hard cap on the number of counted tokens (the daily
+    quota); once it is used up ``acquire()`` returns False. Retries of a
+    message pass ``count=False`` so they are paced but not counted, and
+    ``release()`` gives a counted token back when its message was not
+    delivered, so only deliveries use up the cap.
+    """
+
+    def __init__(self, rate=None, capacity=None, limit=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate or 1.0)
+        self.tokens = self.capacity
+        self.limit = limit
+        self.granted = 0
+        self._updated = time.monotonic()
+        self._lock = None
+
+    async def acquire(self, count=True):
+        import asyncio
+        if self._lock is None:
+            self._lock = asyncio.Lock()  # Created lazily inside the running loop
+        async with self._lock:
+            if count and self.limit is not None and self.granted >= self.limit:
+                return False
+            while self.rate:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+            if count:
+                self.granted += 1
+            return True
+
+    def release(self):
+        """Return a counted token whose message ended up not being delivered."""
+        self.granted = max(self.granted - 1, 0)
+
+class AIMDThrottle:
+    """
+    Per-connection send pacing with additive-increase/multiplicative-decrease.
+
+    Until the first throttling reply each success multiplies the
+    connection's rate by ``slow_start`` (so an unlimited run finds the
+    server's pace within a few messages); after that every success raises
+    it by ``increase`` messages/sec. Every throttling reply multiplies it
+    by ``decrease``. Backoff delays
+    after failures grow exponentially and use full jitter, so connections
+    that were throttled together don't retry in lockstep.
+    """
+
+    def __init__(self, rate, max_rate=None):
+        self.rate = rate
+        self.min_rate = settings.AIMD_MIN_RATE
+        self.max_rate = max_rate
+        self.increase = settings.AIMD_INCREASE
+        self.decrease = settings.AIMD_DECREASE
+        self.slow_start = settings.AIMD_SLOW_START
+        self.throttled = False
+        self.backoff_base = settings.BACKOFF_BASE
+        self.backoff_max = settings.BACKOFF_MAX
+        self.failures = 0
+        self._next_send = 0.0
+
+    async def wait(self):
+        """Sleep until this connection may send its next message."""
+        import asyncio
+        delay = self._next_send - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._next_send = time.monotonic() + 1.0 / self.rate
+
+    def backoff(self):
+        self.failures += 1
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** self.failures))
+
+    def on_success(self):
+        self.failures = 0
+        if self.throttled:
+            self.rate += self.increase
+        else:
+            self.rate *= self.slow_start
+        if self.max_rate:
+            self.rate = min(self.rate, self.max_rate)
+
+    def on_throttle(self):
+        """Cut the rate and return how long to back off before retrying."""
+        self.throttled = True
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        return self.backoff()
+
+    def on_error(self):
+        """Return how long to back off after a non-throttling transient error."""
+        return self.backoff()
@@ -0,0 +1,718 @@
+"""
+The send loop: streams the roster through the build pipeline into SMTP delivery.
+"""
+
+import collections
+import os
+import threading
+import time
+from datetime import datetime
+
+from . import settings
+from .accounts import AccountScheduler, is_quota_error, is_recipient_refusal, load_sender_accounts
+from .attachments import AttachmentCache
+from .certificates import CertificateIndex, find_missing_certificates
+from .events import Event, interleave
+from .journal import SendJournal
+from .manifest import CertificateManifest, manifest_path_for
+from .message import MessageTemplate
+from .metrics import RunMetrics
+from .pipeline import MessagePipeline
+from .ratelimit import AIMDThrottle, THROTTLE_REPLY_CODES, TokenBucket, smtp_reply_code
+from .transport import OutgoingEmail, close_smtp_connection, deliver_message, open_connection_pool, \
+    open_smtp_connection
+from .utils import ProgressReporter, count_csv_rows, iter_students, setup_logging, validate_configuration, \
+    validate_email
+
+# One event's state for a run: where its students and certificates are and its prebuilt message
+# (`tag` prefixes its log lines when several events are sent together)
+PreparedEvent = collections.namedtuple('PreparedEvent', [
+    'name', 'tag', 'roster', 'expected_rows', 'certificates', 'manifest', 'template',
+    'certificate_template', 'name_style',
+])
+
+def send_certificate_emails(dry_run=False, delay=0, retry_attempts=None, verbose=False,
+                            workers=None, resume=False, fuzzy_match=False,
+                            use_async=False, rate=None, daily_cap=None,
+                            generate=False, metrics_textfile=None, attachment_cache=None, changed_only=False,
+                            links=False, events=None):
+    """
+    Sends personalized certificates to a list of students from a CSV file.
+    
+    Args:
+        dry_run (bool): If True, validates setup without sending emails
+        delay (int): Seconds to wait between emails (rate limiting, per worker)
+        retry_attempts (int): Number of retry attempts for failed emails (None = settings.MAX_RETRIES)
+        verbose (bool): Enable verbose logging
+        workers (int): Number of parallel SMTP connections to send through (None = settings.DEFAULT_WORKERS)
+        resume (bool): Skip students whose current certificate is already in the send journal
+        fuzzy_match (bool): Fall back to the closest certificate filename when there is no exact match
+        use_async (bool): Send with the asyncio engine (adaptive rate limiting, reply-code aware backoff)
+        rate (float): Messages per second across all connections in async mode (0 = unlimited;
+            None = settings.ASYNC_RATE_LIMIT)
+        daily_cap (int): Messages per 24 hours in async mode, including earlier journaled runs (0 = unlimited;
+            None = settings.DAILY_SEND_LIMIT, or only the per-account quotas when SENDER_ACCOUNTS is configured)
+        generate (bool): Render certificates from settings.CERTIFICATE_TEMPLATE_PATH while sending
+        metrics_textfile (str): Also write the run metrics to this Prometheus textfile
+        attachment_cache (AttachmentCache): Cache of encoded certificates to use (and share with
+            other runs in the same process); by default one is created from the ATTACHMENT_CACHE settings
+        changed_only (bool): Only send to students whose certificate is new or changed since it was last
+            sent to them (see CertificateManifest)
+        links (bool): Publish the certificates to settings.LINK_STORAGE and email signed, expiring
+            download links instead of attaching them (see CertificateLinks)
+        events (list): Events to send in this run (see load_events); by default the single event
+            described by the settings module
+    
+    A JSON run report with per-stage latency percentiles is written to settings.LOG_FOLDER.
+    
+    With SENDER_ACCOUNTS in config.py, students are sharded across the accounts
+    (see AccountScheduler) and each worker keeps one connection per account.
+    
+    With several events, their rosters are interleaved into one send queue, so
+    they share the SMTP connections, the attachment cache, the journal, the
+    rate limiter and the daily cap; the summary adds a line per event.
+    """
+    # --generate renders in one process pool shared by every event, started before this run starts any
+    # thread (logging, builders, senders) so no worker is forked from a multi-threaded process
+    render_pool = None
+    if generate:
+        from .generate import open_render_pool
+        render_pool = open_render_pool(settings.GENERATION_WORKERS)
+    try:
+        return _send_certificate_emails(dry_run, delay, retry_attempts, verbose, workers, resume, fuzzy_match,
+                                        use_async, rate, daily_cap, generate, metrics_textfile, attachment_cache,
+                                        changed_only, links, events, render_pool)
+    finally:
+        if render_pool is not None:
+            render_pool.shutdown()
+
+def _send_certificate_emails(dry_run, delay, retry_attempts, verbose, workers, resume, fuzzy_match, use_async, rate,
+                             daily_cap, generate, metrics_textfile, attachment_cache, changed_only, links, events,
+                             render_pool):
+    """send_certificate_emails() with the render pool for --generate already running."""
+    logger = setup_logging(verbose)
+    events = events or [Event(settings.EVENT_NAME)]
+    multi_event = len(events) > 1
+    
+    # Validate configuration
+    for event in events:
+        if multi_event:
+            logger.info(f"📅 Event: {event.name}")
+        with event.applied():
+            if not validate_configuration(logger, generate=generate, links=links):
+                return
+    
+    if dry_run:
+        logger.info("🧪 DRY-RUN MODE: No emails will be sent.")
+    
+    retry_attempts = settings.MAX_RETRIES if retry_attempts is None else retry_attempts
+    workers = max(1, workers or settings.DEFAULT_WORKERS)
+    rate = settings.ASYNC_RATE_LIMIT if rate is None else rate
+    
+    # Statistics (shared between worker threads, guarded by stats_lock)
+    stats = {
+        'total': 0,
+        'sent': 0,
+        'errors': 0,
+        'skipped': 0,
+        'already_sent': 0,
+        'unchanged': 0,
+        'deferred': 0
+    }
+    stats_by_event = {event.name: collections.Counter() for event in events}
+    failed_emails = []
+    metrics = RunMetrics()
+    attachments = attachment_cache
+    if attachments is None:
+        attachments = AttachmentCache(directory=settings.ATTACHMENT_CACHE_DIR)
+    metrics.caches['attachments'] = attachments
+    run_started = time.perf_counter()
+    stats_lock = threading.Lock()
+    processed = [0]
+    progress = None
+    
+    def record(outcome, student_name=None, student_email=None, error=None, event=None):
+        """Update the shared (and `event`'s) statistics and redraw the progress bar."""
+        with stats_lock:
+            stats[outcome] += 1
+            if event is not None:
+                stats_by_event[event.name][outcome] += 1
+            if error is not None:
+                failed_emails.append((student_name, student_email, error))
+            processed[0] += 1
+            progress.update(processed[0])
+    
+    # Every real delivery is journaled; --resume consults the journal to skip them
+    journal = SendJournal(os.path.join(settings.LOG_FOLDER, settings.JOURNAL_FILENAME))
+    if resume:
+        logger.info(f"📒 Resuming: {len(journal)} deliveries found in {journal.path}")
+    
+    # Sender accounts; quotas count deliveries journaled in the last 24 hours
+    accounts = load_sender_accounts()
+    scheduler = AccountScheduler(accounts, journal.recent_by_sender)
+    if len(accounts) > 1:
+        logger.info(f"📮 Sharding students across {len(accounts)} sender accounts:")
+        for account in accounts:
+            quota = 'no quota' if account.daily_quota is None else \
+                f"{account.remaining} of {account.daily_quota} left today"
+            logger.info(f"   - {account.address} via {account.server} (weight {account.weight:g}, {quota})")
+    
+    # With --links the certificates are published once and each email only carries a signed link
+    certificate_links = None
+    if links:
+        from .links import open_certificate_links
+        try:
+            certificate_links = open_certificate_links(upload=not dry_run)
+        except (settings.ConfigError, ValueError) as e:
+            logger.error(f"❌ Error: {e}")
+            return
+        logger.info(f"🔗 Certificates will be linked from {certificate_links.storage.url('')}, links expire "
+                    f"{datetime.fromtimestamp(certificate_links.expires):%Y-%m-%d %H:%M}")
+    
+    # 1. For every event, index the certificates, report missing ones and prebuild the message, before logging in
+    prepared = []
+    manifests = {}  # Manifest path -> CertificateManifest (events sharing a folder share its manifest)
+    logos = {}  # Logo path -> image data, read once per run
+    to_publish = set()
+    for event in events:
+        with event.applied():
+            tag = f"[{event.name}] " if multi_event else ''
+            if multi_event:
+                logger.info(f"📅 Preparing {event.name} ({settings.STUDENT_LIST_CSV})")
+            if generate:
+                os.makedirs(settings.CERTIFICATES_FOLDER, exist_ok=True)
+            certificates = CertificateIndex(settings.CERTIFICATES_FOLDER, fuzzy=fuzzy_match)
+            logger.info(f"🗂️ Indexed {len(certificates)} certificates in {settings.CERTIFICATES_FOLDER}")
+            for kept, ignored in certificates.collisions:
+                logger.warning(f"⚠️ Certificates differ only by case/spacing, using {kept}, ignoring {ignored}")
+            missing = []
+            try:
+                expected_rows = count_csv_rows(settings.STUDENT_LIST_CSV) if settings.ROSTER_COUNT_ROWS else None
+                if generate:
+                    logger.info(f"🖨️ Certificates will be rendered from {settings.CERTIFICATE_TEMPLATE_PATH} while sending")
+                else:
+                    if fuzzy_match:
+                        certificates.claim_exact(iter_students(settings.STUDENT_LIST_CSV))
+                    missing = find_missing_certificates(certificates, iter_students(settings.STUDENT_LIST_CSV))
+            except FileNotFoundError:
+                logger.error(f"❌ Error: Student list not found at '{settings.STUDENT_LIST_CSV}'. Please check the file path.")
+                return
+            for expected, path in certificates.fuzzy_matches():
+                logger.warning(f"⚠️ Fuzzy match: '{expected}' -> {os.path.basename(path)}")
+            if missing:
+                logger.error(f"❌ {len(missing)} student(s) have no certificate in {settings.CERTIFICATES_FOLDER}:")
+                for student_name, student_email, expected in missing:
+                    logger.error(f"   - {student_name} ({student_email}): expected '{expected}'")
+            
+            # What each student was last sent; every real delivery is recorded where the manifest
+            # can be written, --changed-only consults it
+            manifest_path = manifest_path_for(settings.CERTIFICATES_FOLDER)
+            manifest = manifests.get(manifest_path)
+            if manifest is None:
+                manifest = manifests[manifest_path] = CertificateManifest(manifest_path)
+                if changed_only:
+                    logger.info(f"🧾 Changed-only: {len(manifest)} certificates recorded in {manifest.path}")
+                if not dry_run and not manifest.writable():
+                    manifest.disable()
+                    if changed_only:
+                        logger.warning(f"⚠️ {manifest.path} is not writable, this run's deliveries won't be recorded "
+                                       f"for --changed-only")
+            
+            if certificate_links is not None and not generate and not dry_run:
+                for row in iter_students(settings.STUDENT_LIST_CSV):
+                    path = certificates.lookup(row[0]) if len(row) >= 2 else None
+                    if path is None or (changed_only and manifest.unchanged(row[1], path, os.stat(path))):
+                        continue
+                    to_publish.add(path)
+            
+            # The embedded logo image (encoded once per event), or a link to a hosted copy
+            logo_path = settings.LOGO_IMAGE_PATH
+            try:
+                if certificate_links is None:
+                    if logo_path not in logos:
+                        with open(logo_path, 'rb') as fp:
+                            logos[logo_path] = fp.read()
+                    template = MessageTemplate(accounts[0].address, logos[logo_path])
+                else:
+                    link_expires = f"{datetime.fromtimestamp(certificate_links.expires):%B %d, %Y}"
+                    if settings.LINK_LOGO == 'hosted':
+                        logo_url = certificate_links.url(certificate_links.publish(logo_path))
+                        template = MessageTemplate(accounts[0].address, None, linked=True, logo_url=logo_url,
+                                                   link_expires=link_expires)
+                        logo_path = logo_url
+                    else:
+                        logo_path = settings.LINK_LOGO_PATH or logo_path
+                        if logo_path not in logos:
+                            with open(logo_path, 'rb') as fp:
+                                logos[logo_path] = fp.read()
+                        template = MessageTemplate(accounts[0].address, logos[logo_path], linked=True,
+                                                   link_expires=link_expires)
+                logger.info(f"✅ Logo image loaded: {logo_path}")
+            except FileNotFoundError:
+                logger.error(f"❌ Error: Logo image not found at '{logo_path}'.")
+                return
+            
+            prepared.append(PreparedEvent(event.name, tag, settings.STUDENT_LIST_CSV, expected_rows, certificates,
+                                          manifest, template, settings.CERTIFICATE_TEMPLATE_PATH,
+                                          settings.CERTIFICATE_NAME_STYLE))
+    
+    # 2. Publish the certificates (--links) in parallel, before logging in so no connection idles meanwhile.
+    # Anything not published here (rendered by --generate, or a failed upload) is published when its
+    # message is built.
+    if to_publish:
+        logger.info(f"☁️ Publishing {len(to_publish)} certificates ({settings.UPLOAD_WORKERS} uploads in parallel)...")
+        started = time.perf_counter()
+        failures = certificate_links.publish_all(sorted(to_publish))
+        metrics.observe('bulk_upload', time.perf_counter() - started)
+        logger.info(f"✅ {certificate_links.uploaded} uploaded, {certificate_links.already_published} already "
+                    f"published in {time.perf_counter() - started:.1f}s")
+        for path, error in failures:
+            logger.warning(f"⚠️ Could not publish {os.path.basename(path)} (will retry when sending): {error}")
+    
+    # 3. Login to SMTP Server (skip in dry-run); each worker slot gets one connection per account,
+    # shared by every event
+    connections = [{} for _ in range(workers)]
+    if not dry_run:
+        logger.info(f"🔐 Logging into email server ({workers} connection{'s' if workers > 1 else ''}"
+                    f"{f' per account, {len(accounts)} accounts' if len(accounts) > 1 else ''})...")
+        for account in accounts:
+            if not account.available:
+                continue
+            pool = open_connection_pool(workers, logger, account, metrics)
+            if pool is None:
+                scheduler.exhaust(account, 'login failed')
+                continue
+            for slot, server in enumerate(pool):
+                connections[slot][account.address] = server
+        if not connections[0]:
+            if all(account.exhausted is None for account in accounts):
+                logger.error("❌ Every sender account is out of quota for today - rerun later with --resume.")
+            return
+        logger.info("✅ Successfully logged into the email server.")
+    
+    def shutdown():
+        for pool in connections:
+            for server in pool.values():
+                if server:
+                    close_smtp_connection(server)
+        journal.close()
+        for manifest in manifests.values():
+            try:
+                manifest.close()
+            except OSError as e:
+                logger.warning(f"⚠️ Could not save the certificate manifest {manifest.path}: {e}")
+        # Keep the disk cache within ATTACHMENT_CACHE_DIR_BYTES across runs
+        attachments.prune()
+    
+    def remember_certificate(manifest, student_email, certificate_path, stat, digest):
+        """Record a certificate in the manifest; one that can't be written is turned off for the rest of the run."""
+        try:
+            manifest.record(student_email, certificate_path, stat, digest)
+        except OSError as e:
+            with stats_lock:
+                if manifest.disabled:
+                    return
+                manifest.disable()
+            logger.warning(f"⚠️ Could not write the certificate manifest {manifest.path}, no longer recording "
+                           f"certificates for --changed-only this run: {e}")
+    
+    def prepare(event, row):
+        """Validate one student of a PreparedEvent and build their message; returns None if there is nothing to send."""
+        student_name, student_email = row
+        certificates, manifest, template = event.certificates, event.manifest, event.template
+        tag = event.tag
+        
+        # Validate email format
+        if not validate_email(student_email):
+            logger.warning(f"⚠️ {tag}Invalid email format: {student_email} for {student_name}",
+                           extra={'outcome': 'skipped', 'email': student_email, 'event': event.name})
+            record('skipped', event=event)
+            return None
+        
+        # Find the certificate
+        certificate_path = certificates.lookup(student_name)
+        
+        if certificate_path is None:
+            expected = os.path.join(certificates.folder, certificates.filename_for(student_name))
+            logger.error(f"❌ {tag}Error: Certificate for {student_name} not found at {expected}",
+                         extra={'outcome': 'error', 'email': student_email, 'event': event.name})
+            record('errors', student_name, student_email, "Certificate file not found", event)
+            return None
+        
+        # Splice the personalized pieces into the prebuilt message
+        try:
+            started = time.perf_counter()
+            stat = os.stat(certificate_path)
+            if changed_only and manifest.unchanged(student_email, certificate_path, stat):
+                # Same mtime and size as when it was sent: skip without reading it
+                logger.debug(f"⏭️ {tag}Certificate for {student_email} unchanged, skipping",
+                             extra={'outcome': 'unchanged', 'email': student_email, 'event': event.name})
+                record('unchanged', event=event)
+                return None
+            if certificate_links is not None:
+                published = certificate_links.publish(certificate_path, stat)
+                digest = published.digest
+            else:
+                attachment = attachments.get(certificate_path)
+                digest = attachment.digest
+            loaded = time.perf_counter()
+            metrics.observe('certificate_load', loaded - started)
+            if changed_only and (manifest.matches(student_email, certificate_path, digest) or
+                                 journal.was_delivered(student_email, digest)):
+                # Touched or sent before the manifest existed, but the content is what they already have
+                if not dry_run:
+                    remember_certificate(manifest, student_email, certificate_path, stat, digest)
+                logger.debug(f"⏭️ {tag}Certificate for {student_email} unchanged, skipping",
+                             extra={'outcome': 'unchanged', 'email': student_email, 'event': event.name})
+                record('unchanged', event=event)
+                return None
+            if resume and journal.was_delivered(student_email, digest):
+                logger.debug(f"⏭️ {tag}Already delivered to {student_email}, skipping",
+                             extra={'outcome': 'already_sent', 'email': student_email, 'event': event.name})
+                record('already_sent', event=event)
+                return None
+            if certificate_links is not None:
+                payload = template.build_linked(student_email, student_name.title(), certificate_links.url(published))
+            else:
+                payload = template.build_encoded(student_email, student_name.title(),
+                                                 os.path.basename(certificate_path), attachment.encoded)
+            metrics.observe('message_build', time.perf_counter() - loaded)
+        except Exception as e:
+            logger.error(f"⚠️ {tag}Error processing email for {student_name}: {e}")
+            record('errors', student_name, student_email, str(e), event)
+            return None
+        
+        if dry_run:
+            via = f" via {scheduler.ranking(student_email)[0].address}" if len(accounts) > 1 else ''
+            logger.info(f"✔️ [DRY-RUN] {tag}Would send to {student_name} at {student_email}{via}",
+                        extra={'outcome': 'dry_run', 'email': student_email, 'event': event.name})
+            record('sent', event=event)
+            return None
+        
+        return OutgoingEmail(student_name, student_email, digest, payload, (certificate_path, stat), event)
+    
+    def transmit(slot, email, account):
+        """Make one delivery attempt through `account`'s connection in `slot`, reconnecting if needed."""
+        pool = connections[slot]
+        if pool.get(account.address) is None:
+            pool[account.address] = open_smtp_connection(account, metrics)
+        started = time.perf_counter()
+        reply = deliver_message(pool[account.address], account.address, email.email,
+                                email.event.template.for_sender(email.payload, account.address))
+        metrics.observe('smtp_send', time.perf_counter() - started)
+        return reply
+    
+    def drop_connection(slot, error, account):
+        """Close `account`'s connection in `slot` if `error` means it is no longer usable (421 closes the channel too)."""
+        import smtplib
+        dropped = smtp_reply_code(error) == 421 or isinstance(error, smtplib.SMTPServerDisconnected) or (
+            isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException))
+        server = connections[slot].get(account.address)
+        if dropped and server is not None:
+            server.close()
+            connections[slot][account.address] = None
+    
+    def retire(account, error):
+        """Stop sending through an account that is over its quota."""
+        if scheduler.exhaust(account, str(error)):
+            logger.warning(f"📮 {account.address} is over its sending quota, failing over to the other accounts: {error}")
+    
+    def defer(email, reason='every sender account is out of quota'):
+        if not stats['deferred']:
+            logger.warning(f"⏸️ Deferring the remaining students: {reason}")
+        logger.debug(f"⏸️ {email.event.tag}Deferring {email.email}",
+                     extra={'outcome': 'deferred', 'email': email.email, 'event': email.event.name})
+        record('deferred', event=email.event)
+    
+    def mark_sent(email, code, reply, account, retries=0):
+        scheduler.confirm(account)
+        metrics.add_delivery(len(email.payload), retries, account.address)
+        journal.record(email.email, email.digest, email.name, f"{code} {reply}", account.address)
+        logger.info(f"✔️ {email.event.tag}Successfully sent certificate to {email.name} at {email.email}",
+                    extra={'outcome': 'sent', 'email': email.email, 'sender': account.address, 'retries': retries,
+                           'event': email.event.name})
+        record('sent', event=email.event)
+        remember_certificate(email.event.manifest, email.email, email.certificate[0], email.certificate[1],
+                             email.digest)
+    
+    def safe_prepare(item):
+        """Build stage: prepare() for an (event, row) pair that records unexpected errors instead of raising."""
+        event, row = item
+        try:
+            return prepare(event, row)
+        except Exception as e:
+            student_name, student_email = (list(row) + ['', ''])[:2]
+            logger.error(f"⚠️ {event.tag}Unexpected error for {student_name}: {e}")
+            record('errors', student_name, student_email, str(e), event)
+            return None
+    
+    def deliver(slot, email):
+        """Send one prepared certificate email through connection `slot`."""
+        # Send the email, reconnecting if the server dropped the connection and
+        # failing over to the next account if this one is over its quota
+        attempt = 0
+        while True:
+            account = scheduler.reserve(email.email)
+            if account is None:
+                defer(email)
+                break
+            try:
+                code, reply = transmit(slot, email, account)
+            except Exception as e:
+                scheduler.release(account)
+                drop_connection(slot, e, account)
+                if is_quota_error(e):
+                    retire(account, e)
+                    continue
+                attempt += 1
+                # A refused recipient (unknown user, full mailbox...) fails alone, without retries
+                if attempt < retry_attempts and not is_recipient_refusal(e):
+                    logger.warning(f"⚠️ Retry {attempt}/{retry_attempts} for {email.name}: {e}")
+                    time.sleep(settings.RETRY_DELAY)
+                    continue
+                logger.error(f"❌ {email.event.tag}Failed after {attempt} attempt(s) for {email.name}: {e}",
+                             extra={'outcome': 'error', 'email': email.email, 'sender': account.address,
+                                    'event': email.event.name})
+                record('errors', email.name, email.email, str(e), email.event)
+                metrics.add_retries(attempt - 1)
+                break
+            mark_sent(email, code, reply, account, retries=attempt)
+            break
+        
+        # Rate limiting
+        if delay > 0:
+            time.sleep(delay)
+    
+    def safe_deliver(slot, email):
+        try:
+            deliver(slot, email)
+        except Exception as e:
+            logger.error(f"⚠️ {email.event.tag}Unexpected error for {email.name}: {e}")
+            record('errors', email.name, email.email, str(e), email.event)
+    
+    def next_message(pipeline):
+        """Take the next built message, recording how long the sender waited for it."""
+        started = time.perf_counter()
+        email = pipeline.get()
+        metrics.observe('build_wait', time.perf_counter() - started)
+        return email
+    
+    async def deliver_all_async(pipeline):
+        """Send through every connection concurrently, paced by a shared token bucket and per-connection AIMD."""
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+        
+        loop = asyncio.get_event_loop()
+        executor = ThreadPoolExecutor(max_workers=workers)
+        # Waiting for built messages blocks a thread, so it gets its own pool
+        feeder = ThreadPoolExecutor(max_workers=workers)
+        cap = daily_cap
+        if cap is None:
+            cap = settings.DAILY_SEND_LIMIT if len(accounts) == 1 else 0
+        remaining_quota = max(cap - journal.recent_deliveries, 0) if cap else None
+        if remaining_quota is not None:
+            logger.info(f"📅 Daily cap: {remaining_quota} of {cap} messages left in the last 24 hours")
+        limiter = TokenBucket(rate=rate or None, limit=remaining_quota)
+        throttles = []
+        
+        async def connection_worker(slot):
+            connection_throttles = {}
+            for account in accounts:
+                connection_throttles[account.address] = AIMDThrottle(
+                    rate=(rate / workers) if rate else settings.AIMD_START_RATE, max_rate=rate or None)
+            throttles.extend(connection_throttles.values())
+            while True:
+                email = await loop.run_in_executor(feeder, next_message, pipeline)
+                if email is None:
+                    return
+                
+                # Every attempt is paced, but only the first one counts towards the daily cap
+                # and that count is handed back unless the message is delivered
+                attempts = throttled = 0
+                counted = delivered = False
+                while True:
+                    if not await limiter.acquire(count=not counted):
+                        defer(email, 'daily cap reached')
+                        break
+                    counted = True
+                    account = scheduler.reserve(email.email)
+                    if account is None:
+                        defer(email)
+                        break
+                    throttle = connection_throttles[account.address]
+                    await throttle.wait()
+                    try:
+                        code, reply = await loop.run_in_executor(executor, transmit, slot, email, account)
+                    except Exception as e:
+                        scheduler.release(account)
+                        drop_connection(slot, e, account)
+                        code = smtp_reply_code(e)
+                        if is_quota_error(e):
+                            retire(account, e)
+                            continue
+                        refused = is_recipient_refusal(e)  # Fails alone: not a throttle, nothing to retry
+                        if code in THROTTLE_REPLY_CODES and not refused and throttled < settings.MAX_THROTTLE_RETRIES:
+                            throttled += 1
+                            pause = throttle.on_throttle()
+                            logger.warning(f"🐢 Throttled ({code}) on connection {slot + 1} ({account.address}), now "
+                                           f"{throttle.rate:.2f} msg/s, retrying {email.name} in {pause:.1f}s")
+                            await asyncio.sleep(pause)
+                            continue
+                        attempts += 1
+                        permanent = refused or (code is not None and 500 <= code < 600)
+                        if permanent or attempts >= retry_attempts or code in THROTTLE_REPLY_CODES:
+                            logger.error(f"❌ {email.event.tag}Failed after {attempts + throttled} attempt(s) for "
+                                         f"{email.name}: {e}",
+                                         extra={'outcome': 'error', 'email': email.email,
+                                                'sender': account.address, 'event': email.event.name})
+                            record('errors', email.name, email.email, str(e), email.event)
+                            metrics.add_retries(attempts + throttled - 1)
+                            break
+                        pause = throttle.on_error()
+                        logger.warning(f"⚠️ Retry {attempts}/{retry_attempts} for {email.name} in {pause:.1f}s: {e}")
+                        await asyncio.sleep(pause)
+                        continue
+                    throttle.on_success()
+                    mark_sent(email, code, reply, account, retries=attempts + throttled)
+                    delivered = True
+                    break
+                if counted and not delivered:
+                    limiter.release()
+        
+        try:
+            await asyncio.gather(*[connection_worker(slot) for slot in range(workers)])
+        finally:
+            executor.shutdown()
+            feeder.shutdown()
+        for slot, throttle in enumerate(throttles, 1):
+            logger.debug(f"Connection {slot} finished at {throttle.rate:.2f} msg/s")
+    
+    # 5. Stream students from the CSVs straight into delivery, interleaving the events in proportion
+    # to their size so they share the connections (and any quota) evenly
+    try:
+        streams = [(event, metrics.timed(iter_students(event.roster), 'csv_read')) for event in prepared]
+    except FileNotFoundError as e:
+        logger.error(f"❌ Error: Student list not found at '{e.filename}'. Please check the file path.")
+        shutdown()
+        return
+    
+    if generate:
+        # Render in the shared process pool a few rows ahead of the senders, so rendering and sending overlap
+        from .generate import generate_certificates
+        
+        def rendered(event, rows):
+            for row, path, error in generate_certificates(rows, event.certificate_template, event.certificates.folder,
+                                                          event.certificates.filename_for,
+                                                          workers=settings.GENERATION_WORKERS, style=event.name_style,
+                                                          pool=render_pool):
+                if error is not None:
+                    logger.error(f"❌ {event.tag}Error: Could not render certificate for {row[0]}: {error}")
+                else:
+                    event.certificates.add(path)
+                yield row
+        
+        streams = [(event, metrics.timed(rendered(event, rows), 'render_wait')) for event, rows in streams]
+    
+    students = interleave(streams, [event.expected_rows for event in prepared])
+    progress_total = None
+    if all(event.expected_rows is not None for event in prepared):
+        progress_total = sum(event.expected_rows for event in prepared)
+    progress = ProgressReporter(progress_total, prefix='Sending Certificates')
+    for event in prepared:
+        logger.info(f"📋 Found {event.expected_rows if event.expected_rows is not None else 'an unknown number of'} "
+                    f"students in {event.roster}")
+    
+    # Builder threads read, encode and assemble messages into a small bounded queue
+    # while the senders below keep their SMTP connections busy draining it
+    pipeline = MessagePipeline(students, safe_prepare, builders=settings.BUILDER_WORKERS,
+                               depth=settings.PIPELINE_DEPTH or workers * 2).start()
+    
+    def worker(slot):
+        while True:
+            email = next_message(pipeline)
+            if email is None:
+                return
+            safe_deliver(slot, email)
+    
+    try:
+        if use_async and not dry_run:
+            import asyncio
+            asyncio.run(deliver_all_async(pipeline))
+        elif workers == 1:
+            worker(0)
+        else:
+            # Each sender thread owns one connection (per account)
+            threads = [threading.Thread(target=worker, args=(slot,), daemon=True) for slot in range(workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    finally:
+        pipeline.close()
+    
+    stats['total'] = processed[0]
+    
+    # Cleanup
+    shutdown()
+    
+    # Final statistics
+    progress.close()  # Final redraw, then a new line after the progress bar
+    logger.info("\n" + "="*60)
+    logger.info("📊 EMAIL SENDING SUMMARY")
+    logger.info("="*60)
+    logger.info(f"Total students: {stats['total']}")
+    logger.info(f"✅ Successfully sent: {stats['sent']}")
+    logger.info(f"❌ Errors encountered: {stats['errors']}")
+    logger.info(f"⏭️ Skipped (invalid email): {stats['skipped']}")
+    if resume:
+        logger.info(f"⏭️ Skipped (already delivered): {stats['already_sent']}")
+    if changed_only:
+        logger.info(f"⏭️ Skipped (certificate unchanged): {stats['unchanged']}")
+    if certificate_links is not None:
+        logger.info(f"🔗 Published files (certificates and logo): {certificate_links.uploaded} uploaded, "
+                    f"{certificate_links.already_published} already published")
+    else:
+        cache_counters = attachments.counters()
+        pruned = f", {cache_counters['disk_evictions']} old files removed" if cache_counters['disk_evictions'] else ''
+        logger.info(f"📎 Attachment cache: {cache_counters['hits']} memory hits, {cache_counters['disk_hits']} disk hits, "
+                    f"{cache_counters['misses']} misses{pruned}")
+    if stats['deferred']:
+        logger.info(f"⏸️ Deferred (daily cap or quotas reached): {stats['deferred']} - rerun later with --resume")
+    if len(accounts) > 1 and not dry_run:
+        elapsed = max(time.perf_counter() - run_started, 1e-9)
+        logger.info("📮 Per-account throughput:")
+        for account in accounts:
+            quota = '' if account.daily_quota is None else f", {account.remaining} of {account.daily_quota} quota left"
+            status = f" - out of rotation ({account.exhausted})" if account.exhausted else ''
+            logger.info(f"   - {account.address}: {account.sent} sent ({account.sent / elapsed:.2f} msg/s{quota}){status}")
+    if multi_event:
+        logger.info("📅 Per-event results:")
+        for event in events:
+            counts = stats_by_event[event.name]
+            skipped = counts['skipped'] + counts['already_sent'] + counts['unchanged']
+            deferred = f", {counts['deferred']} deferred" if counts['deferred'] else ''
+            logger.info(f"   - {event.name}: {counts['sent']} sent, {counts['errors']} errors, {skipped} skipped{deferred}")
+    
+    if failed_emails:
+        logger.info("\n❌ Failed Emails:")
+        for name, email, error in failed_emails:
+            logger.info(f"   - {name} ({email}): {error}")
+    
+    logger.info("="*60)
+    
+    # Machine-readable run report
+    stamp = datetime.fromtimestamp(metrics.started).strftime("%Y%m%d_%H%M%S")
+    report_path = os.path.join(settings.LOG_FOLDER, f'run_report_{stamp}.json')
+    report = metrics.write_report(report_path, stats)
+    logger.info(f"📈 Run report saved to {report_path} ({report['messages_per_second']} msg/s)")
+    for stage, summary in report['stages'].items():
+        logger.debug(f"   {stage}: p50 {summary['p50_seconds'] * 1000:.2f} ms, "
+                     f"p95 {summary['p95_seconds'] * 1000:.2f} ms, p99 {summary['p99_seconds'] * 1000:.2f} ms")
+    if metrics_textfile:
+        metrics.write_prometheus(metrics_textfile, stats)
+        logger.info(f"📈 Prometheus metrics written to {metrics_textfile}")
+    
+    if dry_run:
+        logger.info("\n🧪 Dry-run complete! Run without --dry-run to send actual emails.")
+    
+    return stats
@@ -0,0 +1,206 @@
+"""
+Event settings for the certificate mailer.
+
+Everything here is a plain module attribute that the rest of the package
+reads at call time, so scripts can override a setting before sending::
+
+    from certificate_mailer import settings
+    settings.STUDENT_LIST_CSV = 'day2/students.csv'
+
+Credentials live in config.py (see config.example.py), which is only loaded
+when something needs it - see ``load_config()``. The command line also
+applies event_settings.py from the working directory (see
+event_settings.example.py and ``load_event_settings()``), so an installed
+copy can be set up without editing this file.
+"""
+
+import os
+import sys
+
+# ==============================================================================
+# --- ⚙️ SETTINGS - CONFIGURE YOUR EVENT HERE ⚙️ ---
+# ==============================================================================
+
+# --- Email Sender Details ---
+SENDER_NAME = "The JIT Google Student Ambassadors"
+
+# --- Email Content Details ---
+EVENT_NAME = "Gemini AI Workshop"
+EMAIL_SUBJECT = f"🎉 Your Certificate for the {EVENT_NAME} is Here!"
+SENDER_ORGANIZATION = "The JIT Google Student Ambassadors Team"
+TEAM_MEMBERS_SIGNATURE = "Siddhesh Suryawanshi | Karan Rathod | Nitisha Naigaokar"
+
+# --- File and Folder Paths ---
+STUDENT_LIST_CSV = 'students.csv'
+LOGO_IMAGE_PATH = 'logo.jpg'
+CERTIFICATES_FOLDER = 'certificates'
+LOG_FOLDER = 'logs'
+CONFIG_PATH = 'config.py'  # Credentials, loaded on first use (see load_config)
+EVENT_SETTINGS_PATH = 'event_settings.py'  # Overrides for the settings in this file (see load_event_settings)
+
+# Count roster rows up front for the progress bar (set False for huge lists to show "unknown")
+ROSTER_COUNT_ROWS = True
+
+# --- Certificate Filename Format ---
+CERTIFICATE_FILENAME_FORMAT = "{name} Gemini Ai Workshop_ Beginner To Advance.pdf"
+
+# Minimum similarity (0-1) between the student's name and the name in a certificate
+# filename for --fuzzy-match to accept it
+CERTIFICATE_FUZZY_CUTOFF = 0.9
+# ...and how much closer it must be than the next-best certificate (otherwise it's ambiguous)
+CERTIFICATE_FUZZY_MARGIN = 0.05
+
+# --- Certificate Generation (--generate) ---
+CERTIFICATE_TEMPLATE_PATH = 'certificate_template.jpg'  # JPEG background for generated certificates
+CERTIFICATE_NAME_STYLE = {
+    'font_size': 36,
+    'position': (0.5, 0.45),  # Centre of the name, as fractions of width/height from the bottom-left
+    'color': (0.26, 0.52, 0.96),  # RGB, 0-1
+}
+GENERATION_WORKERS = None  # Rendering processes (None = one per CPU core)
+
+# --- SMTP Server Settings (for Gmail) ---
+SMTP_SERVER = "smtp.gmail.com"
+SMTP_PORT = 587
+SMTP_USE_TLS = True
+SMTP_TIMEOUT = 60  # seconds
+
+# --- Delivery Settings ---
+DEFAULT_WORKERS = 1  # Parallel SMTP connections (each one logs in separately)
+BUILDER_WORKERS = 2  # Threads reading certificates and building messages ahead of the senders
+PIPELINE_DEPTH = None  # Built messages waiting for a sender (None = 2 per connection)
+
+# --- Attachment Cache ---
+ATTACHMENT_CACHE_BYTES = 64 * 1024 * 1024  # Encoded certificates kept in memory (LRU)
+ATTACHMENT_CACHE_DIR = None  # e.g. 'cache/attachments' to also keep them on disk between runs
+ATTACHMENT_CACHE_DIR_BYTES = 512 * 1024 * 1024  # Disk cache kept after each run (least recently used files removed first)
+
+# --- Roster Validation (--validate-only) ---
+DNS_TIMEOUT = 10  # seconds to wait for all domain lookups
+DNS_WORKERS = 16  # Domains resolved in parallel
+
+# --- Logging and Progress ---
+LOG_FORMAT = 'text'  # 'text', or 'json' for one JSON object per line (--log-format)
+LOG_QUEUE = False  # Hand log records to a background writer thread (--log-queue)
+PROGRESS_REFRESH_HZ = 4  # Progress bar redraws per second (0 = redraw after every student)
+
+# --- Send Journal (used by --resume) ---
+JOURNAL_FILENAME = 'send_journal.jsonl'  # Stored inside LOG_FOLDER
+JOURNAL_SYNC_EVERY = 50     # fsync after this many deliveries...
+JOURNAL_SYNC_INTERVAL = 5   # ...or this many seconds, whichever comes first
+
+# --- Certificate Manifest (used by --changed-only) ---
+MANIFEST_SUFFIX = '.manifest.jsonl'  # Kept next to CERTIFICATES_FOLDER, e.g. certificates.manifest.jsonl
+
+# --- Link Delivery (--links) ---
+# Certificates are published once and each email carries a signed, expiring
+# download link instead of the attachment. The signing key is LINK_SIGNING_KEY in config.py.
+LINK_STORAGE = 'local'  # Storage backend (see storage.STORAGE_BACKENDS)
+LINK_STORAGE_DIR = 'published'  # local: directory --serve-links serves...
+LINK_BASE_URL = None  # ...at this URL, e.g. 'https://certificates.example.org/'
+LINK_EXPIRY_DAYS = 30
+LINK_LOGO = 'hosted'  # 'hosted' publishes the logo and links to it, 'inline' embeds LINK_LOGO_PATH
+LINK_LOGO_PATH = None  # Logo to embed with LINK_LOGO = 'inline', e.g. a downscaled copy (None = LOGO_IMAGE_PATH)
+UPLOAD_WORKERS = 8  # Parallel uploads before sending
+
+# --- Retry Settings ---
+MAX_RETRIES = 3
+RETRY_DELAY = 5  # seconds
+
+# --- Adaptive Rate Limiting (--async mode) ---
+ASYNC_RATE_LIMIT = 5.0      # Messages per second across all connections (0 = unlimited)
+DAILY_SEND_LIMIT = 500      # Messages per 24 hours (Gmail: ~500, Workspace: ~2000; 0 = unlimited)
+AIMD_INCREASE = 0.1         # Messages/sec added to a connection's rate after each success
+AIMD_SLOW_START = 2.0       # Factor applied to a connection's rate after each success until it is first throttled
+AIMD_DECREASE = 0.5         # Factor applied to a connection's rate after a throttling reply
+AIMD_START_RATE = 2.0       # Starting messages/sec per connection when --rate is 0 (unlimited)
+AIMD_MIN_RATE = 0.05        # Never slow a connection below this (messages/sec)
+BACKOFF_BASE = 1.0          # seconds; doubled on every consecutive failure (with jitter)
+BACKOFF_MAX = 300           # seconds
+MAX_THROTTLE_RETRIES = 10   # Throttling replies tolerated per message before giving up
+
+# ==============================================================================
+# --- 📜 EMAIL TEMPLATES 📜 ---
+# ==============================================================================
+# The defaults ship inside the package; copy one and point its setting at the
+# copy to change the email. Placeholders: {name}, {event_name},
+# {sender_organization}, {team_members_signature}. Values are HTML-escaped in
+# the HTML template; write a literal brace as {{ or }}.
+PACKAGE_TEMPLATES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+HTML_TEMPLATE_PATH = os.path.join(PACKAGE_TEMPLATES, 'certificate_email.html')
+TEXT_TEMPLATE_PATH = os.path.join(PACKAGE_TEMPLATES, 'certificate_email.txt')  # Plain-text alternative (None = HTML only)
+# Used with --links; also have {certificate_url}, {link_expires} and {logo_url}
+LINK_HTML_TEMPLATE_PATH = os.path.join(PACKAGE_TEMPLATES, 'certificate_link_email.html')
+LINK_TEXT_TEMPLATE_PATH = os.path.join(PACKAGE_TEMPLATES, 'certificate_link_email.txt')
+
+
+# ==============================================================================
+# --- 🔑 CREDENTIALS (config.py) ---
+# ==============================================================================
+
+class ConfigError(Exception):
+    """config.py is missing or could not be loaded, or event_settings.py is invalid."""
+
+_config = None
+
+def load_config():
+    """
+    Load config.py on first use and return it as a module.
+
+    Reads CONFIG_PATH from the working directory, falling back to an
+    importable ``config`` module. Importing the package never touches the
+    credentials; only logging in (and validating the setup) does. Raises
+    ConfigError if there is no config.
+    """
+    global _config
+    if _config is not None:
+        return _config
+    if os.path.exists(CONFIG_PATH):
+        from importlib import util
+        spec = util.spec_from_file_location('config', CONFIG_PATH)
+        module = util.module_from_spec(spec)
+        try:
+            spec.loader.exec_module(module)
+        except Exception as e:
+            raise ConfigError(f"{CONFIG_PATH} could not be loaded: {e}") from e
+        sys.modules.setdefault('config', module)
+    else:
+        try:
+            import config as module
+        except ImportError:
+            raise ConfigError(f"{CONFIG_PATH} not found. Please create it and add your EMAIL_ADDRESS and "
+                              "EMAIL_PASSWORD.\n💡 Tip: Copy config.example.py to config.py and update "
+                              "with your credentials.") from None
+    _config = module
+    return module
+
+def load_event_settings(path=None):
+    """
+    Apply the event settings file (EVENT_SETTINGS_PATH) from the working directory.
+
+    Every upper-case name it assigns overrides the setting of the same name.
+    If it sets EVENT_NAME but not EMAIL_SUBJECT, the event name in the
+    subject is replaced. Returns the path that was applied, or None if there
+    is no such file. Raises ConfigError if it can't be loaded or assigns
+    something that isn't a setting.
+    """
+    path = path or EVENT_SETTINGS_PATH
+    if not os.path.exists(path):
+        return None
+    from importlib import util
+    spec = util.spec_from_file_location('event_settings', path)
+    module = util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except Exception as e:
+        raise ConfigError(f"{path} could not be loaded: {e}") from e
+
+    settings = globals()
+    overrides = {key: value for key, value in vars(module).items() if key.isupper() and not key.startswith('_')}
+    unknown = sorted(key for key in overrides if key not in settings)
+    if unknown:
+        raise ConfigError(f"{path} sets unknown setting(s): {', '.join(unknown)}")
+    if 'EVENT_NAME' in overrides and 'EMAIL_SUBJECT' not in overrides:
+        overrides['EMAIL_SUBJECT'] = EMAIL_SUBJECT.replace(EVENT_NAME, overrides['EVENT_NAME'])
+    settings.update(overrides)
+    return path
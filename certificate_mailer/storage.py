@@ -0,0 +1,60 @@
+"""
+Storage backends that ``--links`` publishes certificates to.
+"""
+
+import os
+import threading
+from urllib.parse import quote
+
+from . import settings
+
+class LocalDirectoryStorage:
+    """
+    Publishes files into a directory that a static file server exposes at ``base_url``.
+
+    Keys are relative paths using ``/`` (``<digest>/<filename>``); ``put()``
+    writes through a temporary file so a server never hands out half a
+    certificate. Another backend (an S3-compatible bucket, say) only needs
+    the same three methods and an entry in STORAGE_BACKENDS.
+    """
+
+    def __init__(self, directory, base_url):
+        self.directory = directory
+        self.base_url = base_url.rstrip('/') + '/'
+
+    def _path(self, key):
+        return os.path.join(self.directory, *key.split('/'))
+
+    def exists(self, key, size):
+        """True if `key` is already published with `size` bytes."""
+        try:
+            return os.path.getsize(self._path(key)) == size
+        except OSError:
+            return False
+
+    def put(self, key, data):
+        """Publish `data` under `key`, replacing what was there."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f'{path}.{threading.get_ident()}.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(data)
+        os.replace(temporary, path)
+
+    def url(self, key):
+        """Public URL of `key` (unsigned)."""
+        return self.base_url + quote(key)
+
+# LINK_STORAGE name -> factory taking no arguments and reading its own settings
+STORAGE_BACKENDS = {
+    'local': lambda: LocalDirectoryStorage(settings.LINK_STORAGE_DIR, settings.LINK_BASE_URL),
+}
+
+def open_storage(name=None):
+    """Create the storage backend named `name` (default: settings.LINK_STORAGE)."""
+    name = settings.LINK_STORAGE if name is None else name
+    try:
+        factory = STORAGE_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown LINK_STORAGE {name!r} (choose from: {', '.join(sorted(STORAGE_BACKENDS))})") from None
+    return factory()
@@ -0,0 +1,78 @@
+"""
+The email body templates, compiled once and rendered per recipient.
+"""
+
+import html
+import string
+
+class CompiledTemplate:
+    """
+    A ``str.format``-style template compiled into static byte segments and slots.
+
+    The source is parsed once; ``render()`` only formats the slot values and
+    joins them with the pre-encoded static segments. ``partial()`` fills in
+    fields that are the same for every recipient (the event name, the
+    signature...) and returns a new template with those folded into the
+    static segments, so only the per-recipient fields are left as slots.
+    With ``escape=True`` every value is HTML-escaped.
+    """
+
+    def __init__(self, source, escape=False):
+        parts = []
+        for literal, field, spec, conversion in string.Formatter().parse(source):
+            if literal:
+                parts.append(literal)
+            if field is not None:
+                if not field.isidentifier():
+                    raise ValueError(f"Unsupported template placeholder {{{field}}}: use plain names like {{name}}")
+                parts.append((field, conversion, spec))
+        self._compile(parts, escape)
+
+    @classmethod
+    def _from_parts(cls, parts, escape):
+        template = cls.__new__(cls)
+        template._compile(parts, escape)
+        return template
+
+    def _compile(self, parts, escape):
+        self.escape = escape
+        self._parts = parts
+        self._static = [[]]
+        self._slots = []
+        for part in parts:
+            if isinstance(part, tuple):
+                self._slots.append(part)
+                self._static.append([])
+            else:
+                self._static[-1].append(part)
+        self._static = [''.join(pieces).encode('utf-8') for pieces in self._static]
+        self.fields = {field for field, _, _ in self._slots}
+
+    def _format(self, value, conversion, spec):
+        if conversion:
+            value = {'r': repr, 's': str, 'a': ascii}[conversion](value)
+        text = format(value, spec)
+        return html.escape(text, quote=True) if self.escape else text
+
+    def partial(self, **values):
+        """Return a new template with `values` rendered into its static segments."""
+        parts = []
+        for part in self._parts:
+            if isinstance(part, tuple) and part[0] in values:
+                part = self._format(values[part[0]], part[1], part[2])
+            parts.append(part)
+        return self._from_parts(parts, self.escape)
+
+    def render(self, **values):
+        """Render to UTF-8 bytes; raises KeyError for a missing field, like ``str.format``."""
+        static = self._static
+        out = [static[0]]
+        for index, (field, conversion, spec) in enumerate(self._slots, 1):
+            out.append(self._format(values[field], conversion, spec).encode('utf-8'))
+            out.append(static[index])
+        return b''.join(out)
+
+def load_template(path, escape=False):
+    """Read and compile a template file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return CompiledTemplate(f.read(), escape=escape)
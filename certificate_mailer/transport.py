@@ -0,0 +1,96 @@
+"""
+SMTP connections and single-recipient delivery.
+
+smtplib is only imported once a connection is actually opened, so dry runs
+and validation never load it.
+"""
+
+import collections
+import time
+
+from . import settings
+
+# A prepared email waiting to be sent
+# (certificate is (path, os.stat_result) as read, for the certificate manifest; event is the sender's
+# PreparedEvent it belongs to)
+OutgoingEmail = collections.namedtuple('OutgoingEmail', ['name', 'email', 'digest', 'payload', 'certificate', 'event'])
+
+def open_smtp_connection(account, metrics=None):
+    """Open an SMTP connection for a SenderAccount, upgrade it with STARTTLS and log in."""
+    import smtplib
+
+    started = time.perf_counter()
+    server = smtplib.SMTP(account.server, account.port, timeout=settings.SMTP_TIMEOUT)
+    try:
+        if account.use_tls:
+            server.starttls()
+        server.login(account.address, account.password)
+    except Exception:
+        server.close()
+        raise
+    if metrics is not None:
+        metrics.observe('smtp_connect', time.perf_counter() - started)
+    return server
+
+def close_smtp_connection(server):
+    """Politely close an SMTP connection, ignoring errors from dead sockets."""
+    try:
+        server.quit()
+    except Exception:
+        server.close()
+
+def _reset_transaction(server):
+    import smtplib
+
+    try:
+        server.rset()
+    except smtplib.SMTPServerDisconnected:
+        pass
+
+def deliver_message(server, sender, recipient, payload):
+    """
+    Send a prebuilt message to one recipient and return the server's reply.
+
+    This is ``sendmail()`` for a single recipient, except that it returns
+    the ``(code, text)`` reply to DATA so it can be journaled. Failures raise
+    the same exceptions ``sendmail()`` would.
+    """
+    import smtplib
+
+    server.ehlo_or_helo_if_needed()
+    options = []
+    if server.does_esmtp and server.has_extn('size'):
+        options.append(f"size={len(payload)}")
+    code, reply = server.mail(sender, options)
+    if code != 250:
+        _reset_transaction(server)
+        raise smtplib.SMTPSenderRefused(code, reply, sender)
+    code, reply = server.rcpt(recipient)
+    if code not in (250, 251):
+        _reset_transaction(server)
+        raise smtplib.SMTPRecipientsRefused({recipient: (code, reply)})
+    code, reply = server.data(payload)
+    if code != 250:
+        _reset_transaction(server)
+        raise smtplib.SMTPDataError(code, reply)
+    return code, reply.decode('utf-8', 'replace')
+
+def open_connection_pool(size, logger, account, metrics=None):
+    """
+    Open `size` authenticated SMTP connections for `account`.
+
+    Returns the list of connections, or None if any login failed (in which
+    case every connection opened so far is closed again).
+    """
+    connections = []
+    try:
+        for _ in range(size):
+            connections.append(open_smtp_connection(account, metrics))
+    except Exception as e:
+        logger.error(f"❌ Error: Could not log into the email server as {account.address}.")
+        logger.error(f"   Details: {e}")
+        logger.error("💡 Tip: Make sure you're using an App Password, not your regular Gmail password.")
+        for server in connections:
+            close_smtp_connection(server)
+        return None
+    return connections
@@ -0,0 +1,297 @@
+"""
+Logging, configuration checks and roster streaming shared by the mailer's commands.
+"""
+
+import atexit
+import collections
+import csv
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime
+
+from . import settings
+from .accounts import load_sender_accounts
+from .template_engine import load_template
+
+class JsonLogFormatter(logging.Formatter):
+    """
+    Formats each record as one JSON object per line.
+
+    Every line has ``time``, ``level``, ``logger`` and ``message``; fields
+    passed with ``extra=`` (``outcome``, ``email``, ``sender``...) are
+    included as-is, so log shippers can filter on them without parsing
+    the message text.
+    """
+
+    _RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in self._RECORD_FIELDS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+_log_listener = None  # Background writer started by setup_logging() with LOG_QUEUE
+
+class _InProcessQueueHandler(logging.Handler):
+    """
+    Puts records on a queue for a QueueListener in the same process.
+
+    Unlike ``logging.handlers.QueueHandler`` it doesn't copy and pre-format
+    every record (which only matters when records are pickled), so logging
+    costs the caller little more than the queue put.
+    """
+
+    def __init__(self, records):
+        super().__init__()
+        self.records = records
+
+    def emit(self, record):
+        self.records.put_nowait(record)
+
+def setup_logging(verbose=False):
+    """
+    Setup logging configuration with file and console handlers.
+
+    Lines are plain text or JSON (settings.LOG_FORMAT). With settings.LOG_QUEUE
+    the handlers run on a background QueueListener thread, so senders only
+    pay for putting the record on a queue; it is flushed at exit. Like
+    ``logging.basicConfig``, this does nothing if logging is already set up.
+    """
+    logger = logging.getLogger(__package__)
+    root = logging.getLogger()
+    if root.handlers:
+        return logger
+    
+    if not os.path.exists(settings.LOG_FOLDER):
+        os.makedirs(settings.LOG_FOLDER)
+    
+    log_filename = os.path.join(settings.LOG_FOLDER, f'email_sender_{datetime.now().strftime("%Y%m%d")}.log')
+    
+    if settings.LOG_FORMAT == 'json':
+        formatter = JsonLogFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    handlers = [logging.FileHandler(log_filename, encoding='utf-8'), logging.StreamHandler()]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    if settings.LOG_QUEUE:
+        import queue
+        from logging.handlers import QueueListener
+        global _log_listener
+        records = queue.SimpleQueue()
+        _log_listener = QueueListener(records, *handlers, respect_handler_level=True)
+        _log_listener.start()
+        atexit.register(stop_log_listener)
+        handlers = [_InProcessQueueHandler(records)]
+    
+    root.setLevel(logging.DEBUG if verbose else logging.INFO)
+    for handler in handlers:
+        root.addHandler(handler)
+    return logger
+
+def stop_log_listener():
+    """Write out every queued log record and stop the background writer (if there is one)."""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+
+def validate_email(email):
+    """Validate email format."""
+    return EMAIL_PATTERN.fullmatch(email) is not None
+
+def validate_configuration(logger, generate=False, links=False):
+    """Validate all required files and configurations exist (and the link delivery settings with `links`)."""
+    logger.info("🔍 Validating configuration...")
+    
+    errors = []
+    
+    # Check config credentials
+    try:
+        config = settings.load_config()
+    except settings.ConfigError as e:
+        config = None
+        errors.append(str(e))
+    if config is None:
+        pass
+    elif getattr(config, 'SENDER_ACCOUNTS', None):
+        try:
+            for account in load_sender_accounts():
+                if not validate_email(account.address):
+                    errors.append(f"Invalid email format in SENDER_ACCOUNTS: {account.address}")
+        except (ValueError, TypeError) as e:
+            errors.append(f"config.py: {e}")
+    elif not hasattr(config, 'EMAIL_ADDRESS') or not hasattr(config, 'EMAIL_PASSWORD'):
+        errors.append("config.py missing EMAIL_ADDRESS or EMAIL_PASSWORD")
+    elif not validate_email(config.EMAIL_ADDRESS):
+        errors.append(f"Invalid email format in config.py: {config.EMAIL_ADDRESS}")
+    
+    # Check files exist
+    if not os.path.exists(settings.STUDENT_LIST_CSV):
+        errors.append(f"Student list not found: {settings.STUDENT_LIST_CSV}")
+    
+    if not os.path.exists(settings.LOGO_IMAGE_PATH):
+        errors.append(f"Logo image not found: {settings.LOGO_IMAGE_PATH}")
+    
+    template_paths = (settings.HTML_TEMPLATE_PATH, settings.TEXT_TEMPLATE_PATH)
+    if links:
+        template_paths = (settings.LINK_HTML_TEMPLATE_PATH, settings.LINK_TEXT_TEMPLATE_PATH)
+        if config is not None and not getattr(config, 'LINK_SIGNING_KEY', None):
+            errors.append("config.py missing LINK_SIGNING_KEY (needed to sign certificate links)")
+        if settings.LINK_STORAGE == 'local' and not settings.LINK_BASE_URL:
+            errors.append("LINK_BASE_URL is not set (the URL your file server exposes LINK_STORAGE_DIR at)")
+        if settings.LINK_LOGO not in ('hosted', 'inline'):
+            errors.append(f"LINK_LOGO must be 'hosted' or 'inline', not {settings.LINK_LOGO!r}")
+        elif settings.LINK_LOGO == 'inline' and settings.LINK_LOGO_PATH and not os.path.exists(settings.LINK_LOGO_PATH):
+            errors.append(f"Logo image not found: {settings.LINK_LOGO_PATH}")
+    
+    for path in template_paths:
+        if not path:
+            continue
+        try:
+            load_template(path)
+        except FileNotFoundError:
+            errors.append(f"Email template not found: {path}")
+        except ValueError as e:
+            errors.append(f"Invalid email template {path}: {e}")
+    
+    if generate:
+        if not os.path.exists(settings.CERTIFICATE_TEMPLATE_PATH):
+            errors.append(f"Certificate template not found: {settings.CERTIFICATE_TEMPLATE_PATH}")
+    elif not os.path.exists(settings.CERTIFICATES_FOLDER):
+        errors.append(f"Certificates folder not found: {settings.CERTIFICATES_FOLDER}")
+    
+    if errors:
+        logger.error("❌ Configuration validation failed:")
+        for error in errors:
+            logger.error(f"   - {error}")
+        return False
+    
+    logger.info("✅ Configuration validation passed!")
+    return True
+
+def progress_bar(current, total, bar_length=40, prefix='Progress', suffix=''):
+    """Display a progress bar in the console (total may be None when unknown)."""
+    if not total:
+        print(f'\r{prefix}: {current}/unknown{suffix}', end='', flush=True)
+        return
+    percent = min(float(current) * 100 / total, 100.0)
+    arrow = '=' * int(percent/100 * bar_length - 1) + '>'
+    spaces = ' ' * (bar_length - len(arrow))
+    
+    print(f'\r{prefix}: [{arrow}{spaces}] {current}/{total} ({percent:.1f}%){suffix}', end='', flush=True)
+
+def format_duration(seconds):
+    """Format seconds as H:MM:SS (or M:SS under an hour)."""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours}:{minutes:02d}:{seconds:02d}' if hours else f'{minutes}:{seconds:02d}'
+
+class ProgressReporter:
+    """
+    Rate-limited progress bar with live throughput and ETA.
+
+    ``update(current)`` is cheap enough to call for every student: the bar
+    is only redrawn ``refresh_hz`` times per second (every call with 0).
+    Throughput is measured over the last ``window`` seconds, so the ETA
+    follows the current sending rate rather than the run's average. Not
+    thread-safe by itself; callers serialize ``update()`` (the sender calls
+    it under its stats lock).
+    """
+
+    def __init__(self, total, prefix='Progress', refresh_hz=None, window=10.0):
+        refresh_hz = settings.PROGRESS_REFRESH_HZ if refresh_hz is None else refresh_hz
+        self.total = total
+        self.prefix = prefix
+        self.interval = 1.0 / refresh_hz if refresh_hz else 0.0
+        self.window = window
+        self.current = 0
+        self.redraws = 0
+        self._next_draw = 0.0
+        self._samples = collections.deque([(time.monotonic(), 0)])
+
+    def rate(self, now=None):
+        """Items per second over the sampling window."""
+        now = time.monotonic() if now is None else now
+        started, count = self._samples[0]
+        return (self.current - count) / (now - started) if now > started else 0.0
+
+    def update(self, current):
+        self.current = current
+        now = time.monotonic()
+        if now < self._next_draw:
+            return
+        self._next_draw = now + self.interval
+        self._draw(now)
+
+    def _draw(self, now):
+        self._samples.append((now, self.current))
+        while len(self._samples) > 2 and now - self._samples[1][0] >= self.window:
+            self._samples.popleft()
+        # Too few seconds of samples give a wild rate, so wait a moment before showing one
+        rate = self.rate(now) if now - self._samples[0][0] >= 1.0 else 0.0
+        suffix = f' {rate:.1f}/s' if rate else ''
+        if rate and self.total and self.total > self.current:
+            suffix += f' ETA {format_duration((self.total - self.current) / rate)}'
+        self.redraws += 1
+        progress_bar(self.current, self.total, prefix=self.prefix, suffix=suffix.ljust(20))
+
+    def close(self):
+        """Draw the final state and end the line."""
+        self._draw(time.monotonic())
+        print()
+
+def count_csv_rows(path, chunk_size=1024 * 1024):
+    """
+    Cheaply estimate the number of data rows in a CSV by counting newlines.
+
+    Reads the file in binary chunks without parsing it, so it is fast and
+    uses constant memory. Quoted fields containing newlines make this an
+    over-estimate, which is fine for a progress bar.
+    """
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            lines += chunk.count(b'\n')
+            last = chunk[-1:]
+    if last != b'\n':
+        lines += 1  # Final row without a trailing newline
+    return max(lines - 1, 0)  # Minus the header row
+
+def iter_students(path):
+    """
+    Stream (name, email) rows from the student CSV, skipping the header and blank lines.
+
+    The file is opened immediately (so a missing roster raises here), but
+    rows are only parsed as the caller consumes them.
+    """
+    file = open(path, 'r', newline='', encoding='utf-8')
+    
+    def rows():
+        with file:
+            reader = csv.reader(file)
+            next(reader, None)  # Skip header row
+            for row in reader:
+                if row:
+                    yield row
+    
+    return rows()
@@ -0,0 +1,298 @@
+"""
+Roster validation for ``--validate-only``: formats, certificates, duplicates and domains.
+"""
+
+import collections
+import csv
+import difflib
+import os
+import queue
+import re
+import socket
+import threading
+import time
+from datetime import datetime
+
+from . import settings
+from .certificates import CertificateIndex
+from .utils import iter_students, setup_logging, validate_configuration, validate_email
+
+# Providers that ignore dots in the local part and treat user+tag as user
+DOT_INSENSITIVE_DOMAINS = {'gmail.com', 'googlemail.com'}
+
+# Well-known domains, used to spot typos such as "gmial.com"
+COMMON_EMAIL_DOMAINS = [
+    'gmail.com', 'googlemail.com', 'yahoo.com', 'yahoo.co.in', 'outlook.com', 'hotmail.com',
+    'live.com', 'icloud.com', 'rediffmail.com', 'protonmail.com', 'proton.me', 'aol.com',
+]
+
+# One issue found in the roster; line is the CSV line number (the header is line 1)
+RosterIssue = collections.namedtuple('RosterIssue', ['line', 'name', 'email', 'severity', 'problem'])
+
+def canonical_email(email):
+    """
+    The mailbox an address actually delivers to, for near-duplicate detection.
+
+    Lowercases it, drops a "+tag" from the local part and, for Gmail, the
+    dots, so "Jane.Doe+ws@Gmail.com" and "janedoe@googlemail.com" match.
+    """
+    local, _, domain = email.strip().lower().rpartition('@')
+    local = local.split('+', 1)[0]
+    if domain in DOT_INSENSITIVE_DOMAINS:
+        local = local.replace('.', '')
+        domain = 'gmail.com'
+    return f'{local}@{domain}'
+
+class DomainResolver:
+    """
+    Checks that email domains exist, resolving each distinct domain once.
+
+    Uses ``socket.getaddrinfo`` (the standard library has no MX lookup), so
+    a domain counts as existing if it has any A/AAAA record. Lookups run
+    on ``workers`` daemon threads; domains still pending after ``timeout``
+    seconds are reported as unknown rather than missing. ``CANARY_DOMAIN``
+    is looked up with the first batch, on the same workers and deadline;
+    if even it does not resolve, DNS itself is unavailable and every
+    missing domain is reported as unknown instead. Results are cached for
+    the lifetime of the resolver.
+    """
+
+    OK, MISSING, UNKNOWN = 'ok', 'missing', 'unknown'
+    CANARY_DOMAIN = 'gmail.com'
+
+    def __init__(self, timeout=None, workers=None):
+        self.timeout = settings.DNS_TIMEOUT if timeout is None else timeout
+        self.workers = workers or settings.DNS_WORKERS
+        self.lookups = 0
+        self._cache = {}
+        self._canary = None
+        self._lock = threading.Lock()
+
+    def lookup(self, domain):
+        """Resolve one domain without caching; returns OK, MISSING or UNKNOWN."""
+        try:
+            socket.getaddrinfo(domain, None)
+        except socket.gaierror as e:
+            if e.errno in (socket.EAI_NONAME, getattr(socket, 'EAI_NODATA', socket.EAI_NONAME)):
+                return self.MISSING
+            return self.UNKNOWN
+        except (OSError, UnicodeError):
+            return self.UNKNOWN
+        return self.OK
+
+    def resolve_all(self, domains):
+        """Resolve every domain not cached yet, concurrently. Returns {domain: status}."""
+        pending = queue.Queue()
+        todo = [domain for domain in set(domains) if domain not in self._cache]
+        if self._canary is None and self.CANARY_DOMAIN not in self._cache:
+            # First in the queue, so a long roster can't push it past the deadline
+            todo = [self.CANARY_DOMAIN] + [domain for domain in todo if domain != self.CANARY_DOMAIN]
+        for domain in todo:
+            pending.put(domain)
+
+        def worker():
+            while True:
+                try:
+                    domain = pending.get_nowait()
+                except queue.Empty:
+                    return
+                status = self.lookup(domain)
+                with self._lock:
+                    self._cache[domain] = status
+                    self.lookups += 1
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(min(self.workers, len(todo)))]
+        for thread in threads:
+            thread.start()
+        deadline = time.monotonic() + self.timeout
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        with self._lock:
+            results = {domain: self._cache.get(domain, self.UNKNOWN) for domain in domains}
+            if self._canary is None:
+                self._canary = self._cache.get(self.CANARY_DOMAIN, self.UNKNOWN)
+        if self.MISSING in results.values() and not self.dns_available():
+            results = {domain: self.UNKNOWN if status == self.MISSING else status
+                       for domain, status in results.items()}
+        return results
+
+    def dns_available(self):
+        """True if CANARY_DOMAIN resolved within the timeout (checked once, with the first batch)."""
+        if self._canary is None:
+            self.resolve_all([])
+        return self._canary == self.OK
+
+    def resolve(self, domain):
+        return self.resolve_all([domain])[domain]
+
+class StaticResolver(DomainResolver):
+    """
+    Offline stand-in for DomainResolver (``--offline``, tests).
+
+    Answers from `answers` ({domain: status}) and treats every other domain
+    as ``default`` without touching the network.
+    """
+
+    def __init__(self, answers=None, default=DomainResolver.OK):
+        super().__init__(timeout=0, workers=1)
+        self.answers = dict(answers or {})
+        self.default = default
+
+    def lookup(self, domain):
+        return self.answers.get(domain, self.default)
+
+    def dns_available(self):
+        return True
+
+    def resolve_all(self, domains):
+        results = {}
+        for domain in domains:
+            if domain not in self._cache:
+                self._cache[domain] = self.lookup(domain)
+                self.lookups += 1
+            results[domain] = self._cache[domain]
+        return results
+
+def _roster_rows(path):
+    """Yield (line number, row) from the student CSV, skipping the header and blank lines."""
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if row:
+                yield reader.line_num, row
+
+def validate_roster(path, certificates=None, resolver=None):
+    """
+    Check the whole roster before sending and return every problem found.
+
+    Runs in two streaming passes: the first checks each row's format,
+    certificate and duplicates and collects the distinct domains; those are
+    then resolved in one concurrent batch and the second pass flags rows on
+    domains that don't exist. ``certificates`` is a CertificateIndex (None
+    skips the certificate check, e.g. with --generate); ``resolver`` is a
+    DomainResolver (None, or no working DNS, skips the domain check).
+
+    Returns ``(rows checked, [RosterIssue, ...], {domain: status})``.
+    Errors are rows that will fail; warnings are rows that will be sent but
+    probably shouldn't be (duplicates, likely typos).
+    """
+    issues = []
+    seen = {}
+    seen_canonical = {}
+    domains = set()
+    typo_suggestions = {}
+    rows = 0
+    for line, row in _roster_rows(path):
+        rows += 1
+        if len(row) < 2 or not row[0].strip() or not row[1].strip():
+            issues.append(RosterIssue(line, row[0] if row else '', row[1] if len(row) > 1 else '',
+                                      'error', 'missing name or email'))
+            continue
+        name, email = row[0], row[1]
+        if not validate_email(email):
+            issues.append(RosterIssue(line, name, email, 'error', 'invalid email format'))
+            continue
+        if certificates is not None:
+            path = certificates.lookup(name)
+            if path is None:
+                issues.append(RosterIssue(line, name, email, 'error',
+                                          f"no certificate '{certificates.filename_for(name)}'"))
+            elif certificates.fuzzy and path != certificates.exact(name):
+                issues.append(RosterIssue(line, name, email, 'warning',
+                                          f"certificate fuzzy-matched to '{os.path.basename(path)}'"))
+
+        key = email.strip().lower()
+        canonical = canonical_email(key)
+        if key in seen:
+            issues.append(RosterIssue(line, name, email, 'warning', f'duplicate of line {seen[key]}'))
+        elif canonical in seen_canonical:
+            first_line, first_email = seen_canonical[canonical]
+            issues.append(RosterIssue(line, name, email, 'warning',
+                                      f'same mailbox as {first_email} (line {first_line})'))
+        else:
+            seen_canonical[canonical] = (line, email)
+        seen.setdefault(key, line)
+
+        domain = key.rpartition('@')[2]
+        domains.add(domain)
+        if domain not in typo_suggestions:
+            matches = [] if domain in COMMON_EMAIL_DOMAINS else \
+                difflib.get_close_matches(domain, COMMON_EMAIL_DOMAINS, n=1, cutoff=0.8)
+            typo_suggestions[domain] = matches[0] if matches else None
+        if typo_suggestions[domain]:
+            issues.append(RosterIssue(line, name, email, 'warning', f'did you mean @{typo_suggestions[domain]}?'))
+
+    statuses = {}
+    if resolver is not None:
+        statuses = resolver.resolve_all(sorted(domains))
+        if not resolver.dns_available():
+            statuses = {}
+    bad = {domain: status for domain, status in statuses.items() if status != DomainResolver.OK}
+    if bad:
+        for line, row in _roster_rows(path):
+            if len(row) < 2 or not validate_email(row[1]):
+                continue
+            status = bad.get(row[1].strip().lower().rpartition('@')[2])
+            if status == DomainResolver.MISSING:
+                issues.append(RosterIssue(line, row[0], row[1], 'error', 'email domain does not exist'))
+            elif status == DomainResolver.UNKNOWN:
+                issues.append(RosterIssue(line, row[0], row[1], 'warning', 'email domain could not be checked'))
+    issues.sort(key=lambda issue: issue.line)
+    return rows, issues, statuses
+
+def validate_only(verbose=False, fuzzy_match=False, generate=False, offline=False, event=None):
+    """
+    Preflight: check the configuration and the whole roster without logging in or sending.
+
+    Writes every problem to a CSV report in settings.LOG_FOLDER and returns the
+    number of rows that will fail (None if the configuration is invalid).
+    For one event of an events manifest, pass its name as `event`: it goes
+    into the report's filename and title, so each event gets its own report.
+    """
+    logger = setup_logging(verbose)
+    if not validate_configuration(logger, generate=generate):
+        return None
+    
+    certificates = None
+    if not generate:
+        certificates = CertificateIndex(settings.CERTIFICATES_FOLDER, fuzzy=fuzzy_match)
+        logger.info(f"🗂️ Indexed {len(certificates)} certificates in {settings.CERTIFICATES_FOLDER}")
+        if fuzzy_match:
+            certificates.claim_exact(iter_students(settings.STUDENT_LIST_CSV))
+    resolver = StaticResolver() if offline else DomainResolver()
+    
+    started = time.perf_counter()
+    rows, issues, statuses = validate_roster(settings.STUDENT_LIST_CSV, certificates, resolver)
+    elapsed = time.perf_counter() - started
+    failing = len({issue.line for issue in issues if issue.severity == 'error'})
+    warnings = len({issue.line for issue in issues if issue.severity == 'warning'})
+    
+    label = re.sub(r'[^\w.-]+', '-', event).strip('-') + '_' if event else ''
+    report_path = os.path.join(settings.LOG_FOLDER,
+                               f'validation_report_{label}{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv')
+    with open(report_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(RosterIssue._fields)
+        writer.writerows(issues)
+    
+    logger.info("\n" + "="*60)
+    logger.info(f"🩺 ROSTER VALIDATION REPORT{f' [{event}]' if event else ''}")
+    logger.info("="*60)
+    if offline:
+        domain_note = 'domains not resolved (--offline)'
+    elif not statuses and not resolver.dns_available():
+        domain_note = 'domains not resolved: DNS is unavailable'
+    else:
+        domain_note = f'{len(statuses)} distinct domains resolved'
+    logger.info(f"Rows checked: {rows} ({domain_note}) in {elapsed:.2f}s")
+    logger.info(f"❌ Rows that will fail: {failing}")
+    logger.info(f"⚠️ Rows with warnings: {warnings}")
+    for issue in issues[:50]:
+        icon = '❌' if issue.severity == 'error' else '⚠️'
+        logger.info(f"   {icon} line {issue.line}: {issue.name} ({issue.email}) - {issue.problem}")
+    if len(issues) > 50:
+        logger.info(f"   ... and {len(issues) - 50} more")
+    logger.info(f"📄 Full report saved to {report_path}")
+    logger.info("="*60)
+    return failing
@@ -20,6 +20,35 @@ EMAIL_ADDRESS = "your_email@gmail.com"
 # 3. Copy the 16-character password here (format: xxxx xxxx xxxx xxxx)
 EMAIL_PASSWORD = "your app password here"
 
+# ============================================================================
+# MULTIPLE SENDER ACCOUNTS (optional)
+# ============================================================================
+
+# To send one event through several accounts or relays (e.g. to get past
+# Gmail's ~500 emails/day limit), list them here. Students are spread across
+# them by weight, always using the same account for the same student, and move
+# to another account when one reaches its daily_quota. When this is set,
+# EMAIL_ADDRESS/EMAIL_PASSWORD above are not used.
+#
+# Optional keys: server/port/use_tls (default: the SMTP settings in
+# certificate_mailer/settings.py), daily_quota (default: unlimited) and weight (default: 1).
+#
+# SENDER_ACCOUNTS = [
+#     {"address": "first_account@gmail.com", "password": "app password", "daily_quota": 500},
+#     {"address": "second_account@gmail.com", "password": "app password", "daily_quota": 500},
+#     {"address": "events@your-college.edu", "password": "app password", "daily_quota": 2000, "weight": 4},
+# ]
+
+# ============================================================================
+# LINK DELIVERY (optional, for --links)
+# ============================================================================
+
+# Secret used to sign the expiring certificate download links. Use a long
+# random string (e.g. from `python -c "import secrets; print(secrets.token_urlsafe(32))"`)
+# `certificate-mailer --serve-links` checks the links with it too.
+#
+# LINK_SIGNING_KEY = "a long random string"
+
 # ============================================================================
 # IMPORTANT SECURITY NOTES
 # ============================================================================
@@ -0,0 +1,36 @@
+# event_settings.example.py
+# 📅 Event Settings Template
+#
+# Instructions:
+# 1. Copy this file to event_settings.py in the folder you run the mailer from
+# 2. Change the values for your event
+# 3. Run certificate-mailer (or python send_emails2.py) from that folder
+#
+# Any setting from certificate_mailer/settings.py can be set here; anything
+# left out keeps its default. This works the same for an installed
+# certificate-mailer and a checkout, so you never need to edit the package.
+# Relative paths are relative to the folder you run the mailer from.
+
+# ============================================================================
+# EVENT DETAILS
+# ============================================================================
+
+SENDER_NAME = "Your Organization Name"
+EVENT_NAME = "Your Event Name"
+# EMAIL_SUBJECT defaults to the standard subject with EVENT_NAME in it
+# EMAIL_SUBJECT = "🎉 Your Certificate for the Your Event Name is Here!"
+SENDER_ORGANIZATION = "Your Organization"
+TEAM_MEMBERS_SIGNATURE = "Team Member 1 | Team Member 2 | Team Member 3"
+
+# ============================================================================
+# FILES
+# ============================================================================
+
+STUDENT_LIST_CSV = 'students.csv'
+LOGO_IMAGE_PATH = 'logo.jpg'
+CERTIFICATES_FOLDER = 'certificates'
+CERTIFICATE_FILENAME_FORMAT = "{name} Your Event Name.pdf"
+
+# Your own copies of the email templates (default: the ones in the package)
+# HTML_TEMPLATE_PATH = 'templates/certificate_email.html'
+# TEXT_TEMPLATE_PATH = 'templates/certificate_email.txt'
@@ -0,0 +1,69 @@
+import smtplib
+
+import pytest
+
+from certificate_mailer.accounts import AccountScheduler, SenderAccount, is_quota_error, is_recipient_refusal
+
+
+@pytest.mark.parametrize('error', [
+    smtplib.SMTPDataError(550, b'5.4.5 Daily user sending limit exceeded'),
+    smtplib.SMTPSenderRefused(550, b'5.4.5 Daily user sending quota exceeded', 'me@example.com'),
+    smtplib.SMTPSenderRefused(452, b'4.5.3 Your sending quota is used up', 'me@example.com'),
+    smtplib.SMTPRecipientsRefused({'them@example.com': (550, b'5.4.5 Daily user sending limit exceeded')}),
+])
+def test_sender_quota_replies_are_quota_errors(error):
+    assert is_quota_error(error)
+
+
+@pytest.mark.parametrize('error', [
+    smtplib.SMTPRecipientsRefused({'them@example.com': (452, b'4.2.2 The email account that you tried to '
+                                                             b'reach is over quota')}),
+    smtplib.SMTPDataError(552, b'5.2.2 The email account that you tried to reach is over quota'),
+    smtplib.SMTPRecipientsRefused({'them@example.com': (550, b'5.1.1 No such user')}),
+    smtplib.SMTPDataError(552, b'5.3.4 Message size limit exceeded'),
+    smtplib.SMTPDataError(451, b'4.7.0 Try again later'),
+    smtplib.SMTPSenderRefused(451, b'4.3.0 Temporary local problem', 'me@example.com'),
+    smtplib.SMTPServerDisconnected('Connection unexpectedly closed'),
+    OSError('Connection reset by peer'),
+])
+def test_other_failures_are_not_quota_errors(error):
+    assert not is_quota_error(error)
+
+
+def test_recipient_refusal():
+    assert is_recipient_refusal(smtplib.SMTPRecipientsRefused({'them@example.com': (452, b'4.2.2 Mailbox full')}))
+    assert not is_recipient_refusal(smtplib.SMTPDataError(451, b'4.7.0 Try again later'))
+
+
+def accounts(*quotas):
+    return [SenderAccount(f'sender{number}@example.com', 'password', daily_quota=quota)
+            for number, quota in enumerate(quotas)]
+
+
+def test_recipient_keeps_its_account():
+    scheduler = AccountScheduler(accounts(None, None, None))
+    first = scheduler.reserve('student@example.com')
+    scheduler.release(first)
+    assert scheduler.reserve('student@example.com') is first
+
+
+def test_fails_over_to_next_ranked_account_when_exhausted():
+    scheduler = AccountScheduler(accounts(None, None))
+    ranking = scheduler.ranking('student@example.com')
+    assert scheduler.exhaust(ranking[0], '550 5.4.5 Daily user sending limit exceeded')
+    assert not scheduler.exhaust(ranking[0], 'again')
+    assert scheduler.reserve('student@example.com') is ranking[1]
+    scheduler.exhaust(ranking[1], 'over quota')
+    assert scheduler.reserve('student@example.com') is None
+
+
+def test_daily_quota_counts_journaled_deliveries_and_releases():
+    pool = accounts(2, None)
+    scheduler = AccountScheduler(pool, {'sender0@example.com': 1})
+    recipients = [f'student{number}@example.com' for number in range(50)]
+    own = next(email for email in recipients if scheduler.ranking(email)[0] is pool[0])
+    assert scheduler.reserve(own) is pool[0]
+    assert not pool[0].available  # 1 journaled + 1 reserved
+    assert scheduler.reserve(own) is pool[1]
+    scheduler.release(pool[0])
+    assert scheduler.reserve(own) is pool[0]
@@ -0,0 +1,61 @@
+import os
+
+from certificate_mailer.attachments import AttachmentCache
+
+
+def write_certificate(folder, name, size=3000):
+    path = os.path.join(str(folder), name)
+    with open(path, 'wb') as f:
+        f.write(name.encode('ascii') * (size // len(name)))
+    return path
+
+
+def disk_files(directory):
+    return sorted(name for _, _, names in os.walk(str(directory)) for name in names)
+
+
+def test_disk_cache_is_reused_by_a_later_run(tmp_path):
+    path = write_certificate(tmp_path, 'ada.pdf')
+    first = AttachmentCache(directory=str(tmp_path / 'cache')).get(path)
+    cache = AttachmentCache(directory=str(tmp_path / 'cache'))
+    assert cache.get(path) == first
+    assert cache.counters()['disk_hits'] == 1
+
+
+def test_prune_removes_least_recently_used_files_first(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    paths = [write_certificate(tmp_path, f'{name}.pdf') for name in ('ada', 'alan', 'grace')]
+    writer = AttachmentCache(directory=str(cache_dir))
+    for path in paths:
+        writer.get(path)
+    entries = [writer._disk_path((os.path.abspath(p), os.stat(p).st_mtime_ns, os.stat(p).st_size)) for p in paths]
+    for age, entry in zip((300, 100, 200), entries):
+        os.utime(entry, (1000000000 - age, 1000000000))
+    budget = os.path.getsize(entries[0]) + os.path.getsize(entries[1])
+
+    cache = AttachmentCache(directory=str(cache_dir), max_disk_bytes=budget)
+    assert cache.get(paths[0])  # a disk hit makes it the most recently used
+    assert cache.prune() == 1
+    assert os.path.exists(entries[0]) and os.path.exists(entries[1])
+    assert not os.path.exists(entries[2])
+    assert cache.counters()['disk_evictions'] == 1
+
+
+def test_prune_within_budget_keeps_everything_but_stale_temporary_files(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    cache = AttachmentCache(directory=str(cache_dir))
+    cache.get(write_certificate(tmp_path, 'ada.pdf'))
+    stale = cache_dir / 'stale.b64.123.tmp'
+    stale.write_bytes(b'half a certificate')
+    os.utime(str(stale), (0, 0))
+    fresh = cache_dir / 'fresh.b64.456.tmp'
+    fresh.write_bytes(b'being written')
+
+    assert cache.prune() == 1
+    assert len([name for name in disk_files(cache_dir) if name.endswith('.b64')]) == 1
+    assert 'fresh.b64.456.tmp' in disk_files(cache_dir)
+    assert cache.counters()['disk_evictions'] == 0
+
+
+def test_prune_without_a_directory_does_nothing():
+    assert AttachmentCache().prune() == 0
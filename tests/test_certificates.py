@@ -0,0 +1,69 @@
+import pytest
+
+from certificate_mailer.certificates import CertificateIndex, find_missing_certificates
+
+FORMAT = '{name} Gemini Ai Workshop_ Beginner To Advance.pdf'
+
+
+@pytest.fixture
+def folder(tmp_path):
+    def make(*names, filename_format=FORMAT):
+        for name in names:
+            (tmp_path / filename_format.format(name=name)).write_bytes(b'%PDF')
+        return str(tmp_path)
+    return make
+
+
+def index(folder, fuzzy=True, **kwargs):
+    return CertificateIndex(folder, fuzzy=fuzzy, filename_format=FORMAT, **kwargs)
+
+
+def test_exact_match_ignores_case_spacing_and_normalization(folder):
+    certificates = index(folder('José  Doe'), fuzzy=False)
+    assert certificates.lookup('JOSÉ DOE').endswith('Doe Gemini Ai Workshop_ Beginner To Advance.pdf')
+    assert certificates.lookup('Jane Doe') is None
+
+
+@pytest.mark.parametrize('student', ['Amy Li', 'Jane Doe'])
+def test_shared_suffix_does_not_make_names_match(folder, student):
+    assert index(folder('Bo Wu', 'John Doe')).lookup(student) is None
+
+
+def test_small_typo_is_fuzzy_matched(folder):
+    certificates = index(folder('Johnathan Doe', 'Amy Li'))
+    assert certificates.lookup('Jonathan Doe') == certificates.exact('Johnathan Doe')
+    assert certificates.fuzzy_matches() == [
+        ('jonathan doe gemini ai workshop_ beginner to advance.pdf', certificates.exact('Johnathan Doe'))]
+
+
+def test_ambiguous_match_is_rejected(folder):
+    assert index(folder('Jonathan Doel', 'Jonathan Does')).lookup('Jonathan Doe') is None
+
+
+def test_another_students_exact_certificate_is_never_fuzzy_matched(folder):
+    certificates = index(folder('Johnathan Doe'))
+    certificates.claim_exact([['Johnathan Doe', 'johnathan@example.org'], ['Jonathan Doe', 'jonathan@example.org']])
+    assert certificates.lookup('Jonathan Doe') is None
+    assert certificates.lookup('Johnathan Doe') is not None
+
+
+def test_files_not_following_the_format_are_not_fuzzy_candidates(folder):
+    certificates = index(folder('Jonathan Doe', filename_format='{name}.pdf'))
+    assert len(certificates) == 1
+    assert certificates.lookup('Jonathan Doe') is None
+
+
+def test_certificates_added_later_are_found(folder, tmp_path):
+    certificates = index(folder(), fuzzy=False)
+    assert certificates.lookup('Ada Lovelace') is None
+    path = tmp_path / FORMAT.format(name='Ada Lovelace')
+    path.write_bytes(b'%PDF')
+    certificates.add(str(path))
+    assert certificates.lookup('ada lovelace') == str(path)
+
+
+def test_find_missing_certificates(folder):
+    certificates = index(folder('Ada Lovelace'), fuzzy=False)
+    rows = [['Ada Lovelace', 'ada@example.org'], ['Alan Turing', 'alan@example.org'], ['No Email', 'not-an-email']]
+    assert find_missing_certificates(certificates, rows) == [
+        ('Alan Turing', 'alan@example.org', FORMAT.format(name='Alan Turing'))]
@@ -0,0 +1,29 @@
+import os
+
+from certificate_mailer.generate import generate_certificates, open_render_pool
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE = os.path.join(REPO_ROOT, 'logo.jpg')
+
+
+def test_one_pool_renders_several_events(tmp_path):
+    pool = open_render_pool(2)
+    try:
+        results = [list(generate_certificates([['ada lovelace', 'ada@example.org'], ['alan turing', 'alan@example.org']],
+                                              TEMPLATE, str(tmp_path / event), lambda name: f'{name.title()}.pdf',
+                                              workers=2, style={'font_size': size}, pool=pool))
+                   for event, size in (('first', 21), ('second', 33))]
+    finally:
+        pool.shutdown()
+
+    for rendered, size in zip(results, (21, 33)):
+        assert [error for _, _, error in rendered] == [None, None]
+        with open(rendered[0][1], 'rb') as f:
+            assert b'/F1 %d.00 Tf' % size in f.read()
+    assert sorted(os.listdir(tmp_path / 'first')) == ['Ada Lovelace.pdf', 'Alan Turing.pdf']
+
+
+def test_render_errors_are_reported_per_row(tmp_path):
+    rendered = list(generate_certificates([['ada', 'ada@example.org']], str(tmp_path / 'missing.jpg'),
+                                          str(tmp_path), lambda name: f'{name}.pdf', workers=1))
+    assert rendered[0][1] is None and isinstance(rendered[0][2], OSError)
@@ -0,0 +1,31 @@
+import json
+from datetime import datetime, timedelta
+
+from certificate_mailer.journal import SendJournal, certificate_digest
+
+
+def test_deliveries_survive_a_reload(tmp_path):
+    path = str(tmp_path / 'logs' / 'send_journal.jsonl')
+    journal = SendJournal(path, sync_every=1)
+    digest = certificate_digest(b'certificate')
+    journal.record('Ada@Example.org', digest, 'Ada', '250 OK', 'Sender@example.com')
+    journal.close()
+
+    reloaded = SendJournal(path)
+    assert reloaded.was_delivered('ada@example.org ', digest)
+    assert not reloaded.was_delivered('ada@example.org', certificate_digest(b'reissued'))
+    assert len(reloaded) == 1
+    assert reloaded.recent_deliveries == 1
+    assert reloaded.recent_by_sender['sender@example.com'] == 1
+
+
+def test_truncated_and_old_lines_on_reload(tmp_path):
+    path = tmp_path / 'send_journal.jsonl'
+    old = (datetime.now() - timedelta(days=2)).isoformat(timespec='seconds')
+    path.write_text(json.dumps({'time': old, 'email': 'old@example.org', 'sha256': 'a', 'sender': 's@example.com'})
+                    + '\n' + '{"time": "2024-01-01T00:00:00", "email": "half@exa', encoding='utf-8')
+
+    journal = SendJournal(str(path))
+    assert journal.was_delivered('old@example.org', 'a')
+    assert len(journal) == 1
+    assert journal.recent_deliveries == 0  # Older than 24 hours: no longer counts towards daily quotas
@@ -0,0 +1,84 @@
+import threading
+import time
+from urllib.error import HTTPError
+from urllib.parse import parse_qs, quote, urlsplit
+from urllib.request import urlopen
+
+import pytest
+
+from certificate_mailer.links import LinkSigner
+from certificate_mailer.linkserver import make_link_server, parse_address
+from certificate_mailer.storage import LocalDirectoryStorage
+
+KEY = '0123abcd/Ada Lovelace Certificate.pdf'
+
+
+def signed_query(signer, expires):
+    url = signer.sign('https://certificates.example.org/' + KEY, KEY, expires)
+    query = parse_qs(urlsplit(url).query)
+    return query['expires'][0], query['signature'][0]
+
+
+def test_signed_link_verifies_until_it_expires():
+    signer = LinkSigner('secret', 3600)
+    expires, signature = signed_query(signer, 2000)
+    assert signer.verify(KEY, expires, signature, now=1000)
+    assert not signer.verify(KEY, expires, signature, now=2000)
+
+
+def test_tampered_links_do_not_verify():
+    signer = LinkSigner('secret', 3600)
+    expires, signature = signed_query(signer, 2000)
+    assert not signer.verify(KEY, int(expires) + 1, signature, now=1000)
+    assert not signer.verify('0123abcd/Alan Turing Certificate.pdf', expires, signature, now=1000)
+    assert not signer.verify(KEY, expires, signature[:-1] + ('A' if signature[-1] != 'A' else 'B'), now=1000)
+    assert not signer.verify(KEY, 'never', signature, now=1000)
+    assert not LinkSigner(b'another secret', 3600).verify(KEY, expires, signature, now=1000)
+
+
+@pytest.fixture
+def link_server(tmp_path):
+    signer = LinkSigner('secret', 3600)
+    storage = LocalDirectoryStorage(str(tmp_path), 'http://127.0.0.1/certificates/')
+    storage.put(KEY, b'%PDF certificate')
+    server = make_link_server(('127.0.0.1', 0), directory=str(tmp_path),
+                              base_url='https://certificates.example.org/certificates/', signer=signer)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    port = server.server_address[1]
+
+    def fetch(url):
+        url = url.replace('http://127.0.0.1/', f'http://127.0.0.1:{port}/')
+        try:
+            with urlopen(url, timeout=5) as response:
+                return response.status, response.read()
+        except HTTPError as e:
+            return e.code, b''
+
+    yield signer, storage, fetch
+    server.shutdown()
+    server.server_close()
+
+
+def test_link_server_serves_only_valid_unexpired_links(link_server):
+    signer, storage, fetch = link_server
+    valid = signer.sign(storage.url(KEY), KEY, int(time.time()) + 60)
+    assert fetch(valid) == (200, b'%PDF certificate')
+    assert fetch(storage.url(KEY))[0] == 403
+    assert fetch(signer.sign(storage.url(KEY), KEY, int(time.time()) - 1))[0] == 403
+    assert fetch(valid.replace('expires=', 'expires=1'))[0] == 403
+    assert fetch('http://127.0.0.1/certificates/0123abcd/')[0] == 403
+
+
+def test_link_server_only_serves_under_the_base_url(link_server):
+    signer, storage, fetch = link_server
+    expires = int(time.time()) + 60
+    assert fetch(signer.sign('http://127.0.0.1/' + quote(KEY), KEY, expires))[0] == 403
+    escape = '../' + KEY
+    assert fetch(signer.sign('http://127.0.0.1/certificates/' + quote(escape), escape, expires))[0] == 403
+
+
+def test_parse_address():
+    assert parse_address('8000') == ('127.0.0.1', 8000)
+    assert parse_address('0.0.0.0:8080') == ('0.0.0.0', 8080)
+    assert parse_address('[::1]:8080') == ('::1', 8080)
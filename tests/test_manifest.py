@@ -0,0 +1,87 @@
+import os
+
+from certificate_mailer.manifest import CertificateManifest
+
+
+def certificate(tmp_path, data=b'certificate'):
+    path = tmp_path / 'Ada Lovelace Certificate.pdf'
+    path.write_bytes(data)
+    return str(path)
+
+
+def lines(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def test_reload_knows_what_was_sent(tmp_path):
+    path = str(tmp_path / 'certificates.manifest.jsonl')
+    pdf = certificate(tmp_path)
+    manifest = CertificateManifest(path)
+    manifest.record('Ada@Example.org', pdf, os.stat(pdf), 'digest-1')
+    manifest.close()
+
+    reloaded = CertificateManifest(path)
+    assert reloaded.unchanged('ada@example.org', pdf, os.stat(pdf))
+    assert reloaded.matches('ada@example.org', pdf, 'digest-1')
+    assert not reloaded.matches('ada@example.org', pdf, 'digest-2')
+
+
+def test_changed_certificate_is_not_unchanged(tmp_path):
+    path = str(tmp_path / 'certificates.manifest.jsonl')
+    pdf = certificate(tmp_path)
+    manifest = CertificateManifest(path)
+    manifest.record('ada@example.org', pdf, os.stat(pdf), 'digest-1')
+    certificate(tmp_path, b'a re-issued certificate')
+    assert not manifest.unchanged('ada@example.org', pdf, os.stat(pdf))
+
+
+def test_close_compacts_superseded_lines(tmp_path):
+    path = str(tmp_path / 'certificates.manifest.jsonl')
+    pdf = certificate(tmp_path)
+    manifest = CertificateManifest(path)
+    for number in range(5):
+        manifest.record('ada@example.org', pdf, os.stat(pdf), f'digest-{number}')
+    manifest.record('alan@example.org', pdf, os.stat(pdf), 'digest-alan')
+    manifest.close()
+
+    assert len(lines(path)) == 2
+    reloaded = CertificateManifest(path)
+    assert len(reloaded) == 2
+    assert reloaded.matches('ada@example.org', pdf, 'digest-4')
+
+
+def test_close_keeps_a_mostly_current_file(tmp_path):
+    path = str(tmp_path / 'certificates.manifest.jsonl')
+    pdf = certificate(tmp_path)
+    manifest = CertificateManifest(path)
+    manifest.record('ada@example.org', pdf, os.stat(pdf), 'digest-1')
+    manifest.record('ada@example.org', pdf, os.stat(pdf), 'digest-2')
+    manifest.record('alan@example.org', pdf, os.stat(pdf), 'digest-alan')
+    manifest.close()
+    assert len(lines(path)) == 3
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    path = str(tmp_path / 'certificates.manifest.jsonl')
+    pdf = certificate(tmp_path)
+    manifest = CertificateManifest(path)
+    manifest.record('ada@example.org', pdf, os.stat(pdf), 'digest-1')
+    manifest.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"email": "alan@example.org", "file": "Alan')
+
+    reloaded = CertificateManifest(path)
+    assert len(reloaded) == 1
+    assert reloaded.matches('ada@example.org', pdf, 'digest-1')
+
+
+def test_disabled_manifest_writes_nothing(tmp_path):
+    path = str(tmp_path / 'certificates.manifest.jsonl')
+    pdf = certificate(tmp_path)
+    manifest = CertificateManifest(path)
+    assert manifest.writable()
+    manifest.disable()
+    manifest.record('ada@example.org', pdf, os.stat(pdf), 'digest-1')
+    manifest.close()
+    assert not os.path.exists(path)
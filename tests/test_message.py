@@ -0,0 +1,99 @@
+import email
+import email.policy
+
+from certificate_mailer.message import MessageTemplate
+
+HTML = '<p>Dear {name}, from {sender_organization}</p><img src="{logo_url}">'
+TEXT = 'Dear {name}, from {sender_organization}'
+LINK_HTML = '<p>Dear {name}, <a href="{certificate_url}">download</a> before {link_expires}</p>'
+LINK_TEXT = 'Dear {name}, download {certificate_url} before {link_expires}'
+LOGO = b'\xff\xd8 logo \xff\xd9'
+CERTIFICATE = b'%PDF-1.4 certificate' * 100
+NAME = 'Zoë <O\'Brien> & Co'
+
+
+def parse(payload):
+    assert b'\r\n' in payload and b'\n' not in payload.replace(b'\r\n', b'')
+    message = email.message_from_bytes(payload, policy=email.policy.default)
+    for part in message.walk():
+        assert not part.defects, (part.get_content_type(), part.defects)
+    return message
+
+
+def tree(message):
+    return [part.get_content_type() for part in message.walk()]
+
+
+def body(message, content_type):
+    return next(part for part in message.walk() if part.get_content_type() == content_type).get_content()
+
+
+def test_build_produces_a_well_formed_message():
+    template = MessageTemplate('sender@example.org', LOGO, sender_name='Ambassadors', subject='Your certificate 🎉',
+                               html=HTML, text=TEXT, sender_organization='JIT')
+    message = parse(template.build('zoe@example.org', NAME, 'Zoë Certificate.pdf', CERTIFICATE))
+
+    assert tree(message) == ['multipart/mixed', 'multipart/related', 'multipart/alternative',
+                             'text/plain', 'text/html', 'image/jpeg', 'application/octet-stream']
+    assert message['To'] == 'zoe@example.org'
+    assert message['From'] == 'Ambassadors <sender@example.org>'
+    assert message['Subject'] == 'Your certificate 🎉'
+    assert body(message, 'text/plain') == f'Dear {NAME}, from JIT'
+    assert body(message, 'text/html') == ('<p>Dear Zoë &lt;O&#x27;Brien&gt; &amp; Co, from JIT</p>'
+                                          '<img src="cid:logoimage">')
+
+    logo = next(part for part in message.walk() if part.get_content_type() == 'image/jpeg')
+    assert logo['Content-ID'] == '<logoimage>'
+    assert logo.get_content() == LOGO
+    attachment = next(message.iter_attachments())
+    assert attachment.get_filename() == 'Zoë Certificate.pdf'
+    assert attachment.get_content() == CERTIFICATE
+
+
+def test_rfc2231_filename_is_used_only_for_non_ascii_names():
+    template = MessageTemplate('sender@example.org', LOGO, html=HTML, text='')
+    ascii_message = template.build('ada@example.org', 'Ada', 'Ada "AL" Lovelace.pdf', CERTIFICATE)
+    assert b'filename="Ada \\"AL\\" Lovelace.pdf"' in ascii_message
+    assert next(parse(ascii_message).iter_attachments()).get_filename() == 'Ada "AL" Lovelace.pdf'
+
+    unicode_message = template.build('zoe@example.org', 'Zoë', 'Zoë Certificate.pdf', CERTIFICATE)
+    assert b"filename*=utf-8''Zo%C3%AB%20Certificate.pdf" in unicode_message
+    assert next(parse(unicode_message).iter_attachments()).get_filename() == 'Zoë Certificate.pdf'
+
+
+def test_html_only_message_has_no_alternative_part():
+    template = MessageTemplate('sender@example.org', LOGO, html=HTML, text='')
+    message = parse(template.build('ada@example.org', 'Ada', 'Ada.pdf', CERTIFICATE))
+    assert tree(message) == ['multipart/mixed', 'multipart/related', 'text/html', 'image/jpeg',
+                             'application/octet-stream']
+
+
+def test_build_linked_carries_the_link_instead_of_the_certificate():
+    url = 'https://certificates.example.org/abcd/Zo%C3%AB.pdf?expires=1&signature=x'
+    hosted = MessageTemplate('sender@example.org', None, html=LINK_HTML, text=LINK_TEXT, linked=True,
+                             link_expires='January 01, 2027')
+    message = parse(hosted.build_linked('zoe@example.org', NAME, url))
+    assert tree(message) == ['multipart/mixed', 'multipart/related', 'multipart/alternative',
+                             'text/plain', 'text/html']
+    assert body(message, 'text/plain') == f'Dear {NAME}, download {url} before January 01, 2027'
+    assert body(message, 'text/html') == ('<p>Dear Zoë &lt;O&#x27;Brien&gt; &amp; Co, '
+                                          f'<a href="{url.replace("&", "&amp;")}">download</a> '
+                                          'before January 01, 2027</p>')
+
+    inline = MessageTemplate('sender@example.org', LOGO, html=LINK_HTML, text=LINK_TEXT, linked=True,
+                             link_expires='January 01, 2027')
+    message = parse(inline.build_linked('zoe@example.org', 'Zoë', url))
+    assert tree(message) == ['multipart/mixed', 'multipart/related', 'multipart/alternative',
+                             'text/plain', 'text/html', 'image/jpeg']
+
+
+def test_for_sender_swaps_only_the_from_header():
+    template = MessageTemplate('first@example.org', LOGO, sender_name='Ambassadors', html=HTML, text=TEXT)
+    payload = template.build('ada@example.org', 'Ada', 'Ada.pdf', CERTIFICATE)
+    assert template.for_sender(payload, 'first@example.org') is payload
+
+    swapped = template.for_sender(payload, 'second@example.org')
+    original, message = parse(payload), parse(swapped)
+    assert message['From'] == 'Ambassadors <second@example.org>'
+    assert [(k, v) for k, v in message.items() if k != 'From'] == [(k, v) for k, v in original.items() if k != 'From']
+    assert swapped.split(b'\r\n', 1)[1] == payload.split(b'\r\n', 1)[1]
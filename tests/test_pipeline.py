@@ -0,0 +1,67 @@
+import itertools
+import threading
+import time
+
+import pytest
+
+from certificate_mailer.pipeline import MessagePipeline
+
+
+def drain(pipeline, senders):
+    received = [[] for _ in range(senders)]
+
+    def sender(slot):
+        while True:
+            message = pipeline.get()
+            if message is None:
+                return
+            received[slot].append(message)
+
+    threads = [threading.Thread(target=sender, args=(slot,), daemon=True) for slot in range(senders)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert not any(thread.is_alive() for thread in threads), "a sender never saw the end of the pipeline"
+    return received
+
+
+def test_several_senders_drain_every_message_once():
+    # Odd rows build to None and are skipped
+    pipeline = MessagePipeline(range(200), lambda row: row * 10 if row % 2 == 0 else None,
+                               builders=3, depth=2).start()
+    received = drain(pipeline, senders=4)
+    pipeline.close()
+    assert sorted(itertools.chain.from_iterable(received)) == [row * 10 for row in range(0, 200, 2)]
+    assert pipeline.get() is None  # Stays finished for late callers
+
+
+def test_close_stops_builders_blocked_on_a_full_queue():
+    built = []
+    rows = itertools.count()
+    pipeline = MessagePipeline(rows, lambda row: built.append(row) or row, builders=2, depth=1).start()
+    deadline = time.monotonic() + 5
+    # One message in the queue and one in each builder's hand: both builders are blocked on put()
+    while len(built) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(built) == 3
+
+    closer = threading.Thread(target=pipeline.close, daemon=True)
+    closer.start()
+    closer.join(timeout=5)
+    assert not closer.is_alive(), "close() did not unblock the builders"
+    assert not any(thread.is_alive() for thread in pipeline._threads)
+    assert next(rows) <= 5  # Builders stopped taking rows
+
+
+def test_close_reraises_an_error_from_the_row_iterator():
+    def rows():
+        yield 1
+        yield 2
+        raise ValueError("bad roster row")
+
+    pipeline = MessagePipeline(rows(), lambda row: row, builders=2, depth=4).start()
+    received = drain(pipeline, senders=2)
+    assert sorted(itertools.chain.from_iterable(received)) == [1, 2]
+    with pytest.raises(ValueError, match="bad roster row"):
+        pipeline.close()
@@ -0,0 +1,44 @@
+import asyncio
+
+from certificate_mailer import settings
+from certificate_mailer.ratelimit import AIMDThrottle, TokenBucket
+
+
+def test_daily_cap_counts_only_counted_tokens():
+    async def run():
+        bucket = TokenBucket(limit=2)
+        granted = [await bucket.acquire(), await bucket.acquire(count=False), await bucket.acquire()]
+        return granted, await bucket.acquire(), await bucket.acquire(count=False)
+
+    granted, over_cap, retry = asyncio.run(run())
+    assert granted == [True, True, True]
+    assert not over_cap
+    assert retry
+
+
+def test_released_tokens_go_back_to_the_daily_cap():
+    async def run():
+        bucket = TokenBucket(limit=1)
+        assert await bucket.acquire()
+        bucket.release()
+        return await bucket.acquire(), await bucket.acquire()
+
+    assert asyncio.run(run()) == (True, False)
+
+
+def test_slow_start_until_first_throttle():
+    throttle = AIMDThrottle(rate=2.0)
+    throttle.on_success()
+    throttle.on_success()
+    assert throttle.rate == 2.0 * settings.AIMD_SLOW_START ** 2
+    throttle.on_throttle()
+    throttled_rate = throttle.rate
+    throttle.on_success()
+    assert throttle.rate == throttled_rate + settings.AIMD_INCREASE
+
+
+def test_rate_never_exceeds_max_rate():
+    throttle = AIMDThrottle(rate=2.0, max_rate=3.0)
+    for _ in range(5):
+        throttle.on_success()
+    assert throttle.rate == 3.0
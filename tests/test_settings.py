@@ -0,0 +1,40 @@
+import pytest
+
+from certificate_mailer import settings
+
+
+@pytest.fixture
+def restore_settings():
+    saved = {key: value for key, value in vars(settings).items() if key.isupper()}
+    yield
+    for key, value in saved.items():
+        setattr(settings, key, value)
+
+
+def test_event_settings_override_the_defaults(tmp_path, restore_settings):
+    path = tmp_path / 'event_settings.py'
+    path.write_text("EVENT_NAME = 'Cloud Study Jam'\nSTUDENT_LIST_CSV = 'cloud.csv'\n_helper = 1\n", encoding='utf-8')
+    assert settings.load_event_settings(str(path)) == str(path)
+    assert settings.EVENT_NAME == 'Cloud Study Jam'
+    assert settings.STUDENT_LIST_CSV == 'cloud.csv'
+    assert settings.EMAIL_SUBJECT == '🎉 Your Certificate for the Cloud Study Jam is Here!'
+
+
+def test_explicit_subject_is_kept(tmp_path, restore_settings):
+    path = tmp_path / 'event_settings.py'
+    path.write_text("EVENT_NAME = 'Cloud Study Jam'\nEMAIL_SUBJECT = 'Your certificate'\n", encoding='utf-8')
+    settings.load_event_settings(str(path))
+    assert settings.EMAIL_SUBJECT == 'Your certificate'
+
+
+def test_no_event_settings_file(tmp_path, monkeypatch, restore_settings):
+    monkeypatch.chdir(tmp_path)
+    assert settings.load_event_settings() is None
+
+
+@pytest.mark.parametrize('source', ["EVENT_NAEM = 'typo'\n", "EVENT_NAME = \n"])
+def test_invalid_event_settings(tmp_path, source, restore_settings):
+    path = tmp_path / 'event_settings.py'
+    path.write_text(source, encoding='utf-8')
+    with pytest.raises(settings.ConfigError):
+        settings.load_event_settings(str(path))
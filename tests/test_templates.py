@@ -0,0 +1,12 @@
+import os
+
+from certificate_mailer import settings
+from certificate_mailer.template_engine import load_template
+
+
+def test_default_templates_ship_with_the_package(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # The defaults must not depend on the working directory
+    for path in (settings.HTML_TEMPLATE_PATH, settings.TEXT_TEMPLATE_PATH,
+                 settings.LINK_HTML_TEMPLATE_PATH, settings.LINK_TEXT_TEMPLATE_PATH):
+        assert os.path.dirname(path) == settings.PACKAGE_TEMPLATES
+        load_template(path)
@@ -0,0 +1,60 @@
+import csv
+import os
+
+import update_students_csv as updater
+
+
+def write_export(path, rows):
+    """A registrations export with the name and email in the configured columns."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Timestamp', 'Phone', 'Name', 'Email'])
+        for name, email in rows:
+            writer.writerow(['2024-01-01', '555', name, email])
+
+
+def read_students(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))[1:]
+
+
+def test_external_sort_merges_spilled_chunks(tmp_path):
+    pairs = [('c@x.org', 'C'), ('a@x.org', 'A'), ('b@x.org', 'B'), ('a@x.org', 'A again'),
+             ('e@x.org', 'E'), ('d@x.org', 'D'), ('c@x.org', 'C again')]
+    assert list(updater.external_sort(iter(pairs), str(tmp_path), chunk_rows=2)) == [
+        ('a@x.org', 'A'), ('b@x.org', 'B'), ('c@x.org', 'C'), ('d@x.org', 'D'), ('e@x.org', 'E')]
+    assert len(os.listdir(tmp_path)) == 4  # Spilled to disk rather than sorted in memory
+
+
+def test_external_sort_matches_in_memory_sort(tmp_path):
+    pairs = [(f'{number * 7919 % 1000:04d}@x.org', f'Student {number}') for number in range(3000)]
+    in_memory = list(updater.external_sort(iter(pairs), str(tmp_path), chunk_rows=len(pairs) + 1))
+    assert not os.listdir(tmp_path)
+    assert list(updater.external_sort(iter(pairs), str(tmp_path), chunk_rows=256)) == in_memory
+    assert [email for email, _ in in_memory] == sorted({email for email, _ in pairs})
+
+
+def test_merge_registrations_appends_only_new_students(tmp_path):
+    students = tmp_path / 'students.csv'
+    students.write_text('Name,Email\r\nAda Lovelace,Ada@Example.org\r\nAlan Turing,alan@example.org', encoding='utf-8')
+    write_export(tmp_path / 'day1.csv', [('Grace Hopper', 'grace@example.org'), ('Ada L.', 'ada@example.org')])
+    write_export(tmp_path / 'day2.csv', [('Grace H.', 'GRACE@example.org'), ('Barbara Liskov', 'barbara@example.org')])
+
+    added = updater.merge_registrations([str(tmp_path / 'day*.csv')], str(students), chunk_rows=2)
+
+    assert added == 2
+    assert read_students(students) == [
+        ['Ada Lovelace', 'Ada@Example.org'], ['Alan Turing', 'alan@example.org'],
+        ['Barbara Liskov', 'barbara@example.org'], ['Grace Hopper', 'grace@example.org']]
+    with open(str(students) + updater.INDEX_SUFFIX, encoding='utf-8') as f:
+        assert f.read().split() == ['ada@example.org', 'alan@example.org', 'barbara@example.org',
+                                    'grace@example.org']
+    assert not [name for name in os.listdir(tmp_path) if name.startswith('merge-')]
+
+
+def test_merge_registrations_again_adds_nothing(tmp_path):
+    students = tmp_path / 'students.csv'
+    write_export(tmp_path / 'export.csv', [('Grace Hopper', 'grace@example.org')])
+    assert updater.merge_registrations([str(tmp_path / 'export.csv')], str(students)) == 1
+    assert updater.merge_registrations([str(tmp_path / 'export.csv')], str(students)) == 0
+    assert read_students(students) == [['Grace Hopper', 'grace@example.org']]
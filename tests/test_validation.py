@@ -0,0 +1,45 @@
+import threading
+import time
+
+from certificate_mailer.validation import DomainResolver
+
+
+class SlowResolver(DomainResolver):
+    """Resolves `answers` after `delay` seconds; any other domain is missing."""
+
+    def __init__(self, answers, delay=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.answers = answers
+        self.delay = delay
+        self.release = threading.Event()
+
+    def lookup(self, domain):
+        if self.delay:
+            self.release.wait(self.delay)
+        return self.answers.get(domain, self.MISSING)
+
+
+def test_canary_is_resolved_with_the_first_batch():
+    resolver = SlowResolver({DomainResolver.CANARY_DOMAIN: DomainResolver.OK, 'example.org': DomainResolver.OK},
+                            timeout=5, workers=2)
+    assert resolver.resolve_all(['example.org', 'nxdomain.invalid']) == {
+        'example.org': DomainResolver.OK, 'nxdomain.invalid': DomainResolver.MISSING}
+    assert resolver.dns_available()
+    assert resolver.lookups == 3
+
+
+def test_hanging_canary_is_bounded_by_the_timeout():
+    resolver = SlowResolver({DomainResolver.CANARY_DOMAIN: DomainResolver.OK}, delay=30, timeout=0.2, workers=2)
+    started = time.monotonic()
+    try:
+        assert not resolver.dns_available()
+        assert resolver.resolve_all(['nxdomain.invalid']) == {'nxdomain.invalid': DomainResolver.UNKNOWN}
+    finally:
+        resolver.release.set()
+    assert time.monotonic() - started < 2
+
+
+def test_missing_domains_are_unknown_without_dns():
+    resolver = SlowResolver({}, timeout=5, workers=2)
+    assert resolver.resolve_all(['nxdomain.invalid']) == {'nxdomain.invalid': DomainResolver.UNKNOWN}
+    assert not resolver.dns_available()
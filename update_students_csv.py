@@ -1,10 +1,17 @@
+import argparse
 import csv
+import glob
+import heapq
 import os
+import shutil
+import tempfile
 
 # --- Configuration ---
 # Instructions:
 # 1. Place the CSV file with the new student registrations in the same folder as this script.
 #    Rename it to 'new_registrations.csv' or change the filename below.
+#    You can also pass one or more files or glob patterns on the command line:
+#        python update_students_csv.py exports/*.csv
 # 2. The main student list is named 'students.csv'. This script will create it if it
 #    doesn't exist, or update it if it does.
 
@@ -18,13 +25,22 @@ EXISTING_STUDENTS_FILENAME = 'students.csv'
 NAME_COLUMN_INDEX = 2
 EMAIL_COLUMN_INDEX = 3
 
+# --- Incremental Merge Settings ---
+# A sorted list of the emails already in students.csv is kept next to it, so new
+# registrations can be merged without re-reading or rewriting the whole list.
+INDEX_SUFFIX = '.idx'
+# Rows sorted in memory at a time; larger exports are sorted in chunks on disk and merged.
+CHUNK_ROWS = 200000
+
 
 def update_student_list():
     """
     Reads student info from a new CSV and merges it with the existing students.csv file,
-    removing duplicates.
+    removing duplicates. Rewrites the whole file, sorted by name.
+
+    Students are de-duplicated by email (case-insensitive); the first name seen wins.
     """
-    unique_students = set()
+    unique_students = {}
     header = ['Name', 'Email']
 
     # 1. Read the existing students.csv if it exists
@@ -36,8 +52,8 @@ def update_student_list():
                 for row in reader:
                     if len(row) >= 2:
                         name, email = row[0], row[1]
-                        # Add to set with a consistent case for email to handle duplicates
-                        unique_students.add((name.strip(), email.strip().lower()))
+                        # Key on a consistent case for email to handle duplicates
+                        unique_students.setdefault(email.strip().lower(), name.strip())
             print(f"Loaded {len(unique_students)} students from '{EXISTING_STUDENTS_FILENAME}'.")
         except Exception as e:
             print(f"Error reading '{EXISTING_STUDENTS_FILENAME}': {e}")
@@ -47,21 +63,12 @@ def update_student_list():
 
     # 2. Read the new student info CSV
     try:
-        with open(NEW_STUDENTS_FILENAME, 'r', newline='', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            next(reader)  # Skip header row
-            newly_added = 0
-            for row in reader:
-                # Check if the row is long enough to contain the required columns
-                if len(row) > max(NAME_COLUMN_INDEX, EMAIL_COLUMN_INDEX):
-                    name = row[NAME_COLUMN_INDEX].strip()
-                    email = row[EMAIL_COLUMN_INDEX].strip()
-                    if name and email:  # Ensure they are not empty strings
-                        student_tuple = (name, email.lower())
-                        if student_tuple not in unique_students:
-                            unique_students.add(student_tuple)
-                            newly_added += 1
-            print(f"Found {newly_added} new students in '{NEW_STUDENTS_FILENAME}'.")
+        newly_added = 0
+        for email, name in iter_registrations(NEW_STUDENTS_FILENAME):
+            if email not in unique_students:
+                unique_students[email] = name
+                newly_added += 1
+        print(f"Found {newly_added} new students in '{NEW_STUDENTS_FILENAME}'.")
     except FileNotFoundError:
         print(f"Error: Input file '{NEW_STUDENTS_FILENAME}' not found. Please check the filename and location.")
         return
@@ -72,17 +79,215 @@ def update_student_list():
     # 3. Write the unique, combined list back to students.csv
     try:
         # Sort the list alphabetically by name for consistency
-        sorted_students = sorted(list(unique_students))
-        
+        sorted_students = sorted((name, email) for email, name in unique_students.items())
+
         with open(EXISTING_STUDENTS_FILENAME, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(header)
             writer.writerows(sorted_students)
-        
+
+        # The email index no longer matches the rewritten file
+        if os.path.exists(EXISTING_STUDENTS_FILENAME + INDEX_SUFFIX):
+            os.remove(EXISTING_STUDENTS_FILENAME + INDEX_SUFFIX)
+
         print(f"✅ Successfully updated '{EXISTING_STUDENTS_FILENAME}'. Total unique students: {len(sorted_students)}.")
     except Exception as e:
         print(f"Error writing to '{EXISTING_STUDENTS_FILENAME}': {e}")
 
 
+# ==============================================================================
+# --- Incremental merge ---
+# ==============================================================================
+
+def iter_registrations(path, name_column=None, email_column=None):
+    """Stream (lowercased email, name) pairs from a registrations export, skipping its header."""
+    name_column = NAME_COLUMN_INDEX if name_column is None else name_column
+    email_column = EMAIL_COLUMN_INDEX if email_column is None else email_column
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader, None)  # Skip header row
+        for row in reader:
+            # Check if the row is long enough to contain the required columns
+            if len(row) > max(name_column, email_column):
+                name = row[name_column].strip()
+                email = row[email_column].strip().lower()
+                if name and email:  # Ensure they are not empty strings
+                    yield email, name
+
+
+def _write_chunk(rows, folder):
+    """Sort one chunk of (email, sequence, name) rows and spill it to a temporary file."""
+    rows.sort()
+    fd, path = tempfile.mkstemp(suffix='.csv', dir=folder)
+    with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows(rows)
+    return path
+
+
+def _read_chunk(path):
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        for email, sequence, name in csv.reader(f):
+            yield email, int(sequence), name
+
+
+def external_sort(pairs, folder, chunk_rows=None):
+    """
+    Sort (email, name) pairs by email with bounded memory.
+
+    Pairs are sorted in chunks of ``chunk_rows`` that are spilled to
+    ``folder`` and then k-way merged. Yields one (email, name) per distinct
+    email, keeping the first name seen for it.
+    """
+    chunk_rows = chunk_rows or CHUNK_ROWS
+    chunks = []
+    rows = []
+    for sequence, (email, name) in enumerate(pairs):
+        rows.append((email, sequence, name))
+        if len(rows) >= chunk_rows:
+            chunks.append(_write_chunk(rows, folder))
+            rows = []
+    if chunks:
+        if rows:
+            chunks.append(_write_chunk(rows, folder))
+        merged = heapq.merge(*[_read_chunk(path) for path in chunks])
+    else:
+        rows.sort()
+        merged = iter(rows)
+
+    previous = None
+    for email, _, name in merged:
+        if email != previous:
+            previous = email
+            yield email, name
+
+
+def _index_path(students_path):
+    return students_path + INDEX_SUFFIX
+
+
+def _iter_index(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            yield line.rstrip('\n')
+
+
+def build_email_index(students_path, folder, chunk_rows=None):
+    """(Re)build the sorted email index for the student list. Returns the number of emails."""
+    def existing():
+        with open(students_path, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if len(row) >= 2 and row[1].strip():
+                    yield row[1].strip().lower(), row[0].strip()
+
+    index_path = _index_path(students_path)
+    count = 0
+    with open(index_path + '.tmp', 'w', encoding='utf-8') as f:
+        for email, _ in external_sort(existing(), folder, chunk_rows):
+            f.write(email + '\n')
+            count += 1
+    os.replace(index_path + '.tmp', index_path)
+    return count
+
+
+def _index_is_current(students_path):
+    index_path = _index_path(students_path)
+    return os.path.exists(index_path) and os.path.getmtime(index_path) >= os.path.getmtime(students_path)
+
+
+def expand_inputs(patterns):
+    """Expand files and glob patterns into a sorted, de-duplicated list of paths."""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def merge_registrations(patterns, students_path=None, chunk_rows=None):
+    """
+    Append only truly new students from one or more registration exports.
+
+    Registrations are de-duplicated by email with an external sort/merge,
+    joined against the sorted email index next to the student list, and the
+    new rows are appended to it (in email order). Memory use is bounded by
+    ``chunk_rows`` regardless of the size of the exports or the list.
+    Returns the number of students added.
+    """
+    students_path = students_path or EXISTING_STUDENTS_FILENAME
+    paths = expand_inputs(patterns)
+    if not paths:
+        raise FileNotFoundError(f"No registration files match {', '.join(patterns)}")
+
+    folder = tempfile.mkdtemp(prefix='merge-', dir=os.path.dirname(os.path.abspath(students_path)))
+    try:
+        if not os.path.exists(students_path):
+            print(f"'{students_path}' not found. A new file will be created.")
+            with open(students_path, 'w', newline='', encoding='utf-8') as f:
+                csv.writer(f).writerow(['Name', 'Email'])
+        if not _index_is_current(students_path):
+            count = build_email_index(students_path, folder, chunk_rows)
+            print(f"Indexed {count} existing students from '{students_path}'.")
+
+        def registrations():
+            for path in paths:
+                for pair in iter_registrations(path):
+                    yield pair
+
+        # Make sure appended rows start on a new line
+        needs_newline = False
+        if os.path.getsize(students_path) > 0:
+            with open(students_path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b'\n'
+
+        index_path = _index_path(students_path)
+        added = 0
+        with open(students_path, 'a', newline='', encoding='utf-8') as out, \
+                open(index_path + '.tmp', 'w', encoding='utf-8') as new_index:
+            if needs_newline:
+                out.write('\r\n')
+            writer = csv.writer(out)
+            known = _iter_index(index_path)
+            current = next(known, None)
+            # Merge-join the sorted registrations against the sorted index
+            for email, name in external_sort(registrations(), folder, chunk_rows):
+                while current is not None and current < email:
+                    new_index.write(current + '\n')
+                    current = next(known, None)
+                if current == email:
+                    continue
+                writer.writerow([name, email])
+                new_index.write(email + '\n')
+                added += 1
+            while current is not None:
+                new_index.write(current + '\n')
+                current = next(known, None)
+        os.replace(index_path + '.tmp', index_path)
+        return added
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
 if __name__ == '__main__':
-    update_student_list()
+    parser = argparse.ArgumentParser(
+        description='Merge new registrations into the student list, skipping emails that are already in it.')
+    parser.add_argument('inputs', nargs='*', default=[NEW_STUDENTS_FILENAME], metavar='FILE_OR_GLOB',
+                        help=f'Registration exports to merge (default: {NEW_STUDENTS_FILENAME})')
+    parser.add_argument('--rewrite', action='store_true',
+                        help=f'Rewrite the whole list sorted by name (only reads {NEW_STUDENTS_FILENAME})')
+    args = parser.parse_args()
+
+    if args.rewrite:
+        update_student_list()
+    else:
+        try:
+            added = merge_registrations(args.inputs)
+            print(f"✅ Added {added} new students to '{EXISTING_STUDENTS_FILENAME}'.")
+        except FileNotFoundError as e:
+            print(f"Error: {e}. Please check the filename and location.")
+        except Exception as e:
+            print(f"Error merging registrations: {e}")